@@ -1,13 +1,71 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-import json
 import time
 import re
 
+from perfilador import etapa_perfilada # Perfilado opcional con PERFIL_ETAPAS=santaisabel.scrape
+from publicar import guardar_json_atomico # La app nunca ve el JSON a medio escribir
+from navegadores import pool_compartido # Navegadores reutilizados entre corridas y scrapers (ver navegadores.py)
+from modo_liviano import trafico # Bytes transferidos por página (NAVEGADOR_LIVIANO)
+from esperas import esperar_contenido, registro as registro_esperas # Esperas adaptativas en lugar de pausas fijas
+import extraccion # Extracción de la página completa en un solo execute_script (EXTRACCION_MODO)
+
+# Tarjetas de producto (para saber cuándo la grilla dejó de crecer)
+SELECTOR_PRODUCTOS = "a.product-card, .product-card"
+
+# Selectores compartidos por el modo por elementos y el modo 'js' (ver extraccion.py)
+CONTAINER_SELECTORS = [
+    "a.product-card",
+    ".product-card",
+    "[data-testid*='product']",
+    ".product-item",
+    ".product",
+    "[class*='product-card']",
+    "[class*='product']"
+]
+NAME_SELECTORS = [
+    ".product-card-name", ".product-name", ".nombre-producto",
+    "[data-testid*='name']", "h3", "h4", "h5"
+]
+# El selector principal que encontraste en la imagen para el precio actual/oferta es ".prices-main-price"
+PRICE_SELECTORS = [
+    ".prices-main-price", # Este es el que está en la imagen para el precio actual/oferta
+    ".precio-oferta",
+    ".price-current",
+    ".precio-actual",
+    "[data-testid*='price']"
+]
+# Aquí el cambio clave: ".prices-old-price" es el selector de la imagen.
+ORIGINAL_PRICE_SELECTORS = [
+    ".prices-old-price", # AGREGADO/PRIORIZADO según tu imagen
+    ".prices-was-price",
+    ".precio-antes",
+    ".price-original",
+    ".precio-tachado"
+]
+BRAND_SELECTORS = [
+    ".product-card-brand", # Este parece un selector probable para la marca
+    ".marca",
+    ".brand",
+    ".categoria" # Mantenemos por si acaso, si a veces se usa para marca
+]
+
+# Los mismos selectores para extraccion.extraer_tarjetas (campos de extract_product_info)
+ESPEC_TARJETAS = {
+    'contenedores': CONTAINER_SELECTORS,
+    'primer_contenedor': True, # Como wait_for_products_to_load: el primer selector que encuentre productos
+    'campos': {
+        'nombre': {'selectores': NAME_SELECTORS},
+        'descripcion': {'selectores': [':scope'], 'atributos': ['title']},
+        'precio_oferta': {'selectores': PRICE_SELECTORS},
+        'precio_original': {'selectores': ORIGINAL_PRICE_SELECTORS},
+        'marca': {'selectores': BRAND_SELECTORS},
+        'imagen': {'selectores': ['img'], 'atributos': ['src', 'data-src']},
+        'url_producto': {'selectores': [':scope', 'a'], 'atributos': ['href']},
+    },
+}
+
 # ==============================================================================
 # ESTRATEGIA 1: INFERIR CATEGORÍA DEL NOMBRE/DESCRIPCIÓN DEL PRODUCTO
 # Define tus categorías y las palabras clave asociadas
@@ -113,47 +171,16 @@ def classify_product_category(product_name, product_description=""):
 # ==============================================================================
 
 
-# Opción alternativa para ChromeDriver automático
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    WEBDRIVER_MANAGER_AVAILABLE = True
-except ImportError:
-    WEBDRIVER_MANAGER_AVAILABLE = False
-    print("Para instalación automática de ChromeDriver: pip install webdriver-manager")
+URL_INICIO = "https://www.santaisabel.cl"
 
 def setup_driver(headless=False):
     """
-    Configura el driver de Chrome con ventana a mitad de pantalla.
+    Obtiene del pool compartido un navegador ya preparado para Santa Isabel (página de inicio
+    visitada y cookies aceptadas). Devuelve la sesión (el driver está en `sesion.driver`, y se
+    devuelve al pool con `sesion.liberar()`) o None si no se pudo abrir Chrome.
     """
-    chrome_options = Options()
-    
-    if headless:
-        chrome_options.add_argument("--headless")
-    
-    # Opciones adicionales para evitar detección
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    
-    # User agent
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
     try:
-        if WEBDRIVER_MANAGER_AVAILABLE:
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        else:
-            driver = webdriver.Chrome(options=chrome_options)
-        
-        # Configurar el tamaño de la ventana a la mitad de la pantalla
-        if not headless:
-            driver.set_window_size(960, 1080) # Aproximadamente mitad de una pantalla Full HD
-            driver.set_window_position(0, 0) # Posicionar en la esquina superior izquierda
-        
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        return driver
+        return pool_compartido(headless).adquirir('santaisabel', URL_INICIO)
     except Exception as e:
         print(f"Error al inicializar Chrome: {e}")
         print("\nSOLUCIONES:")
@@ -168,17 +195,7 @@ def wait_for_products_to_load(driver, timeout=30):
     """
     print("Esperando que los productos se carguen...")
     
-    selectors_to_try = [
-        "a.product-card",
-        ".product-card",
-        "[data-testid*='product']",
-        ".product-item",
-        ".product",
-        "[class*='product-card']",
-        "[class*='product']"
-    ]
-    
-    for selector in selectors_to_try:
+    for selector in CONTAINER_SELECTORS:
         try:
             print(f"Probando selector: {selector}")
             WebDriverWait(driver, 10).until(
@@ -203,12 +220,8 @@ def extract_product_info(element):
     
     try:
         # Nombre del producto - múltiples selectores posibles
-        name_selectors = [
-            ".product-card-name", ".product-name", ".nombre-producto",
-            "[data-testid*='name']", "h3", "h4", "h5"
-        ]
         nombre = "N/A"
-        for selector in name_selectors:
+        for selector in NAME_SELECTORS:
             try:
                 name_elem = element.find_element(By.CSS_SELECTOR, selector)
                 nombre = name_elem.text.strip()
@@ -220,16 +233,8 @@ def extract_product_info(element):
         producto['descripcion'] = descripcion
         
         # Precios - múltiples selectores posibles
-        # El selector principal que encontraste en la imagen para el precio actual/oferta es ".prices-main-price"
-        precio_selectors = [
-            ".prices-main-price", # Este es el que está en la imagen para el precio actual/oferta
-            ".precio-oferta",
-            ".price-current",
-            ".precio-actual",
-            "[data-testid*='price']"
-        ]
         precio_oferta = "N/A"
-        for selector in precio_selectors:
+        for selector in PRICE_SELECTORS:
             try:
                 price_elem = element.find_element(By.CSS_SELECTOR, selector)
                 precio_text = price_elem.text.strip()
@@ -240,16 +245,8 @@ def extract_product_info(element):
         producto['precio_oferta'] = precio_oferta
         
         # Precio original
-        # Aquí el cambio clave: ".prices-old-price" es el selector de la imagen.
-        original_selectors = [
-            ".prices-old-price", # AGREGADO/PRIORIZADO según tu imagen
-            ".prices-was-price",
-            ".precio-antes",
-            ".price-original",
-            ".precio-tachado"
-        ]
         precio_original = "N/A"
-        for selector in original_selectors:
+        for selector in ORIGINAL_PRICE_SELECTORS:
             try:
                 orig_elem = element.find_element(By.CSS_SELECTOR, selector)
                 precio_original = orig_elem.text.strip()
@@ -258,14 +255,8 @@ def extract_product_info(element):
         producto['precio_original'] = precio_original
         
         # Marca
-        brand_selectors = [
-            ".product-card-brand", # Este parece un selector probable para la marca
-            ".marca",
-            ".brand",
-            ".categoria" # Mantenemos por si acaso, si a veces se usa para marca
-        ]
         marca = "N/A"
-        for selector in brand_selectors:
+        for selector in BRAND_SELECTORS:
             try:
                 brand_elem = element.find_element(By.CSS_SELECTOR, selector)
                 marca = brand_elem.text.strip()
@@ -305,6 +296,25 @@ def extract_product_info(element):
         print(f"Error extrayendo producto: {e}")
         return None
 
+def producto_desde_campos(campos):
+    """
+    Arma un producto, como extract_product_info, a partir de los valores candidatos de
+    extraccion.extraer_tarjetas (modo 'js').
+    """
+    nombre = extraccion.primero(campos['nombre']) or "N/A"
+    descripcion = extraccion.primero(campos['descripcion']) or nombre
+    return {
+        'nombre': nombre,
+        'descripcion': descripcion,
+        'precio_oferta': extraccion.primero(campos['precio_oferta'], lambda t: '$' in t) or "N/A",
+        'precio_original': extraccion.primero(campos['precio_original']) or "N/A",
+        'marca': extraccion.primero(campos['marca']) or "N/A",
+        'categoria': classify_product_category(nombre, descripcion),
+        'imagen': extraccion.primero(campos['imagen']) or "N/A",
+        'url_producto': extraccion.primero(campos['url_producto']) or "N/A",
+        'fecha_scraping': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
 def get_current_page_number(driver):
     """
     Obtiene el número de la página actual visible en el paginador.
@@ -343,7 +353,17 @@ def scrape_products_from_current_page(driver):
     Extrae productos de la página actual.
     """
     driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(3) # Dar tiempo para que los productos finales de la vista carguen
+    esperar_contenido(driver, SELECTOR_PRODUCTOS, timeout=6, etapa='santaisabel.scroll') # Esperar a que los productos finales de la vista carguen
+    
+    if extraccion.MODO == 'js':
+        tarjetas = extraccion.extraer_tarjetas(driver, ESPEC_TARJETAS)
+        if tarjetas is not None:
+            if not tarjetas:
+                print("No se encontraron productos con selectores conocidos en esta página.")
+                return []
+            print(f"Extrayendo información de {len(tarjetas)} productos en esta página (un solo script)...")
+            productos = [producto_desde_campos(campos) for campos in tarjetas]
+            return [p for p in productos if p['nombre'] != "N/A"]
     
     products, selector_used = wait_for_products_to_load(driver)
     
@@ -361,15 +381,17 @@ def scrape_products_from_current_page(driver):
     
     return productos_data
 
+@etapa_perfilada('santaisabel.scrape')
 def scrape_santa_isabel_selenium():
     """
     Función principal de scraping usando Selenium con paginación por número de página.
     """
     url = "https://www.santaisabel.cl/santas-ofertas?nombre_promo=menu-conoce-todas-las-ofertas-30012024"
     
-    driver = setup_driver(headless=False)
-    if not driver:
+    sesion = setup_driver(headless=False)
+    if not sesion:
         return []
+    driver = sesion.driver
     
     all_productos = []
     processed_pages = set()
@@ -377,10 +399,10 @@ def scrape_santa_isabel_selenium():
     
     try:
         print(f"Navegando a: {url}")
-        driver.get(url)
+        sesion.abrir(url)
         
         WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(5)
+        esperar_contenido(driver, SELECTOR_PRODUCTOS, timeout=10, etapa='santaisabel.carga')
         
         print(f"Título de la página: {driver.title}")
         print(f"URL actual: {driver.current_url}")
@@ -446,12 +468,13 @@ def scrape_santa_isabel_selenium():
                             EC.text_to_be_present_in_element((By.CSS_SELECTOR, "button.page-number.active"), str(page_number + 1))
                         )
                     )
-                    time.sleep(5)
+                    esperar_contenido(driver, SELECTOR_PRODUCTOS, timeout=10, esperar_cambio=True, etapa='santaisabel.pagina') # El paginador se actualiza antes que la grilla de productos
                     
                     new_page_number_after_click = get_current_page_number(driver)
                     if new_page_number_after_click == page_number + 1:
                         print(f"✅ Navegación exitosa a página {new_page_number_after_click}.")
                         page_number = new_page_number_after_click
+                        sesion.contar_pagina()
                     else:
                         print(f"⚠️ No se detectó avance a la siguiente página esperada ({page_number + 1}). Página actual: {new_page_number_after_click}. Terminando paginación.")
                         break
@@ -468,6 +491,9 @@ def scrape_santa_isabel_selenium():
         print(f"📊 Total de páginas procesadas: {len(processed_pages)}")
         print(f"📦 Total de productos extraídos: {len(all_productos)}")
         print(f"{'='*60}")
+        print(f"⏱ Esperas:\n{registro_esperas.texto()}")
+        sesion.medir_trafico()
+        print(f"📦 Tráfico:\n{trafico.texto()}")
         
         return all_productos
         
@@ -476,17 +502,16 @@ def scrape_santa_isabel_selenium():
         return []
     
     finally:
-        print("\nPresiona Enter para cerrar el navegador...")
+        print("\nPresiona Enter para liberar el navegador...")
         input()
-        driver.quit()
+        sesion.liberar()
 
 def guardar_productos_json(productos, nombre_archivo='productos_santa_isabel_selenium.json'):
     """
-    Guarda los productos en un archivo JSON
+    Guarda los productos en un archivo JSON (de forma atómica)
     """
     try:
-        with open(nombre_archivo, 'w', encoding='utf-8') as f:
-            json.dump(productos, f, ensure_ascii=False, indent=2)
+        guardar_json_atomico(nombre_archivo, productos, indent=2)
         print(f"Productos guardados en {nombre_archivo}")
         return True
     except Exception as e:
@@ -1,15 +1,69 @@
 import requests
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
-import json
 import re
 from datetime import datetime
 import time
 
+from perfilador import etapa_perfilada # Perfilado opcional con PERFIL_ETAPAS=unimarc.scrape_ofertas
+from publicar import guardar_json_atomico # La app nunca ve el JSON a medio escribir
+from navegadores import pool_compartido # Navegadores reutilizados entre corridas y scrapers (ver navegadores.py)
+from modo_liviano import trafico # Bytes transferidos por página (NAVEGADOR_LIVIANO)
+from esperas import esperar_contenido, registro as registro_esperas # Esperas adaptativas en lugar de pausas fijas
+import extraccion # Extracción de la página completa en un solo execute_script (EXTRACCION_MODO)
+
+# Contenedores de producto de la grilla de ofertas
+SELECTOR_PRODUCTOS = 'section[id^="shelf__vertical--"].smu-impressed'
+
+# Selectores de las tarjetas, compartidos por el modo por elementos y el modo 'js' (ver extraccion.py)
+# Basado en el HTML completo proporcionado, el contenedor más fiable es la sección.
+# <section class="baseContainer_container__TSgMX ... smu-impressed" role="" id="shelf__vertical--hamburguesa-vacuno-la-crianza-premium-1-kg" ...>
+CONTAINER_SELECTORS = [
+    SELECTOR_PRODUCTOS, # Selector principal y más específico
+    'div.baseContainer_container__TSgMX.ab__shelves.abc__shelves.baseContainer_justify-start___sjrG', # Contenedor externo del card (si la sección no funciona)
+]
+PRODUCT_ID_LINK_SELECTOR = 'div[id="shelf__title"] > a.Link_link___5dmQ[href*="/product/"]'
+PRODUCT_LINK_SELECTOR = 'a.Link_link___5dmQ.Link_link--none__BjwPj[href*="/product/"]'
+NAME_SELECTOR = 'p.Shelf_nameProduct__CXI5M'
+BRAND_SELECTOR = 'p.Shelf_brandText__sGfsS'
+IMAGE_SELECTOR = 'img[src*="unimarc.vtexassets.com"]'
+OFFER_PRICE_MARKER_SELECTOR = 'p[id^="listPrice__offerPrice--discountprice-"]'
+OFFER_PRICE_SELECTORS = [
+    'p[id^="listPrice__offerPrice--discountprice-"][class*="Text_text--xl__l05SR"]',
+    'p.Text_text--xl__l05SR', # More general class for large text, often prices
+    'p[class*="price"]', # Generic price class
+    'span[class*="price"]',
+    'div[class*="price"]'
+]
+ORIGINAL_PRICE_SELECTORS = [
+    'p[id^="listPrice__offerPrice--listprice-"][class*="Text_text--line-through__1V_2e"]',
+    'p.Text_text--line-through__1V_2e', # More general class for line-through text
+    'span[class*="line-through"]', # Generic line-through class
+    'div[class*="line-through"]',
+    'p[class*="old-price"]',
+    'span[class*="old-price"]',
+    'div[class*="old-price"]'
+]
+
+# Los mismos selectores para extraccion.extraer_tarjetas: validación y deduplicación de
+# find_product_containers, y campos de extract_product_data
+_EN_ENLACE = ['#shelf__title ' + PRODUCT_LINK_SELECTOR, PRODUCT_LINK_SELECTOR]
+ESPEC_TARJETAS = {
+    'contenedores': CONTAINER_SELECTORS,
+    'clave': PRODUCT_ID_LINK_SELECTOR,
+    'requeridos': [NAME_SELECTOR, OFFER_PRICE_MARKER_SELECTOR, 'img'],
+    'campos': {
+        'url_producto': {'dentro': _EN_ENLACE, 'selectores': [':scope'], 'atributos': ['href']},
+        'nombre': {'dentro': _EN_ENLACE, 'selectores': [NAME_SELECTOR]},
+        'marca': {'dentro': _EN_ENLACE, 'selectores': [BRAND_SELECTOR]},
+        'imagen': {'selectores': [IMAGE_SELECTOR], 'atributos': ['src', 'data-src']},
+        'precio_oferta': {'selectores': OFFER_PRICE_SELECTORS, 'todos': True},
+        'precio_original': {'selectores': ORIGINAL_PRICE_SELECTORS, 'todos': True},
+    },
+}
+
 # ==============================================================================
 # ESTRATEGIA 1: INFERIR CATEGORÍA DEL NOMBRE/DESCRIPCIÓN DEL PRODUCTO
 # Define tus categorías y las palabras clave asociadas
@@ -123,30 +177,13 @@ class UnimarcScraper:
         self.debug = debug
         self.driver = None
         self.wait = None
+        self.sesion = None # Sesión del pool de navegadores mientras dura el scraping
         
     def setup_driver(self):
-        """Configura el driver de Selenium"""
-        chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # Suprimir logs innecesarios
-        chrome_options.add_argument("--log-level=3")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        
+        """Obtiene del pool compartido un navegador ya preparado para Unimarc (ver navegadores.py)"""
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.sesion = pool_compartido(self.headless).adquirir('unimarc', self.base_url)
+            self.driver = self.sesion.driver
             self.wait = WebDriverWait(self.driver, 15)
             print("Driver configurado exitosamente")
             if not self.headless:
@@ -159,12 +196,14 @@ class UnimarcScraper:
         return True
     
     def close_driver(self):
-        """Cierra el driver"""
-        if self.driver and not self.debug:
-            self.driver.quit()
-        elif self.debug:
-            input("Presiona Enter para cerrar el navegador...")
-            self.driver.quit()
+        """Devuelve el navegador al pool"""
+        if self.sesion is None:
+            return
+        if self.debug:
+            input("Presiona Enter para liberar el navegador...")
+        self.sesion.liberar()
+        self.sesion = None
+        self.driver = None
     
     def clean_text(self, text):
         """Limpia y normaliza el texto"""
@@ -232,7 +271,7 @@ class UnimarcScraper:
         
         try:
             # Esperar a que al menos un contenedor de producto esté presente
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'section[id^="shelf__vertical--"].smu-impressed')))
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SELECTOR_PRODUCTOS)))
             print("Contenedores de productos iniciales cargados.")
         except TimeoutException:
             print("La página tardó demasiado en cargar los contenedores de productos. Continuando con el scroll.")
@@ -245,7 +284,7 @@ class UnimarcScraper:
         while scroll_height > last_scroll_height and scroll_attempts < max_scroll_attempts:
             last_scroll_height = scroll_height
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2) # Pausa para que cargue el lazy loading
+            esperar_contenido(self.driver, SELECTOR_PRODUCTOS, timeout=5, etapa='unimarc.scroll') # Espera a que cargue el lazy loading
             scroll_height = self.driver.execute_script("return document.body.scrollHeight")
             scroll_attempts += 1
             if self.debug:
@@ -257,16 +296,9 @@ class UnimarcScraper:
         
     def find_product_containers(self):
         """Encuentra contenedores de productos usando los selectores más precisos."""
-        # Basado en el HTML completo proporcionado, el contenedor más fiable es la sección.
-        # <section class="baseContainer_container__TSgMX ... smu-impressed" role="" id="shelf__vertical--hamburguesa-vacuno-la-crianza-premium-1-kg" ...>
-        selectors_to_try = [
-            'section[id^="shelf__vertical--"].smu-impressed', # Selector principal y más específico
-            'div.baseContainer_container__TSgMX.ab__shelves.abc__shelves.baseContainer_justify-start___sjrG', # Contenedor externo del card (si la sección no funciona)
-        ]
-        
         all_potential_products = []
         
-        for selector in selectors_to_try:
+        for selector in CONTAINER_SELECTORS:
             try:
                 elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements:
@@ -285,8 +317,7 @@ class UnimarcScraper:
             try:
                 # Usar la URL del producto como identificador único si es posible
                 # Buscar el enlace principal dentro de este contenedor de producto
-                product_link_elem = product_elem.find_elements(By.CSS_SELECTOR, 
-                    'div[id="shelf__title"] > a.Link_link___5dmQ[href*="/product/"]')
+                product_link_elem = product_elem.find_elements(By.CSS_SELECTOR, PRODUCT_ID_LINK_SELECTOR)
                 product_url = ''
                 if product_link_elem:
                     href = product_link_elem[0].get_attribute('href')
@@ -302,8 +333,8 @@ class UnimarcScraper:
                     continue # Ya procesado
                 
                 # Heurísticas para validar si es un producto real (puede que el selector sea demasiado amplio)
-                has_name = bool(product_elem.find_elements(By.CSS_SELECTOR, 'p.Shelf_nameProduct__CXI5M'))
-                has_offer_price = bool(product_elem.find_elements(By.CSS_SELECTOR, 'p[id^="listPrice__offerPrice--discountprice-"]'))
+                has_name = bool(product_elem.find_elements(By.CSS_SELECTOR, NAME_SELECTOR))
+                has_offer_price = bool(product_elem.find_elements(By.CSS_SELECTOR, OFFER_PRICE_MARKER_SELECTOR))
                 has_img = bool(product_elem.find_elements(By.TAG_NAME, 'img'))
                 
                 if has_name and has_offer_price and has_img: # Requerir estos elementos clave
@@ -340,10 +371,10 @@ class UnimarcScraper:
             shelf_title_div = product_element.find_elements(By.ID, 'shelf__title')
             
             if shelf_title_div:
-                main_product_link = shelf_title_div[0].find_elements(By.CSS_SELECTOR, 'a.Link_link___5dmQ.Link_link--none__BjwPj[href*="/product/"]')
+                main_product_link = shelf_title_div[0].find_elements(By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR)
             else:
                 # Si no se encuentra shelf__title, buscar el enlace principal directamente en el product_element
-                main_product_link = product_element.find_elements(By.CSS_SELECTOR, 'a.Link_link___5dmQ.Link_link--none__BjwPj[href*="/product/"]')
+                main_product_link = product_element.find_elements(By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR)
 
             if main_product_link:
                 href = main_product_link[0].get_attribute('href')
@@ -354,19 +385,19 @@ class UnimarcScraper:
                         product_data['url_producto'] = href
                 
                 # Extraer nombre del <p> con clase Shelf_nameProduct__CXI5M dentro del enlace
-                name_elem = main_product_link[0].find_elements(By.CSS_SELECTOR, 'p.Shelf_nameProduct__CXI5M')
+                name_elem = main_product_link[0].find_elements(By.CSS_SELECTOR, NAME_SELECTOR)
                 if name_elem:
                     product_data['nombre'] = self.clean_text(name_elem[0].text)
                     product_data['descripcion'] = product_data['nombre'] # Descripción es el mismo nombre por ahora
                 
                 # Extraer marca del <p> con clase Shelf_brandText__sGfsS dentro del enlace
-                brand_elem = main_product_link[0].find_elements(By.CSS_SELECTOR, 'p.Shelf_brandText__sGfsS')
+                brand_elem = main_product_link[0].find_elements(By.CSS_SELECTOR, BRAND_SELECTOR)
                 if brand_elem:
                     product_data['marca'] = self.clean_text(brand_elem[0].text)
 
             # Extraer Imagen del Producto
             # La imagen también está dentro del enlace principal, o en un div de imagen dentro del contenedor general.
-            img_elem = product_element.find_elements(By.CSS_SELECTOR, 'img[src*="unimarc.vtexassets.com"]')
+            img_elem = product_element.find_elements(By.CSS_SELECTOR, IMAGE_SELECTOR)
             if img_elem:
                 src = img_elem[0].get_attribute('src') or img_elem[0].get_attribute('data-src')
                 if src and (src.startswith('http') or src.startswith('//') or src.startswith('/')):
@@ -377,14 +408,7 @@ class UnimarcScraper:
                     product_data['imagen'] = src
 
             # Extraer Precio de Oferta
-            offer_price_selectors = [
-                'p[id^="listPrice__offerPrice--discountprice-"][class*="Text_text--xl__l05SR"]',
-                'p.Text_text--xl__l05SR', # More general class for large text, often prices
-                'p[class*="price"]', # Generic price class
-                'span[class*="price"]',
-                'div[class*="price"]'
-            ]
-            for selector in offer_price_selectors:
+            for selector in OFFER_PRICE_SELECTORS:
                 try:
                     offer_price_elem = product_element.find_elements(By.CSS_SELECTOR, selector)
                     if offer_price_elem:
@@ -405,16 +429,7 @@ class UnimarcScraper:
                     continue
             
             # Extraer Precio Original (tachado)
-            original_price_selectors = [
-                'p[id^="listPrice__offerPrice--listprice-"][class*="Text_text--line-through__1V_2e"]',
-                'p.Text_text--line-through__1V_2e', # More general class for line-through text
-                'span[class*="line-through"]', # Generic line-through class
-                'div[class*="line-through"]',
-                'p[class*="old-price"]',
-                'span[class*="old-price"]',
-                'div[class*="old-price"]'
-            ]
-            for selector in original_price_selectors:
+            for selector in ORIGINAL_PRICE_SELECTORS:
                 try:
                     original_price_elem = product_element.find_elements(By.CSS_SELECTOR, selector)
                     if original_price_elem:
@@ -452,6 +467,54 @@ class UnimarcScraper:
         
         return product_data
     
+    def extract_page_products(self):
+        """
+        Modo 'js': extrae todas las tarjetas válidas de la página en un solo execute_script (ver
+        extraccion.py) y arma los productos en Python, como find_product_containers + extract_product_data.
+        Retorna None si el script falló.
+        """
+        tarjetas = extraccion.extraer_tarjetas(self.driver, ESPEC_TARJETAS)
+        if tarjetas is None:
+            return None
+        print(f"Total productos únicos y válidos encontrados: {len(tarjetas)}")
+        return [self.product_from_fields(campos) for campos in tarjetas]
+
+    def format_first_price(self, candidatos):
+        """Primer texto con '$' que sea un precio válido, con el formato de extract_product_data ("$1.990")."""
+        texto = extraccion.primero(candidatos, lambda t: '$' in t and self.extract_price(t) is not None)
+        if texto is None:
+            return None
+        return f"${self.extract_price(texto):,.0f}".replace(",", ".")
+
+    def product_from_fields(self, campos):
+        """Arma un producto a partir de los valores candidatos de extraccion.extraer_tarjetas."""
+        nombre = self.clean_text(extraccion.primero(campos['nombre']))
+        product_data = {
+            'nombre': nombre,
+            'descripcion': nombre, # Descripción es el mismo nombre por ahora
+            'precio_original': self.format_first_price(campos['precio_original']),
+            'precio_oferta': self.format_first_price(campos['precio_oferta']),
+            'marca': self.clean_text(extraccion.primero(campos['marca'])),
+            'categoria': classify_product_category(nombre, nombre),
+            'imagen': '',
+            'url_producto': '',
+            'fecha_scraping': datetime.now().isoformat()
+        }
+
+        href = extraccion.primero(campos['url_producto'])
+        if href:
+            product_data['url_producto'] = self.base_url + href if href.startswith('/product/') else href
+
+        src = extraccion.primero(campos['imagen'])
+        if src and (src.startswith('http') or src.startswith('//') or src.startswith('/')):
+            if src.startswith('//'):
+                src = 'https:' + src
+            elif src.startswith('/') and not src.startswith(self.base_url):
+                src = self.base_url + src
+            product_data['imagen'] = src
+        return product_data
+
+    @etapa_perfilada('unimarc.scrape_ofertas')
     def scrape_ofertas(self):
         """Realiza el scraping de ofertas"""
         if not self.setup_driver():
@@ -464,7 +527,7 @@ class UnimarcScraper:
         
         try:
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Navegando a la página de ofertas: {self.ofertas_url_base}")
-            self.driver.get(self.ofertas_url_base)
+            self.sesion.abrir(self.ofertas_url_base)
             
             if not self.headless:
                 print("🔍 Navegador visible abierto - puedes ver lo que está haciendo")
@@ -480,7 +543,9 @@ class UnimarcScraper:
                 self.wait_and_scroll()
                 
                 print(f"[{datetime.now().strftime('%H:%M:%S')}] Buscando contenedores de productos en Página {current_page_num}...")
-                products_on_page = self.find_product_containers()
+                # En modo 'js' llegan los productos ya armados; en modo por elementos (o si el script falla), los elementos
+                page_products = self.extract_page_products() if extraccion.MODO == 'js' else None
+                products_on_page = page_products if page_products is not None else self.find_product_containers()
                 
                 if not products_on_page and current_page_num == 1:
                     print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ No se encontraron productos en la primera página con los selectores y heurísticas actuales.")
@@ -495,13 +560,16 @@ class UnimarcScraper:
                 
                 for i, product_element in enumerate(products_on_page):
                     try:
-                        if self.debug or not self.headless:
-                            # Resaltar el elemento actual para visualización en modo no-headless
-                            self.driver.execute_script(
-                                "arguments[0].style.border='3px solid red'; arguments[0].scrollIntoView({block: 'center'});", product_element)
-                            time.sleep(0.1) # Pausa corta para visualización
-                        
-                        product_info = self.extract_product_data(product_element, i+1)
+                        if page_products is not None:
+                            product_info = product_element # Ya armado por extract_page_products
+                        else:
+                            if self.debug or not self.headless:
+                                # Resaltar el elemento actual para visualización en modo no-headless
+                                self.driver.execute_script(
+                                    "arguments[0].style.border='3px solid red'; arguments[0].scrollIntoView({block: 'center'});", product_element)
+                                time.sleep(0.1) # Pausa corta para visualización
+                            
+                            product_info = self.extract_product_data(product_element, i+1)
                         
                         if (product_info['nombre'] or 
                             product_info['precio_oferta'] is not None or 
@@ -511,7 +579,7 @@ class UnimarcScraper:
                         else:
                             print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠ Producto {i+1} (Pág {current_page_num}) sin datos suficientes para ser útil. Saltando.")
                             
-                        if self.debug or not self.headless:
+                        if page_products is None and (self.debug or not self.headless):
                             # Quitar resaltado
                             self.driver.execute_script(
                                 "arguments[0].style.border='';", product_element)
@@ -526,8 +594,8 @@ class UnimarcScraper:
                 # --- Lógica de Paginación ---
                 next_page_arrow_link = None
                 try:
-                    # Esperar un momento adicional para que los elementos de paginación se rendericen
-                    time.sleep(2) 
+                    # Esperar a que los elementos de paginación se rendericen
+                    esperar_contenido(self.driver, timeout=4, etapa='unimarc.paginacion')
 
                     # Construir el selector CSS para el enlace de la flecha derecha (siguiente página)
                     # La URL del enlace a la página 2 es "/ofertas/ofertas-unimarc?&amp;page=2"
@@ -589,11 +657,13 @@ class UnimarcScraper:
                                         f"La URL no cambió a la esperada ({expected_new_url_pattern}) después de hacer clic.")
                         
                         # Después de que la URL cambie, esperar que los elementos de productos en la *nueva* página estén presentes
-                        self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'section[id^="shelf__vertical--"].smu-impressed')),
+                        self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SELECTOR_PRODUCTOS)),
                                         "No se encontraron productos en la nueva página después del cambio de URL.")
                         
                         current_page_num += 1 # Incrementar el número de página actual solo después de una navegación exitosa
-                        time.sleep(3) # Dar tiempo adicional para que el contenido se renderice completamente
+                        self.sesion.contar_pagina()
+                        # Esperar a que el contenido termine de renderizarse
+                        esperar_contenido(self.driver, SELECTOR_PRODUCTOS, timeout=8, etapa='unimarc.pagina')
                     except StaleElementReferenceException:
                         print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠ El enlace de la página siguiente se volvió obsoleto al hacer clic. Terminando paginación.")
                         break
@@ -608,6 +678,9 @@ class UnimarcScraper:
                     break
             
             print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 🎉 Scraping completado. {len(all_products_data)} productos extraídos.")
+            print(f"⏱ Esperas:\n{registro_esperas.texto()}")
+            self.sesion.medir_trafico()
+            print(f"📦 Tráfico:\n{trafico.texto()}")
             return all_products_data
             
         except Exception as e:
@@ -617,14 +690,13 @@ class UnimarcScraper:
             self.close_driver() # Siempre cerrar el driver
     
     def save_to_json(self, data, filename=None):
-        """Guarda los datos en un archivo JSON"""
+        """Guarda los datos en un archivo JSON (de forma atómica)"""
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"unimarc_ofertas_{timestamp}.json"
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str) 
+            guardar_json_atomico(filename, data, indent=2, default=str)
             print(f"[{datetime.now().strftime('%H:%M:%S')}] 💾 Datos guardados en: {filename}")
             return filename
         except Exception as e:
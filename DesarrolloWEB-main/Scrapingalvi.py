@@ -1,15 +1,21 @@
-import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
 import time
 import re
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
-from webdriver_manager.chrome import ChromeDriverManager
+
+from navegadores import pool_compartido # Navegadores reutilizados entre categorías (ver navegadores.py)
+from modo_liviano import trafico # Bytes transferidos por página (NAVEGADOR_LIVIANO)
+from esperas import esperar_contenido, registro as registro_esperas # Esperas adaptativas en lugar de pausas fijas
+
+from perfilador import etapa_perfilada # Perfilado opcional con PERFIL_ETAPAS=alvi.categoria
+from publicar import guardar_json_atomico # La app nunca ve el JSON a medio escribir
 
 # === CATEGORÍAS PERSONALIZADAS ===
 # Se usan para clasificar los productos una vez extraídos.
@@ -65,28 +71,25 @@ def format_price_for_json(price_int):
         return "N/A"
     return f"${price_int:,.0f}".replace(",", ".")
 
+URL_INICIO = "https://www.alvi.cl"
+
 def setup_driver(headless=False): # MODIFICADO: headless=False para ver el navegador
     """
-    Configura y devuelve una instancia del WebDriver de Chrome.
+    Obtiene del pool compartido un navegador ya preparado para Alvi (página de inicio visitada y
+    pop-up de bienvenida/ubicación cerrado). Devuelve la sesión: el driver está en `sesion.driver`
+    y se devuelve al pool con `sesion.liberar()`.
     """
-    options = Options()
-    if headless:
-        options.add_argument("--headless")
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36")
-
-    # Usamos ChromeDriverManager para que no necesites especificar la ruta de ChromeDriver.
-    service = Service(ChromeDriverManager().install()) 
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    driver.set_page_load_timeout(60) # Aumentar el tiempo de espera de carga de página
-
-    return driver
+    return pool_compartido(headless).adquirir('alvi', URL_INICIO)
+
+# Selectores de producto más precisos. Probamos con el `[class^='ProductCard_card__']`
+# que apareció en tu último error, junto con los anteriores.
+PRODUCT_CARD_SELECTORS = [
+    "[class^='ProductCard_card__']", # Selector más genérico para clases dinámicas como "ProductCard_card__<hash>"
+    "div.ShelfAlvi_shelf__ic5TF", # Contenedor principal de cada producto en el listado (si es clase estática)
+    ".vtex-product-summary-2-x-container", # Fallback VTEX genérico
+    "div[data-vtex-ps-id]" # Otro fallback genérico
+]
+PRODUCT_CARD_SELECTOR = ", ".join(PRODUCT_CARD_SELECTORS)
 
 def scroll_down_to_load_content(driver, wait, max_scrolls=10):
     """
@@ -96,13 +99,13 @@ def scroll_down_to_load_content(driver, wait, max_scrolls=10):
     scroll_count = 0
     while scroll_count < max_scrolls:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)  # Espera para que el nuevo contenido cargue
+        esperar_contenido(driver, PRODUCT_CARD_SELECTOR, timeout=6, etapa='alvi.scroll')  # Espera a que el nuevo contenido cargue
         new_height = driver.execute_script("return document.body.scrollHeight")
         if new_height == last_height:
             # Si no hay un nuevo scroll, podría ser el final de la página o no hay más contenido.
             # Intenta un scroll suave hasta la parte inferior de la ventana visible para activar cargas
             driver.execute_script("window.scrollBy(0, window.innerHeight);")
-            time.sleep(2)
+            esperar_contenido(driver, PRODUCT_CARD_SELECTOR, timeout=4, etapa='alvi.scroll')
             new_height = driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
                 print("No más contenido para cargar al hacer scroll.")
@@ -112,12 +115,15 @@ def scroll_down_to_load_content(driver, wait, max_scrolls=10):
         print(f"Scroll down: {scroll_count}")
 
 
-def scrape_alvi_category(url):
+@etapa_perfilada('alvi.categoria')
+def scrape_alvi_category(url, headless=False, al_extraer_pagina=None):
     """
     Scrapea productos de una URL de categoría específica en Alvi.cl.
     Maneja el scroll para cargar más productos y la paginación a través del botón "Siguiente página".
+    Si se indica `al_extraer_pagina`, se llama con los productos nuevos de cada página apenas se extraen.
     """
-    driver = setup_driver(headless=False) # Usar el valor de setup_driver
+    sesion = setup_driver(headless=headless) # Usar el valor de setup_driver
+    driver = sesion.driver
     wait = WebDriverWait(driver, 45) # Aumentar el tiempo de espera para elementos
     products_in_category = []
     scraped_product_urls_in_category = set() # Para evitar duplicados en la misma sesión/categoría
@@ -125,25 +131,9 @@ def scrape_alvi_category(url):
     print(f"\nIniciando scraping para la categoría: {url}")
 
     try:
-        driver.get(url)
-        time.sleep(7) # Espera inicial más larga para que la página cargue completamente
-
-        # Intentar cerrar pop-ups si aparecen (ajustar selectores si es necesario)
-        try:
-            # Selectores más específicos para pop-ups de VTEX o de ubicación/bienvenida
-            # Aumentar el tiempo de espera para el pop-up, es crucial que se cierre.
-            close_popup_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, 
-                    "button[aria-label*='Cerrar'], button[data-testid*='close-button'], .vtex-modal-layout-0-x-closeButton, button.close-button, div.close-button, a.close-button"
-                ))
-            )
-            print(f"Cerrando posible pop-up...")
-            close_popup_button.click()
-            time.sleep(2)
-        except TimeoutException:
-            print("No se encontró pop-up de bienvenida/ubicación en 10 segundos o no es necesario cerrarlo.")
-        except Exception as e:
-            print(f"Error al intentar cerrar pop-up: {e}")
+        sesion.abrir(url)
+        esperar_contenido(driver, PRODUCT_CARD_SELECTOR, timeout=15, etapa='alvi.carga') # Espera inicial a que la página cargue completamente
+        # El pop-up de bienvenida/ubicación ya se cerró al preparar la sesión (ver setup_driver)
 
         current_page_num = 1
         # MODIFICADO: Bucle de paginación con límite de 5 páginas
@@ -152,21 +142,13 @@ def scrape_alvi_category(url):
             # Realizar scroll para asegurar que todos los productos de la página se carguen
             scroll_down_to_load_content(driver, wait, max_scrolls=5) # Puedes ajustar max_scrolls
 
-            # Selectores de producto más precisos. Probamos con el `[class^='ProductCard_card__']`
-            # que apareció en tu último error, junto con los anteriores.
-            product_card_selectors = [
-                "[class^='ProductCard_card__']", # Selector más genérico para clases dinámicas como "ProductCard_card__<hash>"
-                "div.ShelfAlvi_shelf__ic5TF", # Contenedor principal de cada producto en el listado (si es clase estática)
-                ".vtex-product-summary-2-x-container", # Fallback VTEX genérico
-                "div[data-vtex-ps-id]" # Otro fallback genérico
-            ]
-
             products_on_current_page = 0
+            inicio_pagina = len(products_in_category)
             try:
                 # Esperar por al menos un elemento de producto.
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(product_card_selectors))))
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_CARD_SELECTOR)))
                 # Una vez que la página carga, encontrar todos los elementos.
-                product_elements = driver.find_elements(By.CSS_SELECTOR, ", ".join(product_card_selectors))
+                product_elements = driver.find_elements(By.CSS_SELECTOR, PRODUCT_CARD_SELECTOR)
                 print(f"Detectados {len(product_elements)} elementos de producto potenciales en la página actual.")
             except TimeoutException:
                 print("No se encontraron elementos de productos en la página actual después de scrolls. Fin de la categoría.")
@@ -344,6 +326,9 @@ def scrape_alvi_category(url):
                     print(f"Error desconocido al procesar un producto (posible URL: {url_producto if 'url_producto' in locals() else 'N/A'}): {e}")
                     continue
 
+            if al_extraer_pagina is not None and len(products_in_category) > inicio_pagina:
+                al_extraer_pagina(products_in_category[inicio_pagina:])
+
             if products_on_current_page == 0 and current_page_num > 1:
                 print("No se encontraron nuevos productos en esta página después de desplazar. Posiblemente sea el final.")
                 break # Si no hay productos nuevos después del scroll, es el fin de la paginación.
@@ -364,8 +349,9 @@ def scrape_alvi_category(url):
                         if "disabled" not in next_arrow_button.get_attribute("class") and next_arrow_button.get_attribute("aria-disabled") == "false":
                             print("Haciendo clic en el botón de flecha 'Siguiente página'...")
                             driver.execute_script("arguments[0].click();", next_arrow_button)
-                            time.sleep(5) # Esperar a que la nueva página cargue
+                            esperar_contenido(driver, PRODUCT_CARD_SELECTOR, timeout=10, esperar_cambio=True, etapa='alvi.pagina') # Esperar a que la nueva página cargue
                             current_page_num += 1
+                            sesion.contar_pagina()
                             next_page_found = True
                         else:
                             print("Botón de flecha 'Siguiente página' deshabilitado.")
@@ -382,8 +368,9 @@ def scrape_alvi_category(url):
                         next_page_link = wait.until(EC.element_to_be_clickable((By.XPATH, next_page_link_selector)))
                         print(f"Haciendo clic en el enlace a la página {current_page_num + 1}...")
                         driver.execute_script("arguments[0].click();", next_page_link)
-                        time.sleep(5) # Esperar más tiempo para la carga de la nueva página
+                        esperar_contenido(driver, PRODUCT_CARD_SELECTOR, timeout=10, esperar_cambio=True, etapa='alvi.pagina') # Esperar a que la nueva página cargue
                         current_page_num += 1
+                        sesion.contar_pagina()
                         next_page_found = True
 
                 except TimeoutException:
@@ -399,10 +386,114 @@ def scrape_alvi_category(url):
     except Exception as e:
         print(f"Error general durante el scraping de la categoría: {e}")
     finally:
-        driver.quit()
+        sesion.liberar() # Vuelve al pool para la siguiente categoría
         print(f"Finalizado scraping para la categoría: {url}")
     return products_in_category
 
+def _trabajador_categoria(url, conexion, headless):
+    """
+    Proceso hijo del modo paralelo: scrapea una categoría con su propio navegador y envía al proceso
+    principal, por su propia conexión, los productos de cada página apenas se extraen, así que si
+    el proceso se cuelga o se cae se conserva lo que alcanzó a enviar.
+    """
+    if hasattr(os, 'setsid'):
+        os.setsid() # Grupo de procesos propio: al cortarlo por timeout también se cierran Chrome y ChromeDriver
+    try:
+        productos = scrape_alvi_category(url, headless=headless,
+                                         al_extraer_pagina=lambda nuevos: conexion.send(('pagina', nuevos)))
+        conexion.send(('fin', len(productos)))
+    except Exception as e:
+        conexion.send(('error', repr(e)))
+    finally:
+        conexion.close()
+
+
+def _terminar_proceso(proceso):
+    """Corta el proceso (y, con killpg, su navegador) y espera a que termine."""
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(proceso.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            # Todavía sin grupo propio (no llegó a setsid) o ya terminó
+            proceso.kill()
+    else:
+        proceso.terminate()
+    proceso.join(10)
+    if proceso.is_alive():
+        proceso.kill()
+        proceso.join(5)
+
+
+def scrape_categorias_en_paralelo(urls, procesos=4, timeout=900, headless=True):
+    """
+    Scrapea las categorías repartidas en hasta `procesos` procesos a la vez, cada uno con su propio
+    navegador. El proceso principal es el único que junta los resultados, que llegan página a página.
+    Una categoría que supera `timeout` segundos se corta (con su navegador) y una que se cae no
+    afecta a las demás; en ambos casos se conservan las páginas ya recibidas.
+    Retorna (productos en el orden de `urls`, {url: 'ok' | 'timeout' | 'error: ...'}).
+    """
+    contexto = multiprocessing.get_context('spawn') # Igual en Windows y Linux; fork no se lleva bien con hilos
+    pendientes = list(urls)
+    # url -> (proceso, conexión, límite). Cada proceso tiene su propio Pipe: si se lo corta a mitad
+    # de un envío, solo queda dañada su conexión y no la de las demás categorías
+    activos = {}
+    productos = {url: [] for url in urls}
+    estado = {}
+
+    def recibir(url, conexion):
+        """Lee un mensaje de la categoría. Retorna False si la conexión se cerró o quedó cortada a mitad de un mensaje."""
+        try:
+            tipo, dato = conexion.recv()
+        except Exception: # EOFError al cerrarse; cualquier otro error, mensaje truncado por un proceso cortado
+            return False
+        if tipo == 'pagina':
+            productos[url].extend(dato)
+            print(f"  {url}: +{len(dato)} productos ({len(productos[url])} en total)")
+        else:
+            estado[url] = 'ok' if tipo == 'fin' else f'error: {dato}'
+        return True
+
+    def drenar(url, conexion):
+        while conexion.poll() and recibir(url, conexion):
+            pass
+
+    while pendientes or activos:
+        while pendientes and len(activos) < procesos:
+            url = pendientes.pop(0)
+            receptor, emisor = contexto.Pipe(duplex=False)
+            proceso = contexto.Process(target=_trabajador_categoria, args=(url, emisor, headless), name=f'alvi-{len(estado) + len(activos)}')
+            proceso.start()
+            emisor.close() # Solo el hijo escribe: al terminar, el receptor ve EOF
+            activos[url] = (proceso, receptor, time.monotonic() + timeout)
+            print(f"Categoría iniciada en el proceso {proceso.pid}: {url}")
+
+        por_conexion = {conexion: url for url, (_, conexion, _) in activos.items()}
+        cerradas = set() # Conexiones con EOF: el proceso terminó (o se cayó) y ya no envía nada más
+        for conexion in multiprocessing.connection.wait(list(por_conexion), timeout=1):
+            url = por_conexion[conexion]
+            if recibir(url, conexion):
+                drenar(url, conexion)
+            else:
+                cerradas.add(url)
+
+        for url, (proceso, conexion, limite) in list(activos.items()):
+            if url in cerradas or not proceso.is_alive():
+                proceso.join(10)
+                drenar(url, conexion) # Sus últimos mensajes pueden haber llegado después de la lectura anterior
+                if url not in estado:
+                    estado[url] = f'error: el proceso terminó con código {proceso.exitcode}'
+            elif time.monotonic() > limite:
+                print(f"⏱ La categoría superó {timeout} s; se corta el proceso {proceso.pid}: {url}")
+                _terminar_proceso(proceso)
+                drenar(url, conexion) # Solo los mensajes completos; uno cortado a la mitad se descarta
+                estado.setdefault(url, 'timeout')
+            else:
+                continue
+            conexion.close()
+            del activos[url]
+
+    return [producto for url in urls for producto in productos[url]], estado
+
 def main():
     """
     Función principal para ejecutar el scraping de todas las categorías.
@@ -412,16 +503,26 @@ def main():
         "https://www.alvi.cl/category/congelados"
     ]
     
+    # ALVI_PROCESOS > 1 reparte las categorías en procesos paralelos (sin ventana del navegador)
+    procesos = int(os.environ.get('ALVI_PROCESOS', '1'))
     all_scraped_products = []
-    for category_url in urls_to_scrape:
-        products = scrape_alvi_category(category_url)
-        all_scraped_products.extend(products)
-        print(f"✓ {len(products)} productos extraídos de {category_url}")
+    if procesos > 1:
+        timeout = float(os.environ.get('ALVI_TIMEOUT_S', '900'))
+        all_scraped_products, estado = scrape_categorias_en_paralelo(urls_to_scrape, procesos=procesos, timeout=timeout)
+        for category_url, resultado in estado.items():
+            print(f"{'✓' if resultado == 'ok' else '✗'} {category_url}: {resultado}")
+    else:
+        for category_url in urls_to_scrape:
+            products = scrape_alvi_category(category_url)
+            all_scraped_products.extend(products)
+            print(f"✓ {len(products)} productos extraídos de {category_url}")
 
     output_file = "productos_alvi.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_scraped_products, f, indent=2, ensure_ascii=False)
+    guardar_json_atomico(output_file, all_scraped_products, indent=2)
     print(f"\n🎉 Scraping completo. Total productos extraídos: {len(all_scraped_products)} en '{output_file}'")
+    if procesos <= 1: # En modo paralelo las esperas y el tráfico se miden en cada proceso
+        print(f"⏱ Esperas:\n{registro_esperas.texto()}")
+        print(f"📦 Tráfico:\n{trafico.texto()}")
 
 if __name__ == "__main__":
     main()
@@ -1,21 +1,58 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, abort, send_from_directory
+from werkzeug.security import safe_join
+from jinja2 import FileSystemBytecodeCache
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash # Importar para hash de contraseñas
-import json
+from sqlalchemy import case, func, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+import hmac
 import os # Para la clave secreta
+import logging
+import math
+import mimetypes
+import threading
+import time
+from functools import partial
 import re # Para validación de email
 
-from db_config import DATABASE_CONFIG 
+from basedatos import uri_base_datos, opciones_motor
+from catalogo import CatalogoCache, firma_archivo
+from cache_http import respuesta_condicional
+from publicar import variante_comprimida, publicar_directorio
+from consultas import CatalogoIndexado, ORDENES, paginar, lineas_ndjson
+from buscador import IndiceTienda, buscar
+from autocompletado import IndiceSugerencias
+from tiendas import TIENDAS, archivos_tiendas
+from seguridad import PoliticaHash, HashSaturado # Hash de contraseñas con método y costo configurables
+from limitador import LimitadorTokenBucket
+from cache_negativa import CacheNegativa
+from metricas import Metricas, TIPO_CONTENIDO
+from logs import configurar_logs
+from perfil_sql import PerfiladorSQL
+from perfilador import PerfiladorRutas
+from cache_render import CacheRender, MARCA_USUARIO
 
 app = Flask(__name__)
 
-# Configuración de la conexión a la base de datos SQL Server
-conn_str = (
-    f"mssql+pyodbc://@{DATABASE_CONFIG['server']}/{DATABASE_CONFIG['database']}"
-    f"?driver={DATABASE_CONFIG['driver'].replace(' ', '+')}&trusted_connection=yes"
-)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = conn_str
+# Logs (ver logs.py): nivel, formato 'texto' o 'json' y muestreo de DEBUG/INFO por endpoint ('home=0.01,lider=0.1').
+# En producción conviene LOG_NIVEL=WARNING y LOG_FORMATO=json.
+app.config['LOG_NIVEL'] = os.environ.get('LOG_NIVEL', 'INFO')
+app.config['LOG_FORMATO'] = os.environ.get('LOG_FORMATO', 'texto')
+app.config['LOG_MUESTREO'] = os.environ.get('LOG_MUESTREO', '')
+configurar_logs(app.config['LOG_NIVEL'], app.config['LOG_FORMATO'], app.config['LOG_MUESTREO'])
+log = logging.getLogger('app') # Nombre fijo: con `python app.py` el módulo se llama __main__
+
+# Configuración de la conexión a la base de datos (ver basedatos.py)
+# Sin DATABASE_URL se usa SQL Server con los datos de db_config.py; con DATABASE_URL=sqlite:///usuarios.db
+# (o sqlite:// en memoria) el modelo Usuario y las rutas de autenticación funcionan sin SQL Server.
+# La URI y el engine se resuelven recién en iniciar_db() (ver más abajo), no al importar.
+app.config['DATABASE_URL'] = os.environ.get('DATABASE_URL')
+# Pool de conexiones: tamaño, conexiones extra en picos, espera máxima, reciclaje y verificación previa
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', '5'))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', '1') not in ('0', 'false', 'no')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Configuración de la clave secreta para la gestión de sesiones
@@ -23,7 +60,179 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 # Puedes generarla con `os.urandom(24)` y guardarla en una variable de entorno.
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'your_super_secret_key_here_change_this_in_production_!!!')
 
-db = SQLAlchemy(app)
+# Segundos que el navegador puede reutilizar un catálogo sin revalidarlo (luego usa ETag / If-Modified-Since)
+app.config['CATALOGO_MAX_AGE'] = int(os.environ.get('CATALOGO_MAX_AGE', '60'))
+
+# Política de hashing de contraseñas (ver seguridad.py)
+# PASSWORD_HASH_METHOD usa el formato de werkzeug: 'scrypt', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', etc.
+# Con PASSWORD_HASH_WORKERS > 0 los hashes se calculan en un pool acotado de hilos.
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', '0'))
+app.config['PASSWORD_HASH_QUEUE'] = int(os.environ.get('PASSWORD_HASH_QUEUE', '16'))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', '2'))
+
+# Límite de intentos de login (token bucket): ráfaga máxima y recarga por minuto, por IP y por usuario/email.
+# Los intentos que exceden el límite se rechazan antes de consultar la DB y de verificar el hash.
+app.config['LOGIN_LIMITE_IP'] = int(os.environ.get('LOGIN_LIMITE_IP', '20'))
+app.config['LOGIN_TASA_IP_POR_MINUTO'] = float(os.environ.get('LOGIN_TASA_IP_POR_MINUTO', '10'))
+app.config['LOGIN_LIMITE_USUARIO'] = int(os.environ.get('LOGIN_LIMITE_USUARIO', '5'))
+app.config['LOGIN_TASA_USUARIO_POR_MINUTO'] = float(os.environ.get('LOGIN_TASA_USUARIO_POR_MINUTO', '2'))
+app.config['LOGIN_LIMITADOR_MAX_CLAVES'] = int(os.environ.get('LOGIN_LIMITADOR_MAX_CLAVES', '10000'))
+
+# Caché negativa de /api/check-availability: segundos que se recuerda que un nombre/email no existe y máximo de claves
+app.config['DISPONIBILIDAD_CACHE_TTL'] = float(os.environ.get('DISPONIBILIDAD_CACHE_TTL', '30'))
+app.config['DISPONIBILIDAD_CACHE_MAX_CLAVES'] = int(os.environ.get('DISPONIBILIDAD_CACHE_MAX_CLAVES', '10000'))
+
+# Métricas en /metrics (formato Prometheus). METRICAS=0 las desactiva por completo.
+app.config['METRICAS'] = os.environ.get('METRICAS', '1') not in ('0', 'false', 'no')
+
+# Perfilador de consultas SQL (ver perfil_sql.py): umbral de consulta lenta, repeticiones para avisar
+# de un N+1 y encabezado Server-Timing con el tiempo de DB de cada request. SQL_PERFIL=0 lo desactiva.
+app.config['SQL_PERFIL'] = os.environ.get('SQL_PERFIL', '1') not in ('0', 'false', 'no')
+app.config['SQL_LENTA_MS'] = float(os.environ.get('SQL_LENTA_MS', '200'))
+app.config['SQL_N_MAS_UNO_REPETICIONES'] = int(os.environ.get('SQL_N_MAS_UNO_REPETICIONES', '10'))
+app.config['SQL_SERVER_TIMING'] = os.environ.get('SQL_SERVER_TIMING', '0') not in ('0', 'false', 'no')
+
+# Perfilador bajo demanda (ver perfilador.py): endpoints a perfilar ('api_search,lider' o '*'), fracción de sus
+# requests que se perfilan y token para perfilar cualquier request con el encabezado `X-Perfil: <token>`.
+# El modo (PERFIL_MODO), el directorio (PERFIL_DIRECTORIO) y el intervalo de muestreo se leen en perfilador.py.
+app.config['PERFIL_RUTAS'] = [r.strip() for r in os.environ.get('PERFIL_RUTAS', '').split(',') if r.strip()]
+app.config['PERFIL_TASA'] = float(os.environ.get('PERFIL_TASA', '1'))
+app.config['PERFIL_TOKEN'] = os.environ.get('PERFIL_TOKEN') or None
+
+# Token de las rutas de monitoreo (/api/sql/stats, /api/render/stats, /api/catalogo/stats y /api/login/limites):
+# solo responden a requests con el encabezado `X-Monitoreo: <token>`. Por defecto es PERFIL_TOKEN; sin token, responden 404.
+app.config['MONITOREO_TOKEN'] = os.environ.get('MONITOREO_TOKEN') or app.config['PERFIL_TOKEN']
+
+# Caché de páginas renderizadas (ver cache_render.py): límite de memoria en bytes y de páginas. RENDER_CACHE=0 la desactiva.
+app.config['RENDER_CACHE'] = os.environ.get('RENDER_CACHE', '1') not in ('0', 'false', 'no')
+app.config['RENDER_CACHE_MAX_BYTES'] = int(os.environ.get('RENDER_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+app.config['RENDER_CACHE_MAX_PAGINAS'] = int(os.environ.get('RENDER_CACHE_MAX_PAGINAS', '256'))
+
+# Caché en disco del bytecode de las plantillas Jinja: los workers nuevos cargan las plantillas ya compiladas
+# (se invalida sola si cambia el fuente). PLANTILLAS_PRECOMPILAR compila todas las plantillas al iniciar:
+# 'auto' (por defecto) solo si no hay caché de bytecode o está vacía (con la caché llena cada plantilla
+# se carga en ~1 ms en su primer request y precompilarlas solo alarga el arranque; ver benchmarks/bench_arranque.py),
+# '1' siempre y '0' nunca.
+app.config['JINJA_BYTECODE_CACHE'] = os.environ.get('JINJA_BYTECODE_CACHE', '1') not in ('0', 'false', 'no')
+app.config['JINJA_BYTECODE_DIR'] = os.environ.get('JINJA_BYTECODE_DIR', os.path.join(app.instance_path, 'jinja_bytecode'))
+app.config['PLANTILLAS_PRECOMPILAR'] = os.environ.get('PLANTILLAS_PRECOMPILAR', 'auto')
+if app.config['JINJA_BYTECODE_CACHE']:
+    os.makedirs(app.config['JINJA_BYTECODE_DIR'], exist_ok=True)
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(app.config['JINJA_BYTECODE_DIR'])}
+if app.config['PLANTILLAS_PRECOMPILAR'] == 'auto':
+    app.config['PLANTILLAS_PRECOMPILAR'] = not (app.config['JINJA_BYTECODE_CACHE'] and os.listdir(app.config['JINJA_BYTECODE_DIR']))
+else:
+    app.config['PLANTILLAS_PRECOMPILAR'] = app.config['PLANTILLAS_PRECOMPILAR'] not in ('0', 'false', 'no')
+
+db = SQLAlchemy() # Se registra en la app de forma perezosa, con iniciar_db()
+_db_lock = threading.RLock()
+_db_estado = {'terminada': False} # True recién cuando terminó el primer intento (con o sin éxito)
+
+def iniciar_db():
+    """
+    Resuelve la URI, arma las opciones del pool y registra SQLAlchemy en la app (crea el engine,
+    que no abre conexiones hasta la primera consulta). Se llama una sola vez: antes del primer
+    request (ver _wsgi_con_db_perezosa) o desde los comandos de la CLI. Retorna True si la base
+    quedó configurada.
+    """
+    with _db_lock:
+        if 'sqlalchemy' in app.extensions:
+            return True
+        try:
+            uri = uri_base_datos(app.config['DATABASE_URL'])
+        except RuntimeError as e:
+            log.error("Base de datos no configurada: %s", e)
+            return False
+        app.config['SQLALCHEMY_DATABASE_URI'] = uri
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones_motor(
+            uri,
+            pool_size=app.config['DB_POOL_SIZE'],
+            max_overflow=app.config['DB_MAX_OVERFLOW'],
+            pool_timeout=app.config['DB_POOL_TIMEOUT'],
+            pool_recycle=app.config['DB_POOL_RECYCLE'],
+            pool_pre_ping=app.config['DB_POOL_PRE_PING'],
+        )
+        try:
+            db.init_app(app) # Importa el driver (pyodbc, sqlite3) y crea el engine
+        except Exception as e:
+            app.extensions.pop('sqlalchemy', None)
+            log.error("No se pudo crear el engine de la base de datos: %s", e)
+            return False
+        return True
+
+def _wsgi_con_db_perezosa(wsgi_app):
+    # Flask no permite registrar la extensión una vez atendido el primer request, así que se
+    # intenta justo antes de entregárselo. Los requests que llegan mientras tanto esperan en el lock
+    # a que termine, para que ninguno llegue a Flask con la extensión a medio registrar. Si falla
+    # (por ejemplo, sin db_config.py) no se reintenta: la app sigue sirviendo las páginas de las
+    # tiendas y solo fallan las rutas de autenticación.
+    def envoltura(environ, start_response):
+        if not _db_estado['terminada']:
+            with _db_lock:
+                if not _db_estado['terminada']:
+                    iniciar_db()
+                    _db_estado['terminada'] = True
+        return wsgi_app(environ, start_response)
+    return envoltura
+
+app.wsgi_app = _wsgi_con_db_perezosa(app.wsgi_app)
+
+metricas = None
+if app.config['METRICAS']:
+    metricas = Metricas()
+    metricas.init_app(app)
+    metricas.instrumentar_db(Engine) # Todas las sentencias SQL, sin importar cuándo se cree el engine
+
+perfilador_sql = None
+if app.config['SQL_PERFIL']:
+    perfilador_sql = PerfiladorSQL(
+        umbral_lento=app.config['SQL_LENTA_MS'] / 1000,
+        umbral_repeticiones=app.config['SQL_N_MAS_UNO_REPETICIONES'],
+        server_timing=app.config['SQL_SERVER_TIMING'],
+    )
+    perfilador_sql.init_app(app)
+    perfilador_sql.instrumentar(Engine)
+
+politica_hash = PoliticaHash(
+    metodo=app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    cola=app.config['PASSWORD_HASH_QUEUE'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+)
+
+limitador_login_ip = LimitadorTokenBucket(
+    app.config['LOGIN_LIMITE_IP'], app.config['LOGIN_TASA_IP_POR_MINUTO'] / 60,
+    max_claves=app.config['LOGIN_LIMITADOR_MAX_CLAVES']
+)
+limitador_login_usuario = LimitadorTokenBucket(
+    app.config['LOGIN_LIMITE_USUARIO'], app.config['LOGIN_TASA_USUARIO_POR_MINUTO'] / 60,
+    max_claves=app.config['LOGIN_LIMITADOR_MAX_CLAVES']
+)
+
+cache_disponibles = CacheNegativa(
+    ttl=app.config['DISPONIBILIDAD_CACHE_TTL'], max_claves=app.config['DISPONIBILIDAD_CACHE_MAX_CLAVES']
+)
+
+PerfiladorRutas(
+    rutas=app.config['PERFIL_RUTAS'], tasa=app.config['PERFIL_TASA'], token=app.config['PERFIL_TOKEN']
+).init_app(app)
+
+# Caché compartida de catálogos: cada JSON de static/data/ se parsea una vez y se recarga solo si cambia
+catalogo = CatalogoCache(
+    os.path.join(app.root_path, 'static', 'data'),
+    observador=metricas.observar_etapa if metricas is not None else None
+)
+
+cache_render = None
+if app.config['RENDER_CACHE']:
+    cache_render = CacheRender(
+        max_bytes=app.config['RENDER_CACHE_MAX_BYTES'], max_entradas=app.config['RENDER_CACHE_MAX_PAGINAS']
+    )
+
+MAX_PAGE_SIZE = 100
+MAX_RESULTADOS_BUSQUEDA = 50
+MAX_SUGERENCIAS = 10
 
 # Definición del modelo de Usuario
 class Usuario(db.Model):
@@ -37,6 +246,30 @@ class Usuario(db.Model):
     def __repr__(self):
         return f"<Usuario {self.nombre}>"
 
+# Columnas con restricción UNIQUE que se validan antes de registrar, por nombre de campo del formulario
+CAMPOS_UNICOS = {'username': Usuario.nombre, 'email': Usuario.email}
+
+def campos_ocupados(**valores):
+    """
+    Retorna el conjunto de campos ('username', 'email') cuyos valores ya existen en la DB.
+    Se resuelve con una sola consulta sobre los índices únicos: la comparación la hace la DB
+    (con su collation), y cada campo se marca con un MAX(CASE ...) en una única fila de resultado.
+    """
+    valores = {campo: valor for campo, valor in valores.items() if valor}
+    if not valores:
+        return set()
+    condiciones = [CAMPOS_UNICOS[campo] == valor for campo, valor in valores.items()]
+    fila = db.session.query(
+        *(func.max(case((condicion, 1), else_=0)) for condicion in condiciones)
+    ).filter(or_(*condiciones)).one()
+    return {campo for campo, ocupado in zip(valores, fila) if ocupado}
+
+# Mensajes de conflicto (409) por campo
+MENSAJES_OCUPADO = {
+    'username': 'El nombre de usuario ya existe.',
+    'email': 'El email ya está registrado.',
+}
+
 # --- Rutas de API para Autenticación ---
 
 @app.route('/api/register', methods=['POST'])
@@ -46,10 +279,10 @@ def api_register():
     Recibe los datos de registro (nombre, email, contraseña, confirmación, y celular).
     Valida los datos, hashea la contraseña y guarda el usuario en la DB.
     """
-    print("[DEBUG] Solicitud de registro recibida.")
+    log.debug("Solicitud de registro recibida.")
     try:
         data = request.get_json()
-        print(f"[DEBUG] Datos recibidos para registro: {data}")
+        log.debug("Datos recibidos para registro.", extra={'datos': data}) # Las contraseñas se redactan (ver logs.py)
 
         username = data.get('username')
         email = data.get('email')
@@ -59,22 +292,22 @@ def api_register():
 
         # Añadir 'celular' a la validación de campos requeridos
         if not username or not email or not password or not confirm_password or not celular:
-            print("[DEBUG] Error: Faltan campos requeridos en el registro (incluyendo celular).")
+            log.debug("Error: Faltan campos requeridos en el registro (incluyendo celular).")
             return jsonify({'success': False, 'message': 'Todos los campos son requeridos (Nombre de usuario, Email, Contraseña y Celular).'}), 400
 
         # Validación de que las contraseñas coincidan
         if password != confirm_password:
-            print("[DEBUG] Error: Las contraseñas no coinciden.")
+            log.debug("Error: Las contraseñas no coinciden.")
             return jsonify({'success': False, 'message': 'Las contraseñas no coinciden.'}), 400
 
         # Validación de formato de email
         if not re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email): 
-            print(f"[DEBUG] Error: Email inválido: {email}")
+            log.debug("Error: Email inválido: %s", email)
             return jsonify({'success': False, 'message': 'Por favor, ingresa un email válido.'}), 400
         
         # Opcional: Validación de formato de celular (ej. solo números, longitud)
         if not re.match(r'^\+56\s?9\d{8}$', celular):
-            print(f"[DEBUG] Error: Formato de celular inválido: {celular}")
+            log.debug("Error: Formato de celular inválido: %s", celular)
             return jsonify({'success': False, 'message': 'Por favor, ingresa un número de celular válido. Formato: +56 912345678.'}), 400
 
         # Validación de reglas de contraseña (reflejando la lógica del frontend)
@@ -82,23 +315,19 @@ def api_register():
                 any(char.isdigit() for char in password) and
                 any(char.isalpha() for char in password) and
                 any(not char.isalnum() for char in password)):
-            print("[DEBUG] Error: La contraseña no cumple con los requisitos.")
+            log.debug("Error: La contraseña no cumple con los requisitos.")
             return jsonify({'success': False, 'message': 'La contraseña no cumple con los requisitos: 6-12 caracteres, al menos un número, una letra y un carácter especial.'}), 400
 
-        # Verificar si el nombre de usuario o email ya existen en la base de datos
-        existing_user_username = Usuario.query.filter_by(nombre=username).first()
-        existing_user_email = Usuario.query.filter_by(email=email).first()
-
-        if existing_user_username:
-            print(f"[DEBUG] Error: Nombre de usuario '{username}' ya existe.")
-            return jsonify({'success': False, 'message': 'El nombre de usuario ya existe.'}), 409 # 409 Conflict
-        if existing_user_email:
-            print(f"[DEBUG] Error: Email '{email}' ya registrado.")
-            return jsonify({'success': False, 'message': 'El email ya está registrado.'}), 409
+        # Verificar si el nombre de usuario o email ya existen en la base de datos (una sola consulta)
+        ocupados = campos_ocupados(username=username, email=email)
+        for campo in ('username', 'email'):
+            if campo in ocupados:
+                log.debug("Error: %s ya registrado.", campo)
+                return jsonify({'success': False, 'message': MENSAJES_OCUPADO[campo]}), 409 # 409 Conflict
 
         # Hashear la contraseña antes de guardarla (CRUCIAL PARA LA SEGURIDAD)
-        hashed_password = generate_password_hash(password)
-        print("[DEBUG] Contraseña hasheada correctamente.")
+        hashed_password = politica_hash.generar(password)
+        log.debug("Contraseña hasheada correctamente.")
 
         # Crear una nueva instancia de Usuario
         new_user = Usuario(
@@ -110,16 +339,67 @@ def api_register():
 
         db.session.add(new_user) 
         db.session.commit() 
-        print(f"[DEBUG] Usuario '{username}' registrado y guardado en la DB.")
+        # Ya no están disponibles: se descartan de la caché negativa de /api/check-availability
+        cache_disponibles.descartar(('username', username))
+        cache_disponibles.descartar(('email', email))
+        log.info("Usuario '%s' registrado y guardado en la DB.", username)
         return jsonify({'success': True, 'message': '¡Registro exitoso! Ya puedes iniciar sesión.'}), 201 # 201 Created
+    except HashSaturado:
+        log.error("Pool de hashing saturado durante el registro.")
+        return jsonify({'success': False, 'message': 'El servidor está ocupado. Intenta nuevamente en unos segundos.'}), 503, {'Retry-After': '1'}
+    except IntegrityError as e:
+        # Otro registro con el mismo nombre o email ganó la carrera entre la verificación y el INSERT:
+        # se consulta cuál de las restricciones UNIQUE falló para responder el mismo 409 que arriba
+        db.session.rollback()
+        log.warning("Violación de integridad al registrar usuario: %s", e.orig)
+        try:
+            ocupados = campos_ocupados(username=username, email=email)
+        except Exception:
+            ocupados = set()
+        for campo in ('username', 'email'):
+            if campo in ocupados:
+                return jsonify({'success': False, 'message': MENSAJES_OCUPADO[campo]}), 409
+        return jsonify({'success': False, 'message': 'Error al registrar el usuario: los datos no cumplen las restricciones de la base de datos.'}), 400
     except Exception as e:
         db.session.rollback() # Revertir la transacción en caso de error
-        print(f"[ERROR] Error al registrar usuario: {e}") 
-        if "IntegrityError" in str(e):
-            message = "Error al registrar el usuario. Es posible que el nombre de usuario, email o celular ya existan, o hay un problema con los datos."
+        log.exception("Error al registrar usuario: %s", e)
+        return jsonify({'success': False, 'message': f'Error interno del servidor al registrar el usuario: {str(e)}'}), 500
+
+@app.route('/api/check-availability')
+def api_check_availability():
+    """
+    Ruta de validación en vivo del formulario de registro.
+    Recibe `username` y/o `email` por query string y retorna si cada uno está disponible.
+    Los valores que se consultaron hace poco y no existían se responden desde la caché negativa,
+    sin ir a la DB; el resto se resuelve con una sola consulta.
+    """
+    valores = {campo: (request.args.get(campo) or '').strip() for campo in CAMPOS_UNICOS}
+    valores = {campo: valor for campo, valor in valores.items() if valor}
+    if not valores:
+        return jsonify({'success': False, 'message': 'Indica username y/o email.'}), 400
+    if any(len(valor) > 100 for valor in valores.values()):
+        return jsonify({'success': False, 'message': 'Valor demasiado largo.'}), 400
+
+    disponible = {}
+    pendientes = {}
+    for campo, valor in valores.items():
+        if cache_disponibles.contiene((campo, valor)):
+            disponible[campo] = True
         else:
-            message = f'Error interno del servidor al registrar el usuario: {str(e)}' 
-        return jsonify({'success': False, 'message': message}), 500
+            pendientes[campo] = valor
+
+    if pendientes:
+        try:
+            ocupados = campos_ocupados(**pendientes)
+        except Exception as e:
+            log.exception("Error al verificar disponibilidad: %s", e)
+            return jsonify({'success': False, 'message': 'Error interno del servidor al verificar disponibilidad.'}), 500
+        for campo, valor in pendientes.items():
+            disponible[campo] = campo not in ocupados
+            if disponible[campo]:
+                cache_disponibles.agregar((campo, valor))
+
+    return jsonify({'success': True, 'disponible': disponible}), 200
 
 @app.route('/api/login', methods=['POST'])
 def api_login():
@@ -128,192 +408,374 @@ def api_login():
     Recibe el identificador (nombre de usuario o email) y la contraseña.
     Verifica las credenciales y establece una sesión si son válidas.
     """
-    print("[DEBUG] Solicitud de login recibida.")
+    log.debug("Solicitud de login recibida.")
     try:
         data = request.get_json()
-        print(f"[DEBUG] Datos recibidos para login: {data}")
+        log.debug("Datos recibidos para login.", extra={'datos': data})
 
         identifier = data.get('identifier') # Puede ser nombre de usuario o email
         password = data.get('password')
 
         if not identifier or not password:
-            print("[DEBUG] Error: Faltan credenciales en el login.")
+            log.debug("Error: Faltan credenciales en el login.")
             return jsonify({'success': False, 'message': 'Ingresa tu nombre de usuario/email y contraseña.'}), 400
 
+        # Limitar intentos por IP y por usuario/email antes de tocar la DB o calcular el hash
+        permitido, espera = limitador_login_ip.permitir(request.remote_addr)
+        if permitido:
+            permitido, espera = limitador_login_usuario.permitir(identifier.strip().lower())
+        if not permitido:
+            log.warning("Demasiados intentos de login desde %s.", request.remote_addr)
+            return jsonify({'success': False, 'message': 'Demasiados intentos de inicio de sesión. Espera un momento e intenta nuevamente.'}), 429, {'Retry-After': str(math.ceil(espera))}
+
         # Buscar al usuario por nombre de usuario o por email
         user = Usuario.query.filter(
             (Usuario.nombre == identifier) | (Usuario.email == identifier)
         ).first()
 
         if user:
-            print(f"[DEBUG] Usuario encontrado en la DB: {user.nombre}")
+            log.debug("Usuario encontrado en la DB: %s", user.nombre)
             # Verificar si la contraseña es correcta (usando el hash)
-            if check_password_hash(user.contrasena, password):
+            if politica_hash.verificar(user.contrasena, password):
+                # Si el hash usa un método o costo anterior a la política actual, se actualiza de forma transparente
+                if politica_hash.necesita_rehash(user.contrasena):
+                    try:
+                        user.contrasena = politica_hash.generar(password)
+                        db.session.commit()
+                        log.info("Hash de contraseña actualizado a la política actual para: %s", user.nombre)
+                    except Exception as e:
+                        db.session.rollback()
+                        log.error("No se pudo actualizar el hash de contraseña: %s", e)
+
                 # Establecer la sesión del usuario
                 session['user_id'] = user.id_usuario
                 session['username'] = user.nombre
-                print(f"[DEBUG] Sesión establecida para usuario: {session.get('username')}")
+                log.debug("Sesión establecida para usuario: %s", user.nombre)
                 return jsonify({'success': True, 'message': 'Inicio de sesión exitoso.'}), 200
             else:
-                print("[DEBUG] Error: Contraseña incorrecta para el usuario encontrado.")
+                log.debug("Error: Contraseña incorrecta para el usuario encontrado.")
                 return jsonify({'success': False, 'message': 'Usuario o contraseña incorrectos.'}), 401 
         else:
-            print(f"[DEBUG] Error: Usuario '{identifier}' no encontrado en la DB.")
+            log.debug("Error: Usuario '%s' no encontrado en la DB.", identifier)
             return jsonify({'success': False, 'message': 'Usuario o contraseña incorrectos.'}), 401 
+    except HashSaturado:
+        log.error("Pool de hashing saturado durante el login.")
+        return jsonify({'success': False, 'message': 'El servidor está ocupado. Intenta nuevamente en unos segundos.'}), 503, {'Retry-After': '1'}
     except Exception as e:
-        print(f"[ERROR] Error durante el login: {e}")
+        log.exception("Error durante el login: %s", e)
         return jsonify({'success': False, 'message': f'Error interno del servidor durante el login: {str(e)}'}), 500
 
 
+def construir_indice_sugerencias(catalogos):
+    return IndiceSugerencias(catalogos, limite=MAX_SUGERENCIAS)
+
+def constructor_indice_busqueda(tienda):
+    """Constructor del índice de búsqueda de `tienda` para catalogo.get_derivado (indexa también el nombre de la tienda)."""
+    return partial(IndiceTienda, tienda=tienda.nombre)
+
+@app.route('/static/data/<path:filename>')
+def static_data(filename):
+    """
+    Sirve los archivos de catálogo de static/data/ con un ETag fuerte derivado de su versión
+    (mtime y tamaño), Last-Modified y Cache-Control. Responde 304 si el navegador ya tiene la versión vigente.
+    Si existe una variante precomprimida que el navegador acepta, se envía esa.
+    """
+    ruta = safe_join(catalogo.base_dir, filename)
+    firma = firma_archivo(ruta) if ruta is not None else None
+    if firma is None or not os.path.isfile(ruta):
+        abort(404)
+
+    # Variante precomprimida (.br / .gz generada por publicar.py) según Accept-Encoding, sin comprimir por request
+    codificacion, ruta_servida = variante_comprimida(ruta, request.accept_encodings)
+
+    def construir():
+        response = send_from_directory(
+            catalogo.base_dir, os.path.relpath(ruta_servida, catalogo.base_dir),
+            # La variante conserva el tipo del JSON original; la compresión va en Content-Encoding
+            mimetype=mimetypes.guess_type(filename)[0] if codificacion is not None else None,
+            etag=False, conditional=False
+        )
+        if codificacion is not None:
+            response.content_encoding = codificacion
+        return response
+
+    response = respuesta_condicional([firma], construir, app.config['CATALOGO_MAX_AGE'], filename, codificacion)
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """
+    Ruta de métricas en formato de texto de Prometheus: requests, latencia, tamaño y errores
+    por ruta, y duración de las etapas (carga de catálogos, índices, plantillas y DB).
+    """
+    if metricas is None:
+        abort(404)
+    return Response(metricas.exportar(), content_type=TIPO_CONTENIDO)
+
+def exigir_token_monitoreo():
+    """Corta con 404 los requests a rutas de monitoreo que no traen `X-Monitoreo: <MONITOREO_TOKEN>`."""
+    token = app.config['MONITOREO_TOKEN']
+    if not token or not hmac.compare_digest(request.headers.get('X-Monitoreo', '').encode(), token.encode()):
+        abort(404)
+
+@app.route('/api/sql/stats')
+def api_sql_stats():
+    """
+    Ruta de monitoreo del perfilador SQL.
+    Retorna la cantidad de consultas, consultas lentas, avisos de N+1 y las últimas consultas lentas.
+    """
+    exigir_token_monitoreo()
+    if perfilador_sql is None:
+        abort(404)
+    return jsonify(perfilador_sql.stats()), 200
+
+@app.route('/api/render/stats')
+def api_render_stats():
+    """
+    Ruta de monitoreo de la caché de páginas renderizadas.
+    Retorna hits, misses, desalojos, páginas guardadas y memoria usada.
+    """
+    exigir_token_monitoreo()
+    if cache_render is None:
+        abort(404)
+    return jsonify(cache_render.stats()), 200
+
+@app.route('/api/catalogo/stats')
+def api_catalogo_stats():
+    """
+    Ruta de monitoreo de la caché de catálogos.
+    Retorna los contadores de hits, misses y recargas.
+    """
+    exigir_token_monitoreo()
+    return jsonify(catalogo.stats()), 200
+
+@app.route('/api/productos/<tienda>')
+def api_productos(tienda):
+    """
+    Ruta de productos paginados y filtrados en el servidor.
+    Recibe los mismos filtros que los controles de las plantillas (categoria, marca, precio,
+    descuento, orden) más page y page_size, y retorna solo la página pedida con el total.
+    La lista de marcas del catálogo se incluye solo con `marcas=1` (basta pedirla una vez).
+    """
+    if tienda not in TIENDAS:
+        return jsonify({'success': False, 'message': f'Tienda desconocida: {tienda}'}), 404
+    archivo = TIENDAS[tienda].archivo
+
+    page = max(1, request.args.get('page', 1, type=int))
+    page_size = min(MAX_PAGE_SIZE, max(1, request.args.get('page_size', 8, type=int)))
+    orden = request.args.get('orden', 'recomendados')
+    if orden not in ORDENES:
+        return jsonify({'success': False, 'message': f'Orden inválido: {orden}'}), 400
+
+    def construir():
+        indexado = catalogo.get_derivado(archivo, 'consultas', CatalogoIndexado)
+        resultados = indexado.consultar(
+            categoria=request.args.get('categoria'),
+            marca=request.args.get('marca'),
+            precio=request.args.get('precio'),
+            descuento=request.args.get('descuento'),
+            orden=orden,
+        )
+        pagina, total_pages = paginar(resultados, page, page_size)
+        datos = {
+            'success': True,
+            'tienda': tienda,
+            'total': len(resultados),
+            'page': page,
+            'page_size': page_size,
+            'total_pages': total_pages,
+            'productos': [p.producto for p in pagina],
+        }
+        if request.args.get('marcas') == '1':
+            datos['marcas'] = indexado.marcas
+        return jsonify(datos), 200
+
+    # Si el navegador ya tiene esta página para la versión vigente del catálogo, se responde 304 sin filtrar ni serializar
+    return respuesta_condicional(
+        [catalogo.firma(archivo)], construir, app.config['CATALOGO_MAX_AGE'],
+        request.path, request.query_string
+    )
+
+@app.route('/api/productos/<tienda>.ndjson')
+def api_productos_ndjson(tienda):
+    """
+    Exportación del catálogo de una tienda en formato NDJSON (un producto por línea), enviada
+    en streaming desde el catálogo en caché, así la memoria no crece con el tamaño del catálogo.
+    Acepta los mismos filtros que /api/productos/<tienda> (sin paginación) y `fields`
+    para elegir los campos de cada producto (por ejemplo ?fields=nombre,precio_oferta).
+    """
+    if tienda not in TIENDAS:
+        return jsonify({'success': False, 'message': f'Tienda desconocida: {tienda}'}), 404
+    archivo = TIENDAS[tienda].archivo
+
+    orden = request.args.get('orden', 'recomendados')
+    if orden not in ORDENES:
+        return jsonify({'success': False, 'message': f'Orden inválido: {orden}'}), 400
+    campos = [campo.strip() for campo in request.args.get('fields', '').split(',') if campo.strip()]
+
+    def construir():
+        indexado = catalogo.get_derivado(archivo, 'consultas', CatalogoIndexado)
+        # iterar() recorre la lista ya ordenada del catálogo en caché sin copiarla ni acumular resultados
+        resultados = indexado.iterar(
+            categoria=request.args.get('categoria'),
+            marca=request.args.get('marca'),
+            precio=request.args.get('precio'),
+            descuento=request.args.get('descuento'),
+            orden=orden,
+        )
+        return Response(lineas_ndjson(resultados, campos), mimetype='application/x-ndjson')
+
+    return respuesta_condicional(
+        [catalogo.firma(archivo)], construir, app.config['CATALOGO_MAX_AGE'],
+        request.path, request.query_string
+    )
+
+@app.route('/api/search')
+def api_search():
+    """
+    Ruta de búsqueda de productos en todas las tiendas.
+    Usa un índice invertido por tienda con ranking BM25 sobre nombre, marca, descripción y nombre de la tienda.
+    Recibe el texto en `q` y la cantidad de resultados en `k`.
+    """
+    consulta = request.args.get('q', '').strip()
+    k = min(MAX_RESULTADOS_BUSQUEDA, max(1, request.args.get('k', 10, type=int)))
+
+    def construir():
+        # Cada índice se reconstruye solo cuando cambia el archivo de su tienda
+        indices = [
+            (tienda.slug, catalogo.get_derivado(tienda.archivo, 'busqueda', constructor_indice_busqueda(tienda)))
+            for tienda in TIENDAS.values()
+        ]
+        resultados = [
+            {
+                'tienda': tienda,
+                'supermercado': TIENDAS[tienda].nombre,
+                'puntaje': round(puntaje, 4),
+                'precio': item.precio,
+                'precio_original': item.precio_original,
+                'descuento': item.descuento,
+                'producto': item.producto,
+            }
+            for puntaje, tienda, item in buscar(indices, consulta, k)
+        ]
+        return jsonify({'success': True, 'q': consulta, 'total': len(resultados), 'resultados': resultados}), 200
+
+    firmas = [catalogo.firma(archivo) for archivo in archivos_tiendas()]
+    return respuesta_condicional(firmas, construir, app.config['CATALOGO_MAX_AGE'], request.path, consulta, k)
+
+@app.route('/api/suggest')
+def api_suggest():
+    """
+    Ruta de autocompletado para la búsqueda mientras se escribe.
+    Retorna hasta `n` nombres de productos o marcas que empiezan con el texto `q`,
+    ordenados por popularidad y descuento.
+    """
+    consulta = request.args.get('q', '')
+    n = min(MAX_SUGERENCIAS, max(1, request.args.get('n', MAX_SUGERENCIAS, type=int)))
+    def construir():
+        # El índice es común a todas las tiendas y se reconstruye solo cuando cambia alguno de sus archivos
+        indice = catalogo.get_derivado_combinado(
+            archivos_tiendas(), 'sugerencias', construir_indice_sugerencias
+        )
+        return jsonify({'success': True, 'q': consulta, 'sugerencias': indice.sugerir(consulta, n)}), 200
+
+    firmas = [catalogo.firma(archivo) for archivo in archivos_tiendas()]
+    return respuesta_condicional(firmas, construir, app.config['CATALOGO_MAX_AGE'], request.path, consulta, n)
+
+@app.route('/api/login/limites')
+def api_login_limites():
+    """
+    Ruta de monitoreo del limitador de intentos de login.
+    Retorna los contadores por IP y por usuario/email.
+    """
+    exigir_token_monitoreo()
+    return jsonify({'ip': limitador_login_ip.stats(), 'usuario': limitador_login_usuario.stats()}), 200
+
 @app.route('/api/logout', methods=['POST'])
 def api_logout():
     """
     Ruta para cerrar la sesión del usuario.
     Elimina la información del usuario de la sesión.
     """
-    print("[DEBUG] Solicitud de logout recibida.")
+    log.debug("Solicitud de logout recibida.")
     session.pop('user_id', None) 
     session.pop('username', None) 
-    print("[DEBUG] Sesión cerrada.")
+    log.debug("Sesión cerrada.")
     return jsonify({'success': True, 'message': 'Sesión cerrada exitosamente.'}), 200
 
 # --- Rutas de Renderizado de Páginas HTML ---
 
+def renderizar_pagina(plantilla, instantaneas=(), **contexto):
+    """
+    Renderiza una página cuya única parte por usuario es el encabezado (sesión iniciada o no, y el nombre).
+    Con la caché activa, el HTML se reutiliza mientras no cambien la plantilla ni los catálogos de
+    `instantaneas`; por request solo se sustituye el nombre de usuario (ver cache_render.py).
+    Los productos del contexto deben venir de esas mismas instantáneas, para que el HTML quede
+    guardado bajo la versión de catálogo con la que se renderizó.
+    """
+    username = session.get('username', 'Invitado')
+    if cache_render is None:
+        return render_template(plantilla, username=username, **contexto)
+
+    autenticado = bool(username) and username != 'Invitado'
+    clave = (
+        plantilla,
+        firma_archivo(os.path.join(app.root_path, app.template_folder, plantilla)),
+        tuple(instantanea.firma if instantanea is not None else None for instantanea in instantaneas),
+        autenticado,
+    )
+    return cache_render.obtener(
+        clave,
+        lambda: render_template(plantilla, username=MARCA_USUARIO if autenticado else 'Invitado', **contexto),
+        username,
+    )
+
 @app.route("/")
 def home():
     # Obtener el nombre de usuario de la sesión, si existe. Si no, es 'Invitado'.
-    username = session.get('username', 'Invitado')
-    print(f"[DEBUG] Accediendo a la página de inicio. Usuario actual: {username}")
-    return render_template("home.html", username=username)
+    log.debug("Accediendo a la página de inicio. Usuario actual: %s", session.get('username', 'Invitado'))
+    return renderizar_pagina("home.html")
 
 # Rutas para las páginas de supermercados
-# Ahora incluyen manejo de errores para FileNotFoundError
-@app.route("/lider")
-def lider():
-    print("[DEBUG] Accediendo a Lider.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_lider.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_lider.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("lider.html", productos=productos, username=username)
-
-@app.route('/jumbo')
-def jumbo():
-    print("[DEBUG] Accediendo a Jumbo.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_jumbo.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_jumbo.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("jumbo.html", productos=productos, username=username)
-
-@app.route('/santaisabel')
-def santaisabel():
-    print("[DEBUG] Accediendo a Santa Isabel.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_santa_isabel_selenium.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_santa_isabel_selenium.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("santaisabel.html", productos=productos, username=username)
-
-@app.route('/unimarc')
-def unimarc():
-    print("[DEBUG] Accediendo a Unimarc.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_unimarc.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_unimarc.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("unimarc.html", productos=productos, username=username)
-
-@app.route('/tottus')
-def tottus():
-    print("[DEBUG] Accediendo a Tottus.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_tottus.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_tottus.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("tottus.html", productos=productos, username=username)
-
-@app.route('/mayorista10')
-def mayorista10():
-    print("[DEBUG] Accediendo a Mayorista 10.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_mayorista10.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_mayorista10.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("mayorista10.html", productos=productos, username=username)
-
-@app.route('/alvi')
-def alvi():
-    print("[DEBUG] Accediendo a Alvi.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_alvi.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_alvi.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("alvi.html", productos=productos, username=username)
-
-@app.route('/oxxo')
-def oxxo():
-    print("[DEBUG] Accediendo a Oxxo.")
-    username = session.get('username', 'Invitado')
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_oxxo.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_oxxo.json no encontrado en static/data/. La página se cargará sin productos.")
-    return render_template("oxxo.html", productos=productos, username=username)
+# Se generan a partir del registro de tiendas (tiendas.py); el endpoint de cada una es su slug,
+# así que url_for('lider'), url_for('jumbo'), etc. siguen funcionando en las plantillas.
+def crear_vista_tienda(tienda):
+    def vista_tienda():
+        log.debug("Accediendo a %s.", tienda.nombre)
+        instantanea = catalogo.instantanea(tienda.archivo) # None si el archivo no existe
+        productos = instantanea.productos if instantanea is not None else []
+        return renderizar_pagina(tienda.plantilla, [instantanea], productos=productos)
+    return vista_tienda
+
+for _tienda in TIENDAS.values():
+    app.add_url_rule(f'/{_tienda.slug}', endpoint=_tienda.slug, view_func=crear_vista_tienda(_tienda))
 
 """para pruebas"""
 @app.route('/ofertas')
 def ofertas():
-    print("[DEBUG] Accediendo a Ofertas.")
-    username = session.get('username', 'Invitado') # Pasa el username a la plantilla
-    productos = [] # Inicializa como lista vacía
-    try:
-        with open("static/data/productos_santa_isabel_selenium.json", "r", encoding="utf-8") as f:
-            productos = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Archivo productos_santa_isabel_selenium.json no encontrado en static/data/ para /ofertas. La página se cargará sin productos.")
-    return render_template("ofertas.html", productos=productos, username=username)
+    log.debug("Accediendo a Ofertas.")
+    instantanea = catalogo.instantanea(TIENDAS['santaisabel'].archivo)
+    productos = instantanea.productos if instantanea is not None else []
+    return renderizar_pagina("ofertas.html", [instantanea], productos=productos)
 
 # Ruta para la página de login
 @app.route('/login', endpoint='login')
 def login_page():
-    print("[DEBUG] Accediendo a la página de login.")
+    log.debug("Accediendo a la página de login.")
     # Si el usuario ya está logueado y intenta ir a /login, redirigirlo a home
     if 'user_id' in session:
-        print("[DEBUG] Usuario ya autenticado, redirigiendo a home.")
+        log.debug("Usuario ya autenticado, redirigiendo a home.")
         return redirect(url_for('home'))
     return render_template('login.html')
 
 # Ruta para 'Mi Cuenta'
 @app.route('/mi_cuenta')
 def mi_cuenta():
-    print("[DEBUG] Accediendo a la página de 'Mi Cuenta'.")
+    log.debug("Accediendo a la página de 'Mi Cuenta'.")
     # Proteger esta ruta: si no hay sesión, redirigir al login
     if 'user_id' not in session:
-        print("[DEBUG] Usuario no autenticado intentó acceder a 'Mi Cuenta'. Redirigiendo a login.")
+        log.debug("Usuario no autenticado intentó acceder a 'Mi Cuenta'. Redirigiendo a login.")
         return redirect(url_for('login'))
 
     username = session.get('username')
@@ -323,20 +785,75 @@ def mi_cuenta():
 
     return render_template('mi_cuenta.html', username=username)
 
-# Bloque de ejecución principal
-if __name__ == "__main__":
+@app.cli.command('publicar-catalogos')
+def publicar_catalogos():
+    """Minifica los JSON de static/data/ y genera sus variantes .gz/.br (ver publicar.py)."""
+    for nombre, tamanos in publicar_directorio(catalogo.base_dir).items():
+        detalle = ', '.join(f"{formato}: {tamano:,} bytes" for formato, tamano in tamanos.items())
+        print(f"[INFO] {nombre} publicado ({detalle})")
+
+@app.cli.command('init-db')
+def init_db():
+    """Crea las tablas de la base de datos que no existan."""
+    if not iniciar_db():
+        raise SystemExit(1)
     with app.app_context():
-        # Crea las tablas de la base de datos si no existen
         db.create_all()
-        print("[DEBUG] Se verificó la creación de tablas en la base de datos.")
-    
-    # --- Solución temporal para el problema de sesión iniciada al inicio (solo para depuración) ---
-    # Este bloque solo debería usarse durante el desarrollo.
-    # En producción, no querrías borrar las sesiones al reiniciar el servidor.
-    with app.test_request_context(): 
-        session.clear()
-        print("[DEBUG] Sesión limpiada al iniciar la aplicación (solo para depuración).")
-    # --- Fin de la solución temporal ---
-
-    print("[DEBUG] La aplicación Flask está iniciando en modo depuración.")
+    print(f"[INFO] Tablas verificadas en {db.engine.url.render_as_string(hide_password=True)}")
+
+def precargar_catalogos():
+    """
+    Carga en memoria los catálogos de todas las tiendas y construye sus índices (consultas,
+    búsqueda y autocompletado), para que el primer request después de un despliegue no pague ese costo.
+    Los archivos que no existen se reportan aquí, una sola vez.
+    """
+    for tienda in TIENDAS.values():
+        catalogo.get_derivado(tienda.archivo, 'consultas', CatalogoIndexado)
+        catalogo.get_derivado(tienda.archivo, 'busqueda', constructor_indice_busqueda(tienda))
+    catalogo.get_derivado_combinado(archivos_tiendas(), 'sugerencias', construir_indice_sugerencias)
+
+    for tienda in TIENDAS.values():
+        if not os.path.exists(os.path.join(app.root_path, app.template_folder, tienda.plantilla)):
+            log.error("Plantilla %s de %s no encontrada en templates/.", tienda.plantilla, tienda.nombre)
+    log.info("Catálogos precargados: %s", catalogo.stats()['archivos'])
+
+def precompilar_plantillas():
+    """
+    Compila todas las plantillas HTML y las deja en la caché del entorno Jinja (y en la caché de
+    bytecode en disco), para que el primer request de cada página no pague la compilación.
+    """
+    inicio = time.perf_counter()
+    nombres = app.jinja_env.list_templates(extensions=['html'])
+    for nombre in nombres:
+        try:
+            app.jinja_env.get_template(nombre)
+        except Exception as e:
+            log.error("No se pudo compilar la plantilla %s: %s", nombre, e)
+    log.info("%d plantillas precompiladas en %.1f ms.", len(nombres), (time.perf_counter() - inicio) * 1000)
+
+def precargar():
+    if app.config['PLANTILLAS_PRECOMPILAR']:
+        precompilar_plantillas()
+    if app.config['CATALOGO_PRECARGA'] != 'off':
+        precargar_catalogos()
+
+# Precarga al iniciar (plantillas y catálogos): 'sync' (por defecto) bloquea el arranque hasta terminar,
+# 'background' la hace en un hilo aparte y 'off' desactiva la de catálogos (carga perezosa en el primer request)
+app.config['CATALOGO_PRECARGA'] = os.environ.get('CATALOGO_PRECARGA', 'sync')
+if app.config['CATALOGO_PRECARGA'] == 'background':
+    threading.Thread(target=precargar, name='precarga', daemon=True).start()
+else:
+    precargar()
+
+# Recarga en caliente: un hilo revisa los catálogos cada CATALOGO_VIGILANCIA_S segundos y publica
+# las versiones nuevas (ya indexadas) sin que los requests consulten el disco. 0 la desactiva y
+# cada request compara la fecha de modificación del archivo, como antes.
+app.config['CATALOGO_VIGILANCIA_S'] = float(os.environ.get('CATALOGO_VIGILANCIA_S', '2'))
+if app.config['CATALOGO_VIGILANCIA_S'] > 0:
+    catalogo.iniciar_vigilancia(app.config['CATALOGO_VIGILANCIA_S'])
+
+# Bloque de ejecución principal
+# Las tablas se crean con `flask --app app init-db`; al iniciar no se abre ninguna conexión a la base.
+if __name__ == "__main__":
+    log.info("La aplicación Flask está iniciando en modo depuración.")
     app.run(debug=True) # Ejecuta la aplicación en modo depuración (no usar en producción)
\ No newline at end of file
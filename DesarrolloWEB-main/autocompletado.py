@@ -0,0 +1,113 @@
+import heapq
+from bisect import bisect_left
+
+from buscador import tokenizar
+from consultas import indexar_producto
+
+# Rangos con más entradas que este umbral tienen su top precalculado; los menores se recorren en cada consulta
+UMBRAL_PRECALCULO = 256
+
+
+def normalizar_frase(texto):
+    """Normaliza un nombre o marca a tokens en minúsculas sin acentos separados por un espacio."""
+    return ' '.join(tokenizar(texto))
+
+
+class IndiceSugerencias:
+    """
+    Índice de prefijos para autocompletar nombres de productos y marcas de todas las tiendas.
+
+    Cada frase normalizada se guarda una vez (con su popularidad: cuántos productos la comparten,
+    y el mayor descuento entre ellos). Se indexa por su inicio y por el inicio de cada palabra,
+    en un arreglo ordenado que se consulta con bisect. Para los prefijos que abarcan muchas
+    entradas (por ejemplo 'le'), el top se precalcula al construir el índice, así ninguna
+    consulta recorre más de UMBRAL_PRECALCULO entradas.
+    """
+
+    def __init__(self, catalogos, limite=10):
+        self.limite = limite
+        self.textos = [] # texto original de cada frase
+        self.tipos = [] # 'producto' o 'marca'
+        self.puntajes = [] # (popularidad, descuento) de cada frase
+        posiciones = {} # (tipo, frase normalizada) -> id de la frase
+
+        for productos in catalogos:
+            for producto in productos:
+                if not isinstance(producto, dict):
+                    continue
+                descuento = indexar_producto(producto).descuento
+                for tipo, texto in (('producto', producto.get('nombre')), ('marca', producto.get('marca'))):
+                    frase = normalizar_frase(texto)
+                    if not frase or frase == 'n a':
+                        continue
+                    id_frase = posiciones.get((tipo, frase))
+                    if id_frase is None:
+                        id_frase = posiciones[(tipo, frase)] = len(self.textos)
+                        self.textos.append(texto.strip())
+                        self.tipos.append(tipo)
+                        self.puntajes.append((1, descuento))
+                    else:
+                        popularidad, mejor_descuento = self.puntajes[id_frase]
+                        self.puntajes[id_frase] = (popularidad + 1, max(mejor_descuento, descuento))
+
+        # Una entrada por cada inicio de palabra: 'leche colun' se encuentra con 'lec' y con 'col'
+        entradas = []
+        for (_, frase), id_frase in posiciones.items():
+            inicio = 0
+            while inicio != -1:
+                entradas.append((frase[inicio:], id_frase))
+                inicio = frase.find(' ', inicio)
+                if inicio != -1:
+                    inicio += 1
+        entradas.sort()
+        self.claves = [clave for clave, _ in entradas]
+        self.ids = [id_frase for _, id_frase in entradas]
+
+        self.precalculados = {}
+        self._precalcular()
+
+    def _top(self, inicio, fin):
+        """Retorna los ids de las mejores frases distintas del rango [inicio, fin) de entradas."""
+        return heapq.nlargest(self.limite, set(self.ids[inicio:fin]), key=self.puntajes.__getitem__)
+
+    def _precalcular(self):
+        """Calcula el top de cada prefijo cuyo rango supera el umbral, bajando letra a letra solo por los rangos grandes."""
+        pendientes = [(0, len(self.claves), 0)] # (inicio, fin, largo del prefijo común)
+        while pendientes:
+            inicio, fin, largo = pendientes.pop()
+            i = inicio
+            # Las claves que terminan justo en el prefijo quedan al comienzo del rango (orden lexicográfico)
+            while i < fin and len(self.claves[i]) <= largo:
+                i += 1
+            while i < fin:
+                prefijo = self.claves[i][:largo + 1]
+                j = bisect_left(self.claves, prefijo + '\uffff', i, fin)
+                if j - i > UMBRAL_PRECALCULO:
+                    self.precalculados[prefijo] = self._top(i, j)
+                    pendientes.append((i, j, largo + 1))
+                i = j
+
+    def sugerir(self, consulta, limite=None):
+        """
+        Retorna hasta `limite` sugerencias para el texto `consulta`, ordenadas por popularidad y descuento.
+        Cada sugerencia es un diccionario con el texto, su tipo, popularidad y descuento.
+        """
+        limite = min(limite or self.limite, self.limite)
+        prefijo = normalizar_frase(consulta)
+        if not prefijo:
+            return []
+
+        ids = self.precalculados.get(prefijo)
+        if ids is None:
+            inicio = bisect_left(self.claves, prefijo)
+            fin = bisect_left(self.claves, prefijo + '\uffff', inicio)
+            ids = self._top(inicio, fin)
+        return [
+            {
+                'texto': self.textos[i],
+                'tipo': self.tipos[i],
+                'popularidad': self.puntajes[i][0],
+                'descuento': self.puntajes[i][1],
+            }
+            for i in ids[:limite]
+        ]
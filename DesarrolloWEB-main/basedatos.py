@@ -0,0 +1,62 @@
+"""
+Configuración de la conexión a la base de datos.
+
+Por defecto se usa SQL Server con conexión de confianza (datos en db_config.py). Con la variable
+DATABASE_URL se puede usar cualquier URI de SQLAlchemy, por ejemplo SQLite para correr el modelo
+Usuario y las rutas de autenticación sin SQL Server:
+
+    DATABASE_URL=sqlite:///usuarios.db   (archivo en instance/)
+    DATABASE_URL=sqlite://               (en memoria, se pierde al cerrar)
+"""
+from sqlalchemy.engine import make_url
+
+
+def uri_sql_server():
+    """Arma la URI de SQL Server (trusted connection) a partir de db_config.DATABASE_CONFIG."""
+    try:
+        from db_config import DATABASE_CONFIG
+    except ImportError:
+        raise RuntimeError(
+            "No se encontró db_config.py. Créalo con DATABASE_CONFIG o define DATABASE_URL "
+            "(por ejemplo DATABASE_URL=sqlite:///usuarios.db)."
+        )
+    return (
+        f"mssql+pyodbc://@{DATABASE_CONFIG['server']}/{DATABASE_CONFIG['database']}"
+        f"?driver={DATABASE_CONFIG['driver'].replace(' ', '+')}&trusted_connection=yes"
+    )
+
+
+def uri_base_datos(database_url=None):
+    """Retorna la URI a usar: DATABASE_URL si está definida, si no la de SQL Server."""
+    return database_url or uri_sql_server()
+
+
+def es_sqlite_en_memoria(uri):
+    """Indica si la URI es una base SQLite en memoria (sqlite:// o sqlite:///:memory:)."""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def opciones_motor(uri, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800, pool_pre_ping=True):
+    """
+    Retorna las opciones del engine (SQLALCHEMY_ENGINE_OPTIONS) para la URI.
+
+    - pool_size / max_overflow: conexiones que se mantienen abiertas y cuántas extra se permiten en picos.
+    - pool_timeout: segundos que un request espera una conexión libre antes de fallar.
+    - pool_recycle: segundos tras los cuales se reemplaza una conexión (SQL Server y firewalls cortan
+      conexiones inactivas).
+    - pool_pre_ping: verifica la conexión al sacarla del pool, para no fallar con una conexión cortada.
+
+    SQLite en memoria usa una única conexión compartida (StaticPool, lo configura Flask-SQLAlchemy),
+    así que en ese caso no se pasan opciones de tamaño del pool.
+    """
+    opciones = {'pool_pre_ping': pool_pre_ping}
+    if es_sqlite_en_memoria(uri):
+        return opciones
+    opciones.update(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+    )
+    return opciones
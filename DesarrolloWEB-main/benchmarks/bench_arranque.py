@@ -0,0 +1,108 @@
+"""
+Benchmark de arranque en frío: tiempo hasta la primera respuesta de cada página.
+
+Cada variante levanta la aplicación en un proceso nuevo (como un worker recién creado tras un
+deploy o un autoescalado) y mide el tiempo de importar app.py y el del primer request a cada
+página HTML. Variantes:
+- sin caché: sin caché de bytecode de Jinja ni precompilación (cada plantilla se compila en su primer request);
+- bytecode frío: caché de bytecode en un directorio vacío (el primer worker la llena);
+- bytecode caliente: caché de bytecode ya llena por un worker anterior;
+- precompilar frío / caliente: todas las plantillas precompiladas al importar, con la caché vacía o llena.
+Con PLANTILLAS_PRECOMPILAR=auto (por defecto) la app usa 'precompilar frío' y 'bytecode caliente'.
+
+La caché de páginas renderizadas se desactiva y los catálogos se precargan en todas las variantes,
+para que la diferencia sea solo la compilación de plantillas.
+
+Uso:
+    python benchmarks/bench_arranque.py [repeticiones]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from tiendas import TIENDAS
+
+# Portada, una página por tienda registrada (que tenga plantilla), ofertas y login
+SIN_PLANTILLA = [t.slug for t in TIENDAS.values() if not os.path.exists(os.path.join(RAIZ, 'templates', t.plantilla))]
+PAGINAS = ['/'] + [f'/{slug}' for slug in TIENDAS if slug not in SIN_PLANTILLA] + ['/ofertas', '/login']
+
+
+def ejecutar_variante():
+    """Se ejecuta en el proceso hijo: la configuración llega por variables de entorno."""
+    os.chdir(RAIZ)
+    inicio = time.perf_counter()
+    from app import app
+    importacion = time.perf_counter() - inicio
+
+    cliente = app.test_client()
+    tiempos = {}
+    for pagina in PAGINAS:
+        inicio = time.perf_counter()
+        respuesta = cliente.get(pagina)
+        tiempos[pagina] = (time.perf_counter() - inicio, respuesta.status_code)
+    print(json.dumps({'importacion': importacion, 'paginas': tiempos}))
+
+
+def medir(entorno):
+    salida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--variante'],
+        env=entorno, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    base = dict(
+        os.environ,
+        DATABASE_URL='sqlite://',
+        CATALOGO_PRECARGA='sync',
+        RENDER_CACHE='0',
+        LOG_NIVEL='WARNING',
+    )
+    variantes = [
+        ('sin caché', {'JINJA_BYTECODE_CACHE': '0', 'PLANTILLAS_PRECOMPILAR': '0'}, False),
+        ('bytecode frío', {'PLANTILLAS_PRECOMPILAR': '0'}, False),
+        ('bytecode caliente', {'PLANTILLAS_PRECOMPILAR': '0'}, True),
+        ('precompilar frío', {'PLANTILLAS_PRECOMPILAR': '1'}, False),
+        ('precompilar caliente', {'PLANTILLAS_PRECOMPILAR': '1'}, True),
+    ]
+
+    print(f"Repeticiones: {repeticiones} (mediana) | páginas: {' '.join(PAGINAS)}")
+    if SIN_PLANTILLA:
+        print(f"Tiendas sin plantilla (no se miden): {', '.join(SIN_PLANTILLA)}")
+    print(f"{'variante':<20} {'import ms':>10} {'1ª página ms':>13} {'todas ms':>9} {'arranque+todas ms':>18}")
+    for nombre, ajustes, caliente in variantes:
+        importaciones, primeras, totales = [], [], []
+        for _ in range(repeticiones):
+            with tempfile.TemporaryDirectory() as directorio:
+                entorno = dict(base, JINJA_BYTECODE_DIR=directorio, **ajustes)
+                if caliente:
+                    medir(entorno) # Un worker anterior deja la caché de bytecode llena
+                r = medir(entorno)
+            paginas = r['paginas']
+            errores = [p for p, (_, estado) in paginas.items() if estado >= 500]
+            if errores:
+                print(f"  {nombre}: páginas con error: {', '.join(errores)}")
+            importaciones.append(r['importacion'])
+            primeras.append(paginas[PAGINAS[0]][0])
+            totales.append(sum(t for t, _ in paginas.values()))
+
+        importacion = statistics.median(importaciones) * 1000
+        total = statistics.median(totales) * 1000
+        print(f"{nombre:<20} {importacion:>10.1f} {statistics.median(primeras) * 1000:>13.1f} "
+              f"{total:>9.1f} {importacion + total:>18.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--variante':
+        ejecutar_variante()
+    else:
+        main()
@@ -0,0 +1,123 @@
+"""
+Benchmark de extracción de tarjetas de producto: modo por elementos vs. modo 'js' (extraccion.py).
+
+Abre la página de ofertas de la tienda (o un HTML guardado con --html, para comparar siempre
+la misma página) en un Chrome sin ventana, espera a que cargue y extrae los productos de la página
+con cada modo varias veces. Reporta la mediana del tiempo, los comandos WebDriver (viajes de ida y
+vuelta a ChromeDriver) por página y si ambos modos obtienen los mismos productos.
+
+Requiere Chrome y los paquetes de los scrapers (selenium y, opcionalmente, webdriver-manager).
+
+Uso:
+    python benchmarks/bench_extraccion.py [unimarc|santaisabel] [repeticiones] [--html ruta.html]
+"""
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import extraccion
+from esperas import esperar_contenido
+from navegadores import crear_driver
+
+URLS = {
+    'unimarc': "https://www.unimarc.cl/ofertas/ofertas-unimarc",
+    'santaisabel': "https://www.santaisabel.cl/santas-ofertas?nombre_promo=menu-conoce-todas-las-ofertas-30012024",
+}
+
+
+def contar_comandos(driver):
+    """Envuelve driver.execute (por donde pasan todos los comandos, también los de WebElement) para contarlos."""
+    contador = {'comandos': 0}
+    execute = driver.execute
+
+    def execute_contado(*args, **kwargs):
+        contador['comandos'] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = execute_contado
+    return contador
+
+
+def modos_unimarc(driver):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from ScrapingUnimarc import SELECTOR_PRODUCTOS, UnimarcScraper
+
+    scraper = UnimarcScraper(headless=True)
+    scraper.driver = driver
+    scraper.wait = WebDriverWait(driver, 15)
+
+    def elementos():
+        return [scraper.extract_product_data(e, i + 1) for i, e in enumerate(scraper.find_product_containers())]
+
+    return SELECTOR_PRODUCTOS, {'elementos': elementos, 'js': scraper.extract_page_products}
+
+
+def modos_santaisabel(driver):
+    from ScrapingSantaIsabel import (ESPEC_TARJETAS, SELECTOR_PRODUCTOS, extract_product_info,
+                                     producto_desde_campos, wait_for_products_to_load)
+
+    def elementos():
+        productos = [extract_product_info(p) for p in wait_for_products_to_load(driver)[0]]
+        return [p for p in productos if p and p['nombre'] != "N/A"]
+
+    def js():
+        productos = [producto_desde_campos(c) for c in extraccion.extraer_tarjetas(driver, ESPEC_TARJETAS)]
+        return [p for p in productos if p['nombre'] != "N/A"]
+
+    return SELECTOR_PRODUCTOS, {'elementos': elementos, 'js': js}
+
+
+def sin_fecha(productos):
+    return [{k: v for k, v in p.items() if k != 'fecha_scraping'} for p in productos]
+
+
+def main():
+    argumentos = sys.argv[1:]
+    html = None
+    if '--html' in argumentos:
+        i = argumentos.index('--html')
+        html = os.path.abspath(argumentos[i + 1])
+        del argumentos[i:i + 2]
+    tienda = argumentos[0] if argumentos else 'unimarc'
+    repeticiones = int(argumentos[1]) if len(argumentos) > 1 else 5
+
+    driver = crear_driver(headless=True)
+    try:
+        driver.get(f"file://{html}" if html else URLS[tienda])
+        selector, modos = {'unimarc': modos_unimarc, 'santaisabel': modos_santaisabel}[tienda](driver)
+        esperar_contenido(driver, selector, timeout=20)
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        esperar_contenido(driver, selector, timeout=10)
+        contador = contar_comandos(driver)
+
+        print(f"Tienda: {tienda} | página: {html or URLS[tienda]} | repeticiones: {repeticiones}")
+        print(f"{'modo':<10} {'productos':>10} {'comandos':>9} {'mediana ms':>11} {'mín ms':>8}")
+        resultados = {}
+        for nombre, extraer in modos.items():
+            tiempos = []
+            for _ in range(repeticiones):
+                contador['comandos'] = 0
+                inicio = time.perf_counter()
+                productos = extraer()
+                tiempos.append(time.perf_counter() - inicio)
+            resultados[nombre] = sin_fecha(productos)
+            print(f"{nombre:<10} {len(productos):>10} {contador['comandos']:>9} "
+                  f"{statistics.median(tiempos) * 1000:>11.1f} {min(tiempos) * 1000:>8.1f}")
+
+        iguales = resultados['elementos'] == resultados['js']
+        print(f"\nMismos productos en ambos modos: {'sí' if iguales else 'no'}")
+        if not iguales:
+            for a, b in zip(resultados['elementos'], resultados['js']):
+                if a != b:
+                    print(f"  elementos: {a}\n  js:        {b}")
+                    break
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
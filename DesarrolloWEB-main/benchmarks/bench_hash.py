@@ -0,0 +1,66 @@
+"""
+Micro-benchmark del hashing de contraseñas (PoliticaHash de seguridad.py).
+
+Para cada método/costo mide cuántas verificaciones por segundo (logins/s) logra un núcleo,
+y luego cuántas se logran con el pool de hilos de la política usando todos los núcleos.
+Sirve para elegir PASSWORD_HASH_METHOD y PASSWORD_HASH_WORKERS.
+
+Uso:
+    python benchmarks/bench_hash.py [segundos_por_medicion]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seguridad import PoliticaHash
+
+METODOS = [
+    "pbkdf2:sha256:1000000", # valor por defecto de werkzeug para pbkdf2
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:310000",
+    "scrypt:32768:8:1", # valor por defecto de werkzeug ('scrypt')
+    "scrypt:16384:8:1",
+    "scrypt:8192:8:1",
+]
+PASSWORD = "Clave#2025"
+
+
+def medir(verificar, duracion, hilos=1):
+    """Ejecuta `verificar` durante `duracion` segundos con `hilos` hilos y retorna verificaciones por segundo."""
+    fin = time.perf_counter() + duracion
+
+    def trabajar():
+        cuenta = 0
+        while time.perf_counter() < fin:
+            verificar()
+            cuenta += 1
+        return cuenta
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        total = sum(ejecutor.map(lambda _: trabajar(), range(hilos)))
+    return total / (time.perf_counter() - inicio)
+
+
+def main():
+    duracion = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    nucleos = os.cpu_count() or 1
+    print(f"Núcleos: {nucleos} | duración por medición: {duracion:.1f} s")
+    print(f"{'método':<24} {'ms/login':>9} {'logins/s (1 núcleo)':>20} {f'logins/s (pool {nucleos})':>20}")
+
+    for metodo in METODOS:
+        politica = PoliticaHash(metodo)
+        hash_guardado = politica.generar(PASSWORD)
+        por_nucleo = medir(lambda: politica.verificar(hash_guardado, PASSWORD), duracion)
+
+        # Mismo método usando el pool acotado de la política (tantos workers como núcleos)
+        politica_pool = PoliticaHash(metodo, workers=nucleos, cola=nucleos)
+        con_pool = medir(lambda: politica_pool.verificar(hash_guardado, PASSWORD), duracion, hilos=nucleos * 2)
+        print(f"{metodo:<24} {1000 / por_nucleo:>9.1f} {por_nucleo:>20.1f} {con_pool:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark de importación de app.py con `python -X importtime`.
+
+Importa la aplicación en procesos nuevos (sin caché de módulos en memoria, como un worker recién
+creado) y reporta la mediana del tiempo total de `import app` y los módulos con mayor tiempo
+acumulado según -X importtime. Sirve para seguir el costo de arranque entre cambios: por ejemplo,
+que el driver de la base (pyodbc) y el engine de SQLAlchemy no se carguen al importar.
+
+La precarga de catálogos y plantillas se desactiva para medir solo la importación; con
+--precarga se mide también ese paso.
+
+Uso:
+    python benchmarks/bench_importacion.py [repeticiones] [--precarga]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOP = 15
+
+# import time:     self [us] | cumulative | imported package
+_LINEA = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def importar(entorno):
+    """Importa app en un proceso nuevo; retorna {módulo: (propio_us, acumulado_us, nivel)}."""
+    salida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True,
+    ).stderr
+    modulos = {}
+    for linea in salida.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            propio, acumulado, sangria, nombre = m.groups()
+            modulos[nombre] = (int(propio), int(acumulado), (len(sangria) - 1) // 2)
+    return modulos
+
+
+def main():
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    repeticiones = int(argumentos[0]) if argumentos else 10
+    precarga = '--precarga' in sys.argv
+    entorno = dict(
+        os.environ,
+        CATALOGO_PRECARGA='sync' if precarga else 'off',
+        PLANTILLAS_PRECOMPILAR='1' if precarga else '0',
+        LOG_NIVEL='WARNING',
+    )
+
+    importar(entorno) # Calienta la caché de bytecode (.pyc) de los módulos
+    totales = []
+    acumulados = defaultdict(list)
+    propios = defaultdict(list)
+    for _ in range(repeticiones):
+        modulos = importar(entorno)
+        totales.append(modulos['app'][1])
+        for nombre, (propio, acumulado, _) in modulos.items():
+            acumulados[nombre].append(acumulado)
+            propios[nombre].append(propio)
+
+    print(f"Repeticiones: {repeticiones} | precarga: {'sí' if precarga else 'no'}")
+    print(f"import app: {statistics.median(totales) / 1000:.1f} ms (mediana), "
+          f"mín {min(totales) / 1000:.1f} ms, máx {max(totales) / 1000:.1f} ms")
+    print(f"\n{'módulo':<45} {'acumulado ms':>13} {'propio ms':>10}")
+    ranking = sorted(acumulados, key=lambda n: statistics.median(acumulados[n]), reverse=True)
+    for nombre in [n for n in ranking if n != 'app'][:TOP]:
+        print(f"{nombre:<45} {statistics.median(acumulados[nombre]) / 1000:>13.1f} "
+              f"{statistics.median(propios[nombre]) / 1000:>10.1f}")
+
+    cargados = [n for n in ('pyodbc', 'sqlalchemy.dialects.mssql', 'sqlite3') if n in acumulados]
+    print(f"\nDrivers de base de datos cargados al importar: {', '.join(cargados) or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    main()
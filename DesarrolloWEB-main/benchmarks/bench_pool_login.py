@@ -0,0 +1,135 @@
+"""
+Benchmark del pool de conexiones con logins concurrentes (app.py sobre SQLite).
+
+Para cada configuración de pool (DB_POOL_SIZE / DB_MAX_OVERFLOW) levanta la aplicación en un
+proceso aparte con una base SQLite temporal, registra usuarios de prueba y lanza logins desde
+varios hilos con el cliente de pruebas de Flask. Reporta logins/s, latencias p50/p99, errores
+(por ejemplo timeouts esperando una conexión) y el máximo de conexiones que se usaron a la vez.
+
+El hash se configura barato (pbkdf2 con pocas iteraciones) y el límite de intentos de login
+se desactiva en la práctica, para que lo que se mida sea el acceso a la base y el pool.
+
+Uso:
+    python benchmarks/bench_pool_login.py [hilos] [logins_por_hilo]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (pool_size, max_overflow)
+CONFIGURACIONES = [(1, 0), (2, 0), (5, 0), (5, 10), (10, 10)]
+USUARIOS = 50
+PASSWORD = "Clave#2025"
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def ejecutar_configuracion(hilos, logins_por_hilo):
+    """Se ejecuta en el proceso hijo: la configuración del pool llega por variables de entorno."""
+    sys.path.insert(0, RAIZ)
+    from sqlalchemy import event
+    from app import app, db, iniciar_db
+
+    iniciar_db()
+    with app.app_context():
+        db.create_all()
+        cliente = app.test_client()
+        for i in range(USUARIOS):
+            cliente.post('/api/register', json={
+                'username': f'usuario{i}', 'email': f'usuario{i}@example.com', 'password': PASSWORD,
+                'confirm_password': PASSWORD, 'celular': '+56 912345678',
+            })
+
+        # Conexiones en uso a la vez, según los eventos del pool
+        en_uso = {'actual': 0, 'maximo': 0}
+        lock = threading.Lock()
+
+        def checkout(*_):
+            with lock:
+                en_uso['actual'] += 1
+                en_uso['maximo'] = max(en_uso['maximo'], en_uso['actual'])
+
+        def checkin(*_):
+            with lock:
+                en_uso['actual'] -= 1
+
+        event.listen(db.engine, 'checkout', checkout)
+        event.listen(db.engine, 'checkin', checkin)
+
+    latencias = []
+    errores = [0]
+
+    def trabajar(indice):
+        cliente = app.test_client()
+        propias = []
+        for n in range(logins_por_hilo):
+            usuario = f'usuario{(indice * logins_por_hilo + n) % USUARIOS}'
+            inicio = time.perf_counter()
+            respuesta = cliente.post('/api/login', json={'identifier': usuario, 'password': PASSWORD})
+            propias.append(time.perf_counter() - inicio)
+            if respuesta.status_code != 200:
+                with lock:
+                    errores[0] += 1
+        with lock:
+            latencias.extend(propias)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    total = time.perf_counter() - inicio
+
+    print(json.dumps({
+        'logins_s': len(latencias) / total,
+        'p50_ms': percentil(latencias, 0.50) * 1000,
+        'p99_ms': percentil(latencias, 0.99) * 1000,
+        'errores': errores[0],
+        'conexiones_max': en_uso['maximo'],
+    }))
+
+
+def main():
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    logins_por_hilo = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"Hilos: {hilos} | logins por hilo: {logins_por_hilo}")
+    print(f"{'pool':>5} {'overflow':>8} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errores':>8} {'conex. máx':>10}")
+
+    for pool_size, max_overflow in CONFIGURACIONES:
+        with tempfile.TemporaryDirectory() as directorio:
+            entorno = dict(
+                os.environ,
+                DATABASE_URL='sqlite:///' + os.path.join(directorio, 'bench.db'),
+                DB_POOL_SIZE=str(pool_size),
+                DB_MAX_OVERFLOW=str(max_overflow),
+                DB_POOL_TIMEOUT='5',
+                PASSWORD_HASH_METHOD='pbkdf2:sha256:1000',
+                LOGIN_LIMITE_IP='1000000000',
+                LOGIN_LIMITE_USUARIO='1000000000',
+                CATALOGO_PRECARGA='off',
+                LOG_NIVEL='WARNING',
+            )
+            salida = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--configuracion', str(hilos), str(logins_por_hilo)],
+                env=entorno, capture_output=True, text=True, check=True,
+            ).stdout
+        r = json.loads(salida.strip().splitlines()[-1])
+        print(f"{pool_size:>5} {max_overflow:>8} {r['logins_s']:>9.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['errores']:>8} {r['conexiones_max']:>10}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--configuracion':
+        ejecutar_configuracion(int(sys.argv[2]), int(sys.argv[3]))
+    else:
+        main()
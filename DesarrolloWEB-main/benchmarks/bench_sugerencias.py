@@ -0,0 +1,89 @@
+"""
+Benchmark del índice de autocompletado (/api/suggest).
+
+Genera un catálogo sintético de productos (100.000 por defecto), construye IndiceSugerencias
+y mide el tiempo de `sugerir` para prefijos de distintos largos tomados de los mismos productos.
+El objetivo es que cada consulta tome menos de 1 ms.
+
+Uso:
+    python benchmarks/bench_sugerencias.py [cantidad_productos] [cantidad_consultas]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autocompletado import IndiceSugerencias, normalizar_frase
+
+TIPOS = ["Leche", "Yogurt", "Queso", "Arroz", "Fideos", "Aceite", "Café", "Té", "Galletas", "Chocolate",
+         "Jugo", "Bebida", "Agua", "Detergente", "Shampoo", "Papel Higiénico", "Pañales", "Alimento Perro",
+         "Pan", "Mantequilla", "Cereal", "Atún", "Salsa de Tomate", "Mayonesa", "Harina", "Azúcar"]
+VARIANTES = ["Entera", "Descremada", "Sin Lactosa", "Light", "Natural", "Frutilla", "Vainilla", "Integral",
+             "Grado 1", "Tallarín", "Premium", "Original", "Zero", "Familiar", "Extra", "Clásico"]
+MARCAS = ["Colun", "Soprole", "Nestlé", "Lays", "Coca-Cola", "Carozzi", "Tucapel", "Chef", "Lucchetti",
+          "Costa", "McKay", "Watts", "Andina", "Omo", "Elite", "Babysec", "Dog Chow", "Ideal", "Kellogg's",
+          "Van Camp's", "Hellmann's", "Iansa", "Cuisine & Co", "Great Value", "Líder", "Jumbo"]
+FORMATOS = ["1 L", "500 g", "1 kg", "200 ml", "6 un", "2 kg", "250 g", "3 L", "12 un", "400 g"]
+
+
+def generar_productos(cantidad, semilla=42):
+    rnd = random.Random(semilla)
+    productos = []
+    for i in range(cantidad):
+        marca = rnd.choice(MARCAS)
+        precio_original = rnd.randint(5, 200) * 100
+        precio_oferta = int(precio_original * rnd.uniform(0.5, 1.0))
+        productos.append({
+            "nombre": f"{rnd.choice(TIPOS)} {rnd.choice(VARIANTES)} {marca} {rnd.choice(FORMATOS)} {i % 997}",
+            "marca": marca,
+            "precio_oferta": f"${precio_oferta:,}".replace(",", "."),
+            "precio_original": f"${precio_original:,}".replace(",", "."),
+        })
+    return productos
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+    productos = generar_productos(cantidad)
+    # Se reparten en 8 catálogos, como las tiendas de la aplicación
+    catalogos = [productos[i::8] for i in range(8)]
+
+    inicio = time.perf_counter()
+    indice = IndiceSugerencias(catalogos)
+    construccion = time.perf_counter() - inicio
+    print(f"Productos: {cantidad:,} | entradas del índice: {len(indice.claves):,} | "
+          f"prefijos precalculados: {len(indice.precalculados):,} | construcción: {construccion:.2f} s")
+
+    rnd = random.Random(7)
+    frases = [normalizar_frase(p["nombre"]) for p in rnd.sample(productos, min(1000, cantidad))]
+    print(f"{'largo':>5} {'p50 (µs)':>10} {'p99 (µs)':>10} {'máx (µs)':>10}")
+    peor_p99 = 0.0
+    for largo in (1, 2, 3, 4, 6, 8, 12):
+        tiempos = []
+        for _ in range(consultas // 7):
+            frase = rnd.choice(frases)
+            palabras = frase.split(' ')
+            desde = rnd.randrange(len(palabras))
+            prefijo = ' '.join(palabras[desde:])[:largo]
+            t0 = time.perf_counter()
+            indice.sugerir(prefijo)
+            tiempos.append((time.perf_counter() - t0) * 1e6)
+        p99 = percentil(tiempos, 0.99)
+        peor_p99 = max(peor_p99, p99)
+        print(f"{largo:>5} {percentil(tiempos, 0.5):>10.1f} {p99:>10.1f} {max(tiempos):>10.1f}")
+
+    estado = "OK" if peor_p99 < 1000 else "SOBRE EL OBJETIVO"
+    print(f"Peor p99: {peor_p99:.1f} µs (objetivo < 1000 µs): {estado}")
+
+
+if __name__ == "__main__":
+    main()
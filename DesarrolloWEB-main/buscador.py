@@ -0,0 +1,122 @@
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+
+from consultas import indexar_producto, normalizar_texto
+
+# Peso de cada campo al contar la frecuencia de un término (una coincidencia en el nombre vale más que en la descripción)
+PESOS_CAMPOS = (('nombre', 3), ('marca', 2), ('descripcion', 1))
+
+# Peso del nombre de la tienda, que se indexa en todos sus productos ("leche lider" prioriza la leche de Lider)
+PESO_TIENDA = 2
+
+# Parámetros estándar de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Máximo de términos del vocabulario a los que se expande el último token (búsqueda mientras se escribe)
+MAX_EXPANSION_PREFIJO = 50
+
+
+def tokenizar(texto):
+    """Separa un texto en tokens normalizados (minúsculas y sin acentos)."""
+    return re.findall(r'[a-z0-9]+', normalizar_texto(texto))
+
+
+class IndiceTienda:
+    """
+    Índice invertido de los productos de una tienda.
+    Se construye una vez por versión del catálogo (ver CatalogoCache.get_derivado), de modo que
+    cuando cambia el JSON de una tienda solo se reconstruye el índice de esa tienda.
+    Si se indica `tienda` (nombre visible), sus tokens se agregan a cada producto con PESO_TIENDA.
+    """
+
+    def __init__(self, productos, tienda=None):
+        tokens_tienda = tokenizar(tienda)
+        self.productos = []
+        self.largos = [] # largo ponderado de cada documento
+        self.postings = {} # token -> lista de (posición del producto, frecuencia ponderada)
+
+        for producto in productos:
+            if not isinstance(producto, dict):
+                continue
+            frecuencias = Counter()
+            for campo, peso in PESOS_CAMPOS:
+                for token in tokenizar(producto.get(campo)):
+                    frecuencias[token] += peso
+            if not frecuencias:
+                continue
+            for token in tokens_tienda:
+                frecuencias[token] += PESO_TIENDA
+
+            posicion = len(self.productos)
+            self.productos.append(indexar_producto(producto))
+            self.largos.append(sum(frecuencias.values()))
+            for token, tf in frecuencias.items():
+                self.postings.setdefault(token, []).append((posicion, tf))
+
+        self.largo_total = sum(self.largos)
+        self.vocabulario = sorted(self.postings) # para expandir prefijos con bisect
+
+    def terminos_con_prefijo(self, prefijo):
+        """Retorna los términos del vocabulario que empiezan con `prefijo`."""
+        inicio = bisect_left(self.vocabulario, prefijo)
+        terminos = []
+        for termino in self.vocabulario[inicio:inicio + MAX_EXPANSION_PREFIJO]:
+            if not termino.startswith(prefijo):
+                break
+            terminos.append(termino)
+        return terminos
+
+
+def buscar(indices, consulta, k=10):
+    """
+    Busca `consulta` en varios índices de tienda y retorna los `k` mejores resultados según BM25.
+    `indices` es una lista de pares (slug de la tienda, IndiceTienda).
+    Las estadísticas globales (N, largo promedio, df) se suman sobre las tiendas en cada consulta,
+    lo que permite reconstruir el índice de una tienda sin tocar los demás.
+    Retorna una lista de tuplas (puntaje, slug de la tienda, ProductoIndexado).
+    """
+    tokens = tokenizar(consulta)
+    if not tokens:
+        return []
+
+    total_docs = sum(len(indice.largos) for _, indice in indices)
+    if total_docs == 0:
+        return []
+    largo_promedio = sum(indice.largo_total for _, indice in indices) / total_docs
+
+    # El último token puede estar incompleto mientras el usuario escribe: se expande por prefijo
+    terminos_por_token = [[token] for token in tokens[:-1]]
+    ultimo = tokens[-1]
+    expansion = {ultimo}
+    for _, indice in indices:
+        expansion.update(indice.terminos_con_prefijo(ultimo))
+    terminos_por_token.append(sorted(expansion))
+
+    terminos = {termino for grupo in terminos_por_token for termino in grupo}
+    df = {
+        termino: sum(len(indice.postings.get(termino, ())) for _, indice in indices)
+        for termino in terminos
+    }
+
+    puntajes = {}
+    for tienda, indice in indices:
+        for termino in terminos:
+            postings = indice.postings.get(termino)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - df[termino] + 0.5) / (df[termino] + 0.5))
+            for posicion, tf in postings:
+                norma = BM25_K1 * (1 - BM25_B + BM25_B * indice.largos[posicion] / largo_promedio)
+                clave = (tienda, posicion)
+                puntajes[clave] = puntajes.get(clave, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norma)
+
+    mejores = heapq.nlargest(k, puntajes.items(), key=lambda item: item[1])
+    indices_por_tienda = dict(indices)
+    return [
+        (puntaje, tienda, indices_por_tienda[tienda].productos[posicion])
+        for (tienda, posicion), puntaje in mejores
+    ]
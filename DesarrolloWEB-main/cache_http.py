@@ -0,0 +1,64 @@
+import hashlib
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+
+def etag_catalogo(firmas, *extra):
+    """
+    Calcula un ETag fuerte a partir de la versión de uno o más catálogos (su firma mtime/tamaño)
+    y de cualquier dato adicional que cambie la respuesta (por ejemplo, los parámetros de la consulta).
+    """
+    datos = repr((tuple(firmas), extra)).encode('utf-8')
+    return hashlib.sha1(datos).hexdigest()
+
+
+def ultima_modificacion(firmas):
+    """Retorna la fecha de modificación más reciente entre los catálogos (o None si no hay ninguno)."""
+    mtimes = [firma[0] for firma in firmas if firma is not None]
+    if not mtimes:
+        return None
+    # El encabezado HTTP tiene precisión de segundos
+    return datetime.fromtimestamp(max(mtimes) // 1_000_000_000, tz=timezone.utc)
+
+
+def aplicar_cache(response, etag, last_modified, max_age):
+    """Agrega ETag, Last-Modified y Cache-Control a una respuesta de catálogo."""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = None # send_file lo agrega cuando no recibe max_age
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.must_revalidate = True
+    return response
+
+
+def no_modificado(etag, last_modified):
+    """
+    Indica si el cliente ya tiene la versión actual, según If-None-Match
+    o, si no lo envía, según If-Modified-Since.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def respuesta_condicional(firmas, construir, max_age, *extra):
+    """
+    Responde 304 Not Modified sin construir el cuerpo si el cliente tiene la versión vigente;
+    si no, llama a `construir()` y agrega los encabezados de caché a su respuesta.
+    """
+    etag = etag_catalogo(firmas, *extra)
+    last_modified = ultima_modificacion(firmas)
+    if no_modificado(etag, last_modified):
+        return aplicar_cache(Response(status=304), etag, last_modified, max_age)
+
+    resultado = construir()
+    response, status = resultado if isinstance(resultado, tuple) else (resultado, 200)
+    response.status_code = status
+    if status != 200:
+        return response
+    return aplicar_cache(response, etag, last_modified, max_age)
@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheNegativa:
+    """
+    Caché de resultados negativos ("no existe en la DB") con vencimiento y tamaño acotado.
+
+    La usa /api/check-availability: si un nombre de usuario o email se consultó hace menos de `ttl`
+    segundos y no existía, se responde sin consultar la DB. Solo se guardan ausencias; un valor
+    ocupado siempre se confirma en la DB. Al registrar un usuario se descartan sus claves, y en otros
+    procesos la entrada vence sola tras `ttl`. Las claves se guardan en un OrderedDict usado como LRU
+    de `max_claves` entradas.
+    """
+
+    def __init__(self, ttl=30.0, max_claves=10000, reloj=time.monotonic):
+        self.ttl = ttl
+        self.max_claves = max_claves
+        self._reloj = reloj
+        self._entradas = OrderedDict() # clave -> instante de vencimiento
+        self._lock = threading.Lock()
+        # Contadores para monitoreo
+        self.hits = 0
+        self.misses = 0
+
+    def contiene(self, clave):
+        """Indica si la clave está guardada como ausente y no ha vencido."""
+        ahora = self._reloj()
+        with self._lock:
+            vence = self._entradas.get(clave)
+            if vence is not None and vence > ahora:
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return True
+            if vence is not None:
+                del self._entradas[clave]
+            self.misses += 1
+            return False
+
+    def agregar(self, clave):
+        """Guarda la clave como ausente por `ttl` segundos."""
+        with self._lock:
+            self._entradas[clave] = self._reloj() + self.ttl
+            self._entradas.move_to_end(clave)
+            if len(self._entradas) > self.max_claves:
+                self._entradas.popitem(last=False)
+
+    def descartar(self, clave):
+        """Elimina la clave (por ejemplo, porque se acaba de registrar)."""
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+    def stats(self):
+        """Retorna los contadores de la caché y la cantidad de claves guardadas."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'claves': len(self._entradas),
+                'max_claves': self.max_claves,
+            }
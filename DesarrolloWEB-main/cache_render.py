@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+from markupsafe import escape
+
+# Marca que reemplaza al nombre de usuario al renderizar una página para la caché.
+# Si la plantilla muestra el nombre, la marca queda en el HTML y se sustituye en cada request.
+MARCA_USUARIO = '__usuario_cache_render__'
+
+
+class CacheRender:
+    """
+    Caché LRU de páginas HTML ya renderizadas, con límite de memoria.
+
+    La clave la arma quien llama (plantilla, versión de los catálogos que usa, si hay sesión
+    iniciada, versión de la plantilla); las páginas se renderizan con MARCA_USUARIO en lugar del
+    nombre de usuario, así que una misma entrada sirve para todos los usuarios con sesión.
+    Al superar `max_bytes` (tamaño aproximado del HTML guardado) o `max_entradas` se descartan
+    las páginas usadas hace más tiempo.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, max_entradas=256):
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict() # clave -> (html, contiene la marca, tamaño)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Contadores para monitoreo
+        self.hits = 0
+        self.misses = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, renderizar, username):
+        """
+        Retorna el HTML de la página para `clave`, renderizándolo con `renderizar()` si no está.
+        El nombre de usuario se sustituye (escapado) en la copia que se retorna.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entrada is None:
+            # Se renderiza fuera del lock: dos requests simultáneos pueden renderizar la misma página,
+            # pero ninguno espera a que termine el render de otra
+            html = renderizar()
+            entrada = (html, MARCA_USUARIO in html, len(html))
+            self._guardar(clave, entrada)
+
+        html, contiene_marca, _ = entrada
+        return html.replace(MARCA_USUARIO, str(escape(username))) if contiene_marca else html
+
+    def _guardar(self, clave, entrada):
+        tamano = entrada[2]
+        if tamano > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior[2]
+            self._entradas[clave] = entrada
+            self._bytes += tamano
+            while self._bytes > self.max_bytes or len(self._entradas) > self.max_entradas:
+                _, descartada = self._entradas.popitem(last=False)
+                self._bytes -= descartada[2]
+                self.desalojos += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Retorna los contadores de la caché, las páginas guardadas y los bytes que ocupan."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'desalojos': self.desalojos,
+                'paginas': len(self._entradas),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,262 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+
+def firma_archivo(ruta):
+    """Retorna la versión de un archivo en disco como (mtime en nanosegundos, tamaño), o None si no existe."""
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+# Versión publicada de un catálogo. No se modifica una vez publicada (solo se le agregan derivados
+# que aún no existían): una versión nueva se arma aparte y reemplaza a la anterior en una sola asignación.
+Instantanea = namedtuple('Instantanea', 'version firma productos derivados')
+
+
+class CatalogoCache:
+    """
+    Caché en memoria de los catálogos de productos (archivos JSON en static/data/).
+
+    Cada catálogo se publica como una Instantanea: productos, derivados (índices) y versión.
+    Cuando el archivo cambia en disco se arma una instantánea nueva, con los mismos derivados ya
+    construidos, y se reemplaza la anterior con una sola asignación: quien lee ve la versión
+    anterior completa o la nueva completa, y nunca espera a que se construya.
+
+    Con iniciar_vigilancia() un hilo revisa los archivos cada tantos segundos y arma las versiones
+    nuevas fuera del camino de los requests; las lecturas ya no consultan el disco. Sin vigilante,
+    cada lectura compara la fecha de modificación (mtime) y el tamaño del archivo y recarga si cambió.
+
+    Si se indica `observador`, se llama como observador(etapa, segundos) tras cada carga de un
+    archivo ('catalogo_carga') y cada construcción de un derivado ('catalogo_indice').
+    """
+
+    def __init__(self, base_dir, observador=None):
+        self.base_dir = base_dir
+        self.observador = observador
+        self._instantaneas = {} # nombre de archivo -> Instantanea vigente
+        self._constructores = {} # nombre de archivo -> {clave: construir}, para rearmar los derivados
+        self._combinados = {} # (clave, archivos) -> (firmas, valor, construir) para derivados de varios catálogos
+        self._faltantes = set() # archivos ya reportados como inexistentes (se avisa una sola vez)
+        self._ilegibles = {} # nombre de archivo -> firma que no se pudo leer (no se reintenta la misma versión)
+        self._lock = threading.Lock() # Serializa las cargas; las lecturas de instantáneas no lo toman
+        self._versiones = itertools.count(1)
+        self._vigilante = None
+        self._detener = threading.Event()
+        # Contadores para verificar que los archivos no se vuelven a parsear en cada request
+        self.hits = 0
+        self.misses = 0
+        self.recargas = 0
+        self.errores = 0
+
+    def _ruta(self, nombre_archivo):
+        return os.path.join(self.base_dir, nombre_archivo)
+
+    def get(self, nombre_archivo):
+        """
+        Retorna la lista de productos del archivo indicado.
+        Si el archivo no existe, retorna una lista vacía (igual que antes en las rutas).
+        """
+        entrada = self._entrada(nombre_archivo)
+        return entrada.productos if entrada is not None else []
+
+    def instantanea(self, nombre_archivo):
+        """
+        Retorna la Instantanea vigente del archivo (productos y firma de una misma versión), o None
+        si el archivo no existe. Sirve cuando se necesitan ambos: dos llamadas a get() y firma()
+        pueden ver versiones distintas si entre ellas se publica una nueva.
+        """
+        return self._entrada(nombre_archivo)
+
+    def firma(self, nombre_archivo):
+        """Retorna la versión del catálogo cargado (mtime en nanosegundos, tamaño), o None si el archivo no existe."""
+        entrada = self._entrada(nombre_archivo)
+        return entrada.firma if entrada is not None else None
+
+    def get_derivado(self, nombre_archivo, clave, construir):
+        """
+        Retorna una estructura derivada del catálogo (por ejemplo, productos normalizados
+        o un índice), construida con `construir(productos)`.
+        Se calcula una sola vez por versión del archivo; las versiones nuevas la traen ya construida.
+        """
+        entrada = self._entrada(nombre_archivo)
+        if entrada is None:
+            return construir([])
+        derivados = entrada.derivados
+        if clave not in derivados:
+            with self._lock:
+                self._constructores.setdefault(nombre_archivo, {})[clave] = construir
+                if clave not in derivados:
+                    derivados[clave] = self._medir('catalogo_indice', construir, entrada.productos)
+        return derivados[clave]
+
+    def get_derivado_combinado(self, nombres_archivo, clave, construir):
+        """
+        Igual que get_derivado, pero para una estructura construida a partir de varios catálogos
+        con `construir(lista de listas de productos)`. Se reconstruye cuando cambia cualquiera de ellos.
+        """
+        entradas = [self._entrada(nombre) for nombre in nombres_archivo]
+        llave = (clave, tuple(nombres_archivo))
+        combinado = self._combinados.get(llave)
+        if combinado is None or combinado[0] != self._firmas(entradas):
+            with self._lock:
+                combinado = self._combinados.get(llave)
+                if combinado is None or combinado[0] != self._firmas(entradas):
+                    combinado = self._combinar(entradas, construir)
+                    self._combinados[llave] = combinado
+        return combinado[1]
+
+    @staticmethod
+    def _firmas(entradas):
+        return tuple(entrada.firma if entrada is not None else None for entrada in entradas)
+
+    def _combinar(self, entradas, construir):
+        productos = [entrada.productos if entrada is not None else [] for entrada in entradas]
+        return (self._firmas(entradas), self._medir('catalogo_indice', construir, productos), construir)
+
+    @staticmethod
+    def _leer(ruta):
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _medir(self, etapa, funcion, *args):
+        """Ejecuta funcion(*args) e informa su duración al observador, si hay uno."""
+        if self.observador is None:
+            return funcion(*args)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args)
+        finally:
+            self.observador(etapa, time.perf_counter() - inicio)
+
+    def _entrada(self, nombre_archivo):
+        entrada = self._instantaneas.get(nombre_archivo)
+        if entrada is not None and self._vigilante is not None:
+            self.hits += 1 # Sin lock: contador aproximado, la lectura no espera a nadie
+            return entrada
+
+        firma = firma_archivo(self._ruta(nombre_archivo))
+        if firma is None:
+            self._quitar(nombre_archivo)
+            return None
+        if entrada is not None and entrada.firma == firma:
+            self.hits += 1
+            return entrada
+        with self._lock:
+            return self._publicar(nombre_archivo, firma)
+
+    def _publicar(self, nombre_archivo, firma):
+        """
+        Arma la instantánea de la versión `firma` del archivo (productos y derivados conocidos) y
+        la publica. Si el archivo no se puede leer se conserva la versión anterior. Requiere el lock.
+        """
+        actual = self._instantaneas.get(nombre_archivo)
+        if actual is not None and actual.firma == firma:
+            # Otro hilo pudo haber cargado el archivo mientras esperábamos el lock
+            self.hits += 1
+            return actual
+
+        if self._ilegibles.get(nombre_archivo) == firma:
+            return actual
+        try:
+            productos = self._medir('catalogo_carga', self._leer, self._ruta(nombre_archivo))
+        except (OSError, ValueError) as e:
+            self.errores += 1
+            self._ilegibles[nombre_archivo] = firma
+            log.warning("No se pudo leer el catálogo %s (%s); se mantiene la versión anterior.", nombre_archivo, e)
+            return actual
+        derivados = {
+            clave: self._medir('catalogo_indice', construir, productos)
+            for clave, construir in self._constructores.get(nombre_archivo, {}).items()
+        }
+        nueva = Instantanea(next(self._versiones), firma, productos, derivados)
+        self._faltantes.discard(nombre_archivo)
+        self._ilegibles.pop(nombre_archivo, None)
+
+        if actual is None:
+            self.misses += 1
+        else:
+            self.recargas += 1
+            log.info("Catálogo %s modificado en disco, publicada la versión %d.", nombre_archivo, nueva.version)
+        self._instantaneas[nombre_archivo] = nueva # Una sola asignación: nunca se ve a medio armar
+        return nueva
+
+    def _quitar(self, nombre_archivo):
+        with self._lock:
+            self._instantaneas.pop(nombre_archivo, None)
+            self.misses += 1
+            reportar = nombre_archivo not in self._faltantes
+            self._faltantes.add(nombre_archivo)
+        if reportar:
+            log.error("Archivo %s no encontrado en static/data/. Se usará una lista vacía de productos.", nombre_archivo)
+
+    def revisar(self):
+        """
+        Compara cada catálogo conocido con su archivo en disco y publica las versiones nuevas
+        (y los derivados combinados que dependen de ellas). Retorna los archivos actualizados.
+        """
+        actualizados = []
+        for nombre_archivo in list(self._instantaneas) + list(self._faltantes):
+            actual = self._instantaneas.get(nombre_archivo)
+            firma = firma_archivo(self._ruta(nombre_archivo))
+            if firma is None:
+                if actual is not None:
+                    self._quitar(nombre_archivo)
+                    actualizados.append(nombre_archivo)
+                continue
+            if actual is None or actual.firma != firma:
+                with self._lock:
+                    if self._publicar(nombre_archivo, firma) is not actual:
+                        actualizados.append(nombre_archivo)
+
+        if actualizados:
+            with self._lock:
+                for llave, (firmas, _, construir) in list(self._combinados.items()):
+                    entradas = [self._instantaneas.get(nombre) for nombre in llave[1]]
+                    if self._firmas(entradas) != firmas:
+                        self._combinados[llave] = self._combinar(entradas, construir)
+        return actualizados
+
+    def iniciar_vigilancia(self, intervalo=2.0):
+        """Inicia un hilo que llama a revisar() cada `intervalo` segundos. Desde entonces las lecturas no consultan el disco."""
+        if self._vigilante is not None:
+            return
+        self._detener.clear()
+        self._vigilante = threading.Thread(target=self._vigilar, args=(intervalo,), name='vigilante-catalogos', daemon=True)
+        self._vigilante.start()
+
+    def detener_vigilancia(self):
+        if self._vigilante is None:
+            return
+        self._detener.set()
+        self._vigilante.join()
+        self._vigilante = None
+
+    def _vigilar(self, intervalo):
+        while not self._detener.wait(intervalo):
+            try:
+                self.revisar()
+            except Exception:
+                log.exception("Error al revisar los catálogos en disco.")
+
+    def stats(self):
+        """Retorna los contadores de la caché, los archivos cargados actualmente y la versión publicada de cada uno."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'recargas': self.recargas,
+                'errores': self.errores,
+                'vigilando': self._vigilante is not None,
+                'archivos': sorted(self._instantaneas.keys()),
+                'versiones': {nombre: entrada.version for nombre, entrada in sorted(self._instantaneas.items())},
+            }
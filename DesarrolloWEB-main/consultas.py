@@ -0,0 +1,175 @@
+import json
+import re
+import unicodedata
+from collections import namedtuple
+
+# Opciones de orden aceptadas (mismos valores que el selector `orden-filter` de las plantillas)
+ORDENES = ('recomendados', 'menor-precio', 'mayor-precio', 'mayor-descuento', 'nombre-az')
+
+# Valores de los filtros de las plantillas que significan "sin filtro"
+SIN_FILTRO = ('', 'all', 'todas', 'todas-las-ofertas')
+
+# Producto con los campos ya normalizados para filtrar y ordenar sin volver a parsear precios
+ProductoIndexado = namedtuple(
+    'ProductoIndexado',
+    ['producto', 'precio', 'precio_original', 'descuento', 'categoria', 'marca', 'nombre']
+)
+
+
+def normalizar_texto(texto):
+    """Normaliza el texto a minúsculas y elimina acentos (misma idea que en scrap-prubas01.py)."""
+    if not isinstance(texto, str):
+        return ''
+    texto = texto.lower()
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('utf-8')
+
+
+def slug(texto):
+    """Convierte una categoría o marca en un identificador comparable ('Frutas/Verduras' -> 'frutas-verduras')."""
+    return re.sub(r'[\s/]+', '-', normalizar_texto(texto).strip())
+
+
+def parse_precio(valor):
+    """
+    Convierte un precio del JSON a entero.
+    Acepta números o textos como '$1.990' (formato que generan los scrapers).
+    """
+    if isinstance(valor, bool) or valor is None:
+        return 0
+    if isinstance(valor, (int, float)):
+        return int(valor)
+    digitos = re.sub(r'[^0-9]', '', str(valor))
+    return int(digitos) if digitos else 0
+
+
+def indexar_producto(producto):
+    """Calcula los campos numéricos y normalizados de un producto crudo del scraper."""
+    # Los scrapers usan nombres distintos: precio_oferta/precio_original o precio_actual/precio_anterior (Lider)
+    precio = parse_precio(producto.get('precio_oferta', producto.get('precio_actual')))
+    precio_original = parse_precio(producto.get('precio_original', producto.get('precio_anterior'))) or precio
+
+    # Si hay precios por cantidad (Alvi), se filtra por el menor precio unitario disponible
+    precios_cantidad = [parse_precio(p.get('precio_unitario')) for p in producto.get('precios_por_cantidad') or []]
+    precios_cantidad = [p for p in precios_cantidad if p > 0]
+    if precios_cantidad:
+        precio = min(precios_cantidad)
+
+    descuento = producto.get('descuento')
+    if not isinstance(descuento, (int, float)) or isinstance(descuento, bool):
+        descuento = 0
+        if precio_original > 0 and 0 < precio < precio_original:
+            descuento = round((precio_original - precio) / precio_original * 100)
+
+    return ProductoIndexado(
+        producto=producto,
+        precio=precio,
+        precio_original=precio_original,
+        descuento=descuento,
+        categoria=slug(producto.get('categoria')),
+        marca=slug(producto.get('marca')),
+        nombre=normalizar_texto(producto.get('nombre')),
+    )
+
+
+class CatalogoIndexado:
+    """
+    Vista de un catálogo lista para consultas: productos normalizados, órdenes precalculados
+    y lista de marcas. Se construye una vez por versión del archivo (ver CatalogoCache.get_derivado).
+    """
+
+    def __init__(self, productos):
+        self.items = [indexar_producto(p) for p in productos if isinstance(p, dict)]
+        # Cada orden se calcula una sola vez; las consultas solo filtran recorriendo la lista ya ordenada
+        self.ordenes = {
+            'recomendados': self.items,
+            'menor-precio': sorted(self.items, key=lambda p: p.precio),
+            'mayor-precio': sorted(self.items, key=lambda p: -p.precio),
+            'mayor-descuento': sorted(self.items, key=lambda p: -p.descuento),
+            'nombre-az': sorted(self.items, key=lambda p: p.nombre),
+        }
+        marcas = {}
+        for item in self.items:
+            nombre_marca = (item.producto.get('marca') or '').strip()
+            if item.marca and item.marca != 'n-a' and item.marca not in marcas:
+                marcas[item.marca] = nombre_marca
+        self.marcas = [{'valor': valor, 'nombre': marcas[valor]} for valor in sorted(marcas)]
+
+    def consultar(self, categoria=None, marca=None, precio=None, descuento=None, orden=None):
+        """
+        Retorna la lista de productos indexados que cumplen los filtros, en el orden pedido.
+        Los parámetros usan los mismos valores que los controles de las plantillas
+        (`precio` como '1000-3000' o '5000+', `descuento` como porcentaje mínimo).
+        """
+        base, filtros = self._preparar(categoria, marca, precio, descuento, orden)
+        if not filtros:
+            return base
+        return [p for p in base if all(f(p) for f in filtros)]
+
+    def iterar(self, categoria=None, marca=None, precio=None, descuento=None, orden=None):
+        """Igual que consultar, pero entrega los productos de a uno sin armar la lista de resultados."""
+        base, filtros = self._preparar(categoria, marca, precio, descuento, orden)
+        for p in base:
+            if all(f(p) for f in filtros):
+                yield p
+
+    def _preparar(self, categoria, marca, precio, descuento, orden):
+        """Retorna la lista base en el orden pedido y las funciones de filtro a aplicar."""
+        categoria = slug(categoria)
+        marca = slug(marca)
+        precio_min, precio_max = _rango_precio(precio)
+        try:
+            descuento_min = int(descuento) if descuento not in SIN_FILTRO and descuento is not None else None
+        except ValueError:
+            descuento_min = None
+
+        filtros = []
+        if categoria not in SIN_FILTRO:
+            filtros.append(lambda p: p.categoria == categoria)
+        if marca not in SIN_FILTRO:
+            filtros.append(lambda p: p.marca == marca)
+        if precio_min is not None:
+            filtros.append(lambda p: p.precio >= precio_min if precio_max is None else precio_min <= p.precio <= precio_max)
+        if descuento_min is not None:
+            filtros.append(lambda p: p.descuento >= descuento_min)
+
+        return self.ordenes.get(orden or 'recomendados', self.items), filtros
+
+
+def _rango_precio(precio):
+    """Interpreta el filtro de precio: '0-1000' -> (0, 1000), '5000+' -> (5000, None), ambos límites inclusivos."""
+    if not precio or precio in SIN_FILTRO:
+        return None, None
+    try:
+        if precio.endswith('+'):
+            return int(precio[:-1]), None
+        minimo, maximo = precio.split('-', 1)
+        return int(minimo), int(maximo)
+    except ValueError:
+        return None, None
+
+
+def paginar(items, page, page_size):
+    """Retorna (elementos de la página, total de páginas) para una lista ya filtrada."""
+    total_pages = max(1, -(-len(items) // page_size))
+    inicio = (page - 1) * page_size
+    return items[inicio:inicio + page_size], total_pages
+
+
+def lineas_ndjson(items, campos=None, tamano_lote=200):
+    """
+    Generador que serializa productos indexados como NDJSON (un producto por línea).
+    Si se indican `campos`, cada línea incluye solo esos campos del producto.
+    Las líneas se entregan en lotes de `tamano_lote` para no hacer una escritura por producto,
+    sin armar nunca la respuesta completa en memoria.
+    """
+    lote = []
+    for item in items:
+        producto = item.producto
+        if campos:
+            producto = {campo: producto[campo] for campo in campos if campo in producto}
+        lote.append(json.dumps(producto, ensure_ascii=False))
+        if len(lote) >= tamano_lote:
+            yield ('\n'.join(lote) + '\n').encode('utf-8')
+            lote = []
+    if lote:
+        yield ('\n'.join(lote) + '\n').encode('utf-8')
@@ -0,0 +1,157 @@
+"""
+Esperas adaptativas para los scrapers de Selenium, en lugar de pausas fijas con time.sleep.
+
+esperar_contenido() vuelve apenas la página deja de cambiar, con la primera de estas señales:
+- 'tarjetas': la cantidad de elementos de `selector` (tarjetas de producto) no cambia en `estable` segundos;
+- 'dom': un MutationObserver no registra cambios en el DOM en `estable` segundos;
+- 'red': no hay fetch/XHR en curso ni terminó ninguna descarga en `estable` segundos (y la página terminó de cargar);
+y nunca espera más de `timeout` segundos ('timeout'). Las señales se miden desde que empieza la
+espera, así que como mínimo se esperan `estable` segundos (el contenido perezoso alcanza a empezar
+a cargar después de un scroll). Cada sondeo es un solo execute_script.
+
+Cada espera queda en `registro`, con su duración y la señal que la terminó, para comparar con
+las pausas fijas de antes: registro.texto() resume por etapa.
+"""
+import logging
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+
+from selenium.common.exceptions import WebDriverException
+
+log = logging.getLogger('esperas')
+
+# Instala (una vez por documento) el MutationObserver y los contadores de fetch/XHR, y retorna el estado actual
+_SCRIPT_ESTADO = """
+const selector = arguments[0], marcar = arguments[1];
+let e = window.__espera;
+if (!e) {
+    e = window.__espera = {mutacion: performance.now(), red: performance.now(), pendientes: 0, recursos: 0, marca: -1};
+    new MutationObserver(() => { e.mutacion = performance.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    const terminar = () => { e.pendientes--; e.red = performance.now(); };
+    if (window.fetch) {
+        const fetchOriginal = window.fetch;
+        window.fetch = function () {
+            e.pendientes++;
+            return fetchOriginal.apply(this, arguments).finally(terminar);
+        };
+    }
+    const sendOriginal = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        e.pendientes++;
+        this.addEventListener('loadend', terminar);
+        return sendOriginal.apply(this, arguments);
+    };
+    if (performance.setResourceTimingBufferSize) performance.setResourceTimingBufferSize(10000);
+}
+if (marcar) e.marca = performance.now();
+const recursos = performance.getEntriesByType('resource').length;
+if (recursos !== e.recursos) { e.recursos = recursos; e.red = performance.now(); }
+const ahora = performance.now();
+return {
+    tarjetas: selector ? document.querySelectorAll(selector).length : null,
+    dom_ms: ahora - e.mutacion,
+    red_ms: e.pendientes > 0 ? 0 : ahora - e.red,
+    cambio: e.marca < 0 || e.mutacion > e.marca,
+    completo: document.readyState === 'complete',
+};
+"""
+
+
+class RegistroEsperas:
+    """Duración y señal de término de cada espera, agrupadas por etapa."""
+
+    def __init__(self):
+        self._duraciones = defaultdict(list)
+        self._motivos = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def agregar(self, etapa, segundos, motivo):
+        with self._lock:
+            self._duraciones[etapa].append(segundos)
+            self._motivos[etapa][motivo] += 1
+
+    def resumen(self):
+        """Retorna {etapa: {'esperas', 'total_s', 'p50_s', 'max_s', 'motivos'}}."""
+        with self._lock:
+            return {
+                etapa: {
+                    'esperas': len(duraciones),
+                    'total_s': round(sum(duraciones), 2),
+                    'p50_s': round(statistics.median(duraciones), 2),
+                    'max_s': round(max(duraciones), 2),
+                    'motivos': dict(self._motivos[etapa]),
+                }
+                for etapa, duraciones in sorted(self._duraciones.items())
+            }
+
+    def texto(self):
+        lineas = []
+        for etapa, datos in self.resumen().items():
+            motivos = ', '.join(f"{motivo}: {cantidad}" for motivo, cantidad in datos['motivos'].items())
+            lineas.append(f"{etapa}: {datos['esperas']} esperas, {datos['total_s']} s en total "
+                          f"(p50 {datos['p50_s']} s, máx {datos['max_s']} s; {motivos})")
+        return '\n'.join(lineas)
+
+
+registro = RegistroEsperas()
+
+
+def esperar_contenido(driver, selector=None, timeout=10, estable=0.75, intervalo=0.2, esperar_cambio=False, etapa='contenido'):
+    """
+    Espera a que la página deje de cambiar (ver el docstring del módulo) y retorna la señal que
+    terminó la espera: 'tarjetas', 'dom', 'red' o 'timeout'.
+
+    - selector: CSS de las tarjetas de producto (opcional; sin él solo se usan 'dom' y 'red').
+    - esperar_cambio: exige que el DOM cambie (o que se cargue otro documento) antes de aceptar
+      una señal, para usarla justo después de un clic de paginación. La estabilidad de las tarjetas
+      se mide desde ese primer cambio, y 'tarjetas' exige además que la cantidad sea distinta de la
+      de antes del clic o que la red esté quieta (la página nueva puede tener las mismas tarjetas
+      que la anterior); 'dom' exige que no haya fetch/XHR en curso.
+    """
+    inicio = time.perf_counter()
+    limite = inicio + timeout
+    cantidad, desde = None, inicio
+    cantidad_anterior = None # Tarjetas en el primer sondeo (antes de que cambie la página)
+    cambio_visto = not esperar_cambio
+    marcar = True
+    motivo = 'timeout'
+    while True:
+        try:
+            estado = driver.execute_script(_SCRIPT_ESTADO, selector, marcar)
+            if marcar:
+                cantidad_anterior = estado['tarjetas'] if estado else None
+            marcar = False
+        except WebDriverException: # La página puede estar navegando; se reintenta en el siguiente sondeo
+            estado = None
+        ahora = time.perf_counter()
+        if estado:
+            transcurrido_ms = (ahora - inicio) * 1000
+            if not cambio_visto and estado['cambio']:
+                # La página empezó a cambiar: las tarjetas que había hasta ahora son las de la página anterior
+                cambio_visto = True
+                cantidad = None
+            if estado['tarjetas'] != cantidad:
+                cantidad, desde = estado['tarjetas'], ahora
+            if cambio_visto:
+                red_quieta = estado['completo'] and min(estado['red_ms'], transcurrido_ms) >= estable * 1000
+                if (cantidad and ahora - desde >= estable
+                        and (not esperar_cambio or cantidad != cantidad_anterior or red_quieta)):
+                    motivo = 'tarjetas'
+                elif (min(estado['dom_ms'], transcurrido_ms) >= estable * 1000
+                        and (not esperar_cambio or estado['red_ms'] > 0)):
+                    motivo = 'dom'
+                elif red_quieta:
+                    motivo = 'red'
+                if motivo != 'timeout':
+                    break
+        if ahora >= limite:
+            break
+        time.sleep(min(intervalo, max(limite - ahora, 0)))
+
+    duracion = time.perf_counter() - inicio
+    registro.agregar(etapa, duracion, motivo)
+    log.debug("Espera %s: %.2f s (%s)", etapa, duracion, motivo)
+    return motivo
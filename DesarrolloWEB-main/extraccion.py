@@ -0,0 +1,122 @@
+"""
+Extracción de las tarjetas de producto de una página en un solo execute_script.
+
+El modo por elementos (find_elements / get_attribute / .text por cada campo y por cada selector
+de respaldo) hace cientos de viajes de ida y vuelta a ChromeDriver por página. En modo 'js' los
+selectores de cada tienda se describen en un diccionario (`espec`) y un único script los aplica
+dentro de la página a todas las tarjetas, retornando por tarjeta y por campo la lista de valores
+candidatos (texto o atributo, en el orden de los selectores). El procesamiento (limpiar textos,
+elegir el primer precio válido, clasificar) sigue en Python, en cada scraper.
+
+Formato de `espec`:
+    {
+        'contenedores': [selector, ...],   # tarjetas: se concatenan los resultados de cada selector
+        'primer_contenedor': False,        # True: solo el primer selector que encuentre tarjetas
+        'requeridos': [selector, ...],     # se descartan las tarjetas a las que les falte alguno
+        'clave': selector,                 # enlace cuyo href identifica la tarjeta (sin él, su HTML)
+        'campos': {
+            nombre: {
+                'selectores': [selector, ...],  # ':scope' es la tarjeta misma
+                'atributos': ['text'],          # el primero no vacío; 'text' es el texto visible
+                'todos': False,                 # True: todos los elementos de cada selector, no solo el primero
+                'dentro': [selector, ...],      # opcional: buscar dentro del primer elemento que exista
+            },
+        },
+    }
+
+EXTRACCION_MODO=elementos vuelve al modo anterior (por ejemplo, para comparar resultados).
+"""
+import logging
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+log = logging.getLogger('extraccion')
+
+MODO = os.environ.get('EXTRACCION_MODO', 'js') # 'js' | 'elementos'
+
+_SCRIPT_TARJETAS = """
+const espec = arguments[0];
+const buscar = (raiz, selector, todos) => {
+    if (selector === ':scope') return [raiz];
+    if (todos) return Array.from(raiz.querySelectorAll(selector));
+    const elemento = raiz.querySelector(selector);
+    return elemento ? [elemento] : [];
+};
+const valor = (elemento, atributo) => {
+    if (atributo === 'text') return elemento.innerText;
+    // Como get_attribute de Selenium: href y src resueltos a URL absoluta
+    if ((atributo === 'href' || atributo === 'src') && typeof elemento[atributo] === 'string' && elemento[atributo]) {
+        return elemento[atributo];
+    }
+    return elemento.getAttribute(atributo);
+};
+
+let tarjetas = [];
+for (const selector of espec.contenedores) {
+    const encontradas = document.querySelectorAll(selector);
+    tarjetas = tarjetas.concat(Array.from(encontradas));
+    if (espec.primer_contenedor && encontradas.length) break;
+}
+
+const vistas = new Set();
+const resultado = [];
+for (const tarjeta of tarjetas) {
+    if (espec.clave !== undefined) {
+        const enlace = tarjeta.querySelector(espec.clave);
+        const clave = (enlace && enlace.href) || tarjeta.innerHTML;
+        if (vistas.has(clave)) continue;
+        if ((espec.requeridos || []).some(selector => !tarjeta.querySelector(selector))) continue;
+        vistas.add(clave);
+    } else if ((espec.requeridos || []).some(selector => !tarjeta.querySelector(selector))) {
+        continue;
+    }
+
+    const campos = {};
+    for (const [nombre, campo] of Object.entries(espec.campos)) {
+        const candidatos = [];
+        let raiz = tarjeta;
+        if (campo.dentro) {
+            raiz = null;
+            for (const selector of campo.dentro) {
+                const encontrados = buscar(tarjeta, selector, false);
+                if (encontrados.length) { raiz = encontrados[0]; break; }
+            }
+        }
+        if (raiz) {
+            for (const selector of campo.selectores) {
+                for (const elemento of buscar(raiz, selector, campo.todos)) {
+                    for (const atributo of campo.atributos || ['text']) {
+                        const v = valor(elemento, atributo);
+                        if (v) { candidatos.push(v); break; }
+                    }
+                }
+            }
+        }
+        campos[nombre] = candidatos;
+    }
+    resultado.push(campos);
+}
+return resultado;
+"""
+
+
+def extraer_tarjetas(driver, espec):
+    """
+    Aplica `espec` a la página actual en un solo execute_script. Retorna una lista (una entrada por
+    tarjeta) de {campo: [valores candidatos]}, o None si el script falló (para volver al modo por elementos).
+    """
+    try:
+        return driver.execute_script(_SCRIPT_TARJETAS, espec)
+    except WebDriverException as e:
+        log.warning("Falló la extracción en un solo script; se usa el modo por elementos: %s", e)
+        return None
+
+
+def primero(candidatos, condicion=None):
+    """Primer valor candidato no vacío (sin espacios al borde) que cumpla `condicion`, o None."""
+    for valor in candidatos:
+        valor = valor.strip()
+        if valor and (condicion is None or condicion(valor)):
+            return valor
+    return None
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LimitadorTokenBucket:
+    """
+    Limitador de intentos con un token bucket por clave (IP o identificador de usuario).
+
+    Cada clave tiene hasta `capacidad` tokens que se recargan a `tasa` tokens por segundo, y cada
+    intento consume uno. Los buckets se guardan en un OrderedDict usado como LRU de tamaño fijo
+    (`max_claves`): al superar el tamaño se descarta la clave usada hace más tiempo, así la memoria
+    queda acotada aunque lleguen intentos desde muchas IPs distintas.
+    """
+
+    def __init__(self, capacidad, tasa, max_claves=10000, reloj=time.monotonic):
+        self.capacidad = float(capacidad)
+        self.tasa = float(tasa)
+        self.max_claves = max_claves
+        self._reloj = reloj
+        self._buckets = OrderedDict() # clave -> [tokens, último instante de recarga]
+        self._lock = threading.Lock()
+        # Contadores para monitoreo
+        self.permitidos = 0
+        self.rechazados = 0
+        self.desalojos = 0
+
+    def permitir(self, clave):
+        """
+        Intenta consumir un token de la clave.
+        Retorna (True, 0) si el intento está permitido, o (False, segundos de espera sugeridos) si no.
+        """
+        ahora = self._reloj()
+        with self._lock:
+            bucket = self._buckets.get(clave)
+            if bucket is None:
+                bucket = [self.capacidad, ahora]
+                self._buckets[clave] = bucket
+                if len(self._buckets) > self.max_claves:
+                    self._buckets.popitem(last=False)
+                    self.desalojos += 1
+            else:
+                self._buckets.move_to_end(clave)
+                bucket[0] = min(self.capacidad, bucket[0] + (ahora - bucket[1]) * self.tasa)
+                bucket[1] = ahora
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.permitidos += 1
+                return True, 0
+            self.rechazados += 1
+            espera = (1 - bucket[0]) / self.tasa if self.tasa > 0 else 60
+            return False, espera
+
+    def stats(self):
+        """Retorna los contadores del limitador y la cantidad de claves en memoria."""
+        with self._lock:
+            return {
+                'permitidos': self.permitidos,
+                'rechazados': self.rechazados,
+                'desalojos': self.desalojos,
+                'claves': len(self._buckets),
+                'max_claves': self.max_claves,
+            }
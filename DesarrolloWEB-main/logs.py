@@ -0,0 +1,185 @@
+"""
+Configuración de logs de la aplicación.
+
+- Niveles estándar de `logging` (en producción, LOG_NIVEL=WARNING deja los logs de depuración
+  en una comparación de enteros por llamada).
+- Salida en texto ('[NIVEL] mensaje', como los print de antes) o JSON (una línea por registro).
+- Escritura en un hilo aparte (QueueHandler + QueueListener): el request solo encola el registro.
+- Muestreo opcional de los logs DEBUG/INFO por endpoint, para rutas de mucho tráfico.
+- Redacción de contraseñas y otros secretos, tanto en los datos adjuntos como en el mensaje.
+
+Uso:
+    log = logging.getLogger(__name__)
+    log.debug("Datos recibidos para login", extra={'datos': data})
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import has_request_context, request
+
+# Claves cuyos valores nunca se escriben en los logs
+CLAVES_SECRETAS = frozenset((
+    'password', 'confirm_password', 'contrasena', 'contraseña', 'secret', 'secret_key',
+    'token', 'authorization', 'cookie',
+))
+REDACTADO = '***'
+
+# 'password': 'abc' / "password"="abc" / password=abc dentro de un mensaje ya formateado
+_SECRETO_EN_TEXTO = re.compile(
+    r"""(['"]?\b(?:%s)\b['"]?\s*[:=]\s*)(?:'[^']*'|"[^"]*"|[^\s,;}&]+)""" % '|'.join(sorted(CLAVES_SECRETAS)),
+    re.IGNORECASE
+)
+
+_listener = None
+
+
+def redactar(datos):
+    """Retorna una copia de `datos` (dict/list anidados) con los valores de claves secretas reemplazados."""
+    if isinstance(datos, dict):
+        return {
+            clave: REDACTADO if str(clave).lower() in CLAVES_SECRETAS else redactar(valor)
+            for clave, valor in datos.items()
+        }
+    if isinstance(datos, (list, tuple)):
+        return [redactar(valor) for valor in datos]
+    return datos
+
+
+def redactar_texto(texto):
+    """Reemplaza los valores de claves secretas que aparezcan en un texto."""
+    return _SECRETO_EN_TEXTO.sub(lambda m: m.group(1) + REDACTADO, texto)
+
+
+def parse_muestreo(texto):
+    """Interpreta LOG_MUESTREO: 'home=0.01,lider=0.1,*=1' -> {'home': 0.01, 'lider': 0.1, '*': 1.0}."""
+    tasas = {}
+    for parte in (texto or '').split(','):
+        if '=' in parte:
+            endpoint, tasa = parte.split('=', 1)
+            tasas[endpoint.strip()] = float(tasa)
+    return tasas
+
+
+class FiltroSolicitud(logging.Filter):
+    """
+    Se ejecuta en el hilo que registra, antes de encolar:
+    - descarta una fracción de los logs DEBUG/INFO según la tasa de muestreo del endpoint
+      (los WARNING y ERROR se conservan siempre);
+    - agrega ruta y método del request, que el hilo de escritura ya no puede leer;
+    - redacta secretos en el mensaje y en `datos`.
+    """
+
+    def __init__(self, tasas=None):
+        super().__init__()
+        self.tasas = tasas or {}
+
+    def filter(self, record):
+        if has_request_context():
+            if self.tasas and record.levelno < logging.WARNING:
+                tasa = self.tasas.get(request.endpoint, self.tasas.get('*', 1.0))
+                if tasa < 1.0 and random.random() >= tasa:
+                    return False
+            record.ruta = request.path
+            record.metodo = request.method
+        try:
+            mensaje = record.getMessage()
+        except Exception: # Argumentos que no calzan con el mensaje: se deja el texto sin formatear
+            mensaje = str(record.msg)
+        record.msg = redactar_texto(mensaje)
+        record.args = None
+        datos = getattr(record, 'datos', None)
+        if datos is not None:
+            record.datos = redactar(datos)
+        return True
+
+
+class _ManejadorCola(QueueHandler):
+    """QueueHandler que deja el formato al hilo de escritura; solo resuelve la traza de la excepción."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = redactar_texto(logging.Formatter().formatException(record.exc_info))
+            record.exc_info = None
+        return record
+
+
+class FormatoTexto(logging.Formatter):
+    """'[NIVEL] mensaje', con los datos adjuntos al final si los hay."""
+
+    def __init__(self):
+        super().__init__('[%(levelname)s] %(message)s')
+
+    def format(self, record):
+        texto = super().format(record)
+        datos = getattr(record, 'datos', None)
+        if datos is not None:
+            texto += f" {json.dumps(datos, ensure_ascii=False, default=str)}"
+        return texto
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por línea: ts, nivel, logger, mensaje y, si existen, ruta, metodo, datos y excepcion."""
+
+    def format(self, record):
+        linea = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for campo in ('ruta', 'metodo', 'datos'):
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                linea[campo] = valor
+        if record.exc_info:
+            linea['excepcion'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            linea['excepcion'] = record.exc_text
+        return json.dumps(linea, ensure_ascii=False, default=str)
+
+
+def configurar_logs(nivel='INFO', formato='texto', muestreo=None, flujo=None):
+    """
+    Configura el logger raíz: nivel, formato ('texto' o 'json') y tasas de muestreo por endpoint
+    (ver parse_muestreo). Los registros se encolan y los escribe un QueueListener en `flujo`
+    (stdout por defecto). Se puede llamar de nuevo para reconfigurar.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    salida = logging.StreamHandler(flujo or sys.stdout)
+    salida.setFormatter(FormatoJSON() if formato == 'json' else FormatoTexto())
+
+    cola = queue.SimpleQueue()
+    manejador = _ManejadorCola(cola)
+    manejador.addFilter(FiltroSolicitud(parse_muestreo(muestreo) if isinstance(muestreo, str) else muestreo))
+
+    raiz = logging.getLogger()
+    for anterior in [h for h in raiz.handlers if isinstance(h, _ManejadorCola)]:
+        raiz.removeHandler(anterior)
+    raiz.addHandler(manejador)
+    raiz.setLevel(nivel.upper() if isinstance(nivel, str) else nivel)
+
+    _listener = QueueListener(cola, salida)
+    _listener.start()
+    return _listener
+
+
+@atexit.register
+def _detener():
+    # Escribe lo que quede en la cola antes de terminar el proceso
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,195 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus (endpoint /metrics).
+
+Por ruta: cantidad de requests, histograma de latencia, histograma de tamaño de respuesta y
+errores (respuestas 5xx). Por etapa: carga de catálogos, construcción de índices, render de
+plantillas y consultas a la DB. No depende de prometheus_client: cada observación es un
+perf_counter, un bisect y un incremento bajo un lock.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import before_render_template, g, request, template_rendered
+from sqlalchemy import event
+
+# Límites de los buckets (segundos y bytes)
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escapar(valor):
+    """Escapa el valor de una etiqueta (barra invertida, comillas y saltos de línea)."""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(nombres, valores, extra=''):
+    """Formatea las etiquetas de una muestra: {ruta="/lider",metodo="GET"}."""
+    partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return '{' + ','.join(partes) + '}' if partes else ''
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Contador monótono con etiquetas."""
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {} # valores de las etiquetas -> total
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_etiquetas, cantidad=1):
+        with self._lock:
+            self._valores[valores_etiquetas] = self._valores.get(valores_etiquetas, 0) + cantidad
+
+    def muestras(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        for etiquetas, total in sorted(valores):
+            yield f"{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {_numero(total)}"
+
+
+class Histograma:
+    """Histograma con buckets fijos y etiquetas (como el histogram de Prometheus)."""
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(limites)
+        self._series = {} # valores de las etiquetas -> [conteo por bucket (+Inf al final), suma]
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_etiquetas):
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = self._series[valores_etiquetas] = [[0] * (len(self.limites) + 1), 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def muestras(self):
+        with self._lock:
+            series = [(etiquetas, list(conteos), suma) for etiquetas, (conteos, suma) in self._series.items()]
+        for etiquetas, conteos, suma in sorted(series):
+            acumulado = 0
+            for limite, conteo in zip(self.limites + ('+Inf',), conteos):
+                acumulado += conteo
+                le = 'le="+Inf"' if limite == '+Inf' else f'le="{_numero(float(limite))}"'
+                yield f"{self.nombre}_bucket{_etiquetas(self.etiquetas, etiquetas, le)} {acumulado}"
+            yield f"{self.nombre}_sum{_etiquetas(self.etiquetas, etiquetas)} {_numero(float(suma))}"
+            yield f"{self.nombre}_count{_etiquetas(self.etiquetas, etiquetas)} {acumulado}"
+
+
+class Metricas:
+    """
+    Métricas HTTP y de etapas de la aplicación. Se conecta a Flask con init_app(app) y a
+    SQLAlchemy con instrumentar_db(); exportar() genera el texto para /metrics.
+    """
+
+    def __init__(self):
+        self.requests = Contador('http_requests_total', 'Requests atendidos por ruta, método y código de estado.',
+                                 ('ruta', 'metodo', 'estado'))
+        self.errores = Contador('http_request_errors_total', 'Respuestas con error del servidor (5xx) por ruta y método.',
+                                ('ruta', 'metodo'))
+        self.latencia = Histograma('http_request_duration_seconds', 'Latencia de los requests por ruta y método.',
+                                   ('ruta', 'metodo'))
+        self.tamano = Histograma('http_response_size_bytes', 'Tamaño de las respuestas por ruta (sin contar las de streaming).',
+                                 ('ruta',), LIMITES_BYTES)
+        self.etapas = Histograma('app_stage_duration_seconds', 'Duración de las etapas internas: catalogo_carga, '
+                                 'catalogo_indice, plantilla y db.', ('etapa',))
+        self._todas = (self.requests, self.errores, self.latencia, self.tamano, self.etapas)
+
+    # --- Flask ---
+
+    def init_app(self, app):
+        app.before_request(self._antes_request)
+        app.after_request(self._despues_request)
+        before_render_template.connect(self._antes_plantilla, app, weak=False)
+        template_rendered.connect(self._despues_plantilla, app, weak=False)
+
+    def _antes_request(self):
+        g._metricas_inicio = time.perf_counter()
+
+    def _despues_request(self, response):
+        inicio = g.pop('_metricas_inicio', None)
+        if inicio is None:
+            return response
+        # Se usa la regla de la ruta ('/api/productos/<tienda>') y no la URL, para acotar la cantidad de series
+        ruta = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+        self.latencia.observar(time.perf_counter() - inicio, ruta, request.method)
+        self.requests.incrementar(ruta, request.method, str(response.status_code))
+        if response.status_code >= 500:
+            self.errores.incrementar(ruta, request.method)
+        if response.content_length is not None:
+            self.tamano.observar(response.content_length, ruta)
+        return response
+
+    def _antes_plantilla(self, sender, template, context, **extra):
+        g.setdefault('_metricas_plantillas', []).append(time.perf_counter())
+
+    def _despues_plantilla(self, sender, template, context, **extra):
+        pila = g.get('_metricas_plantillas')
+        if pila:
+            self.etapas.observar(time.perf_counter() - pila.pop(), 'plantilla')
+
+    # --- SQLAlchemy ---
+
+    def instrumentar_db(self, objetivo):
+        """
+        Mide la duración de cada sentencia SQL. `objetivo` puede ser un Engine o la clase Engine
+        (sirve aunque el engine todavía no se haya creado).
+        """
+        event.listen(objetivo, 'before_cursor_execute', self._antes_sql)
+        event.listen(objetivo, 'after_cursor_execute', self._despues_sql)
+        event.listen(objetivo, 'handle_error', self._error_sql)
+
+    def _antes_sql(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metricas_sql', []).append(time.perf_counter())
+
+    def _despues_sql(self, conn, cursor, statement, parameters, context, executemany):
+        pila = conn.info.get('_metricas_sql')
+        if pila:
+            self.etapas.observar(time.perf_counter() - pila.pop(), 'db')
+
+    def _error_sql(self, contexto):
+        # Si la sentencia falla no se llama a after_cursor_execute: se descarta su inicio
+        pila = contexto.connection.info.get('_metricas_sql') if contexto.connection is not None else None
+        if pila:
+            pila.pop()
+
+    # --- Etapas ---
+
+    def observar_etapa(self, etapa, segundos):
+        self.etapas.observar(segundos, etapa)
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Mide la duración del bloque como una etapa: `with metricas.etapa('scraping'): ...`."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.observar(time.perf_counter() - inicio, nombre)
+
+    def exportar(self):
+        """Retorna todas las métricas en el formato de texto de Prometheus."""
+        lineas = []
+        for metrica in self._todas:
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            lineas.extend(metrica.muestras())
+        return '\n'.join(lineas) + '\n'
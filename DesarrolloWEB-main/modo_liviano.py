@@ -0,0 +1,108 @@
+"""
+Modo liviano de los navegadores de los scrapers: no descargar lo que no se usa.
+
+De cada producto se guarda la URL de la imagen, no la imagen; tampoco se necesitan fuentes,
+videos ni scripts de analítica. En modo liviano el navegador bloquea esos recursos y no espera
+el evento `load` para devolver el control (estrategia de carga 'eager': basta con el DOM listo;
+las esperas de esperas.py se encargan del contenido que llega después).
+
+- Selenium (navegadores.crear_driver): preferencia de Chrome que bloquea imágenes y
+  Network.setBlockedURLs (CDP) con `patrones_bloqueados()`.
+- Playwright (scrap-prubas01.py): context.route con `ruta_playwright`, según el tipo de recurso
+  y los mismos dominios de rastreo.
+
+Además `trafico` acumula los bytes transferidos y las páginas cargadas por tienda, para medir
+el ahorro (comparar una corrida con NAVEGADOR_LIVIANO=0 y otra con 1).
+
+Configuración por variables de entorno: NAVEGADOR_LIVIANO (1), NAVEGADOR_BLOQUEAR (tipos a
+bloquear, 'image,font,media,tracker') y NAVEGADOR_MEDIR_TRAFICO (1).
+"""
+import os
+import threading
+
+ACTIVO = os.environ.get('NAVEGADOR_LIVIANO', '1') not in ('0', 'false', 'no')
+BLOQUEAR = {t.strip() for t in os.environ.get('NAVEGADOR_BLOQUEAR', 'image,font,media,tracker').split(',') if t.strip()}
+MEDIR_TRAFICO = os.environ.get('NAVEGADOR_MEDIR_TRAFICO', '1') not in ('0', 'false', 'no')
+
+# Estrategia de carga de Selenium y evento que espera page.goto de Playwright
+ESTRATEGIA_CARGA = 'eager' if ACTIVO else 'normal'
+ESPERA_PLAYWRIGHT = 'domcontentloaded' if ACTIVO else 'load'
+
+# Extensiones por tipo de recurso (para los patrones de URL de CDP)
+EXTENSIONES = {
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'),
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'ogg', 'mp3', 'wav', 'm3u8', 'mpd'),
+}
+
+# Analítica, publicidad y grabación de sesiones
+RASTREADORES = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googleadservices.com',
+    'googlesyndication.com', 'facebook.net', 'connect.facebook.com', 'hotjar.com', 'clarity.ms',
+    'segment.io', 'segment.com', 'nr-data.net', 'newrelic.com', 'criteo.com', 'criteo.net',
+    'analytics.tiktok.com', 'bat.bing.com', 'taboola.com', 'outbrain.com', 'scorecardresearch.com',
+    'fullstory.com', 'mouseflow.com', 'quantserve.com', 'adnxs.com',
+)
+
+
+def patrones_bloqueados():
+    """Patrones de URL (con comodines, como los acepta Network.setBlockedURLs) de los tipos en BLOQUEAR."""
+    patrones = []
+    for tipo, extensiones in EXTENSIONES.items():
+        if tipo in BLOQUEAR:
+            # Con y sin query string (por ejemplo, imagen.jpg?v=3)
+            patrones += [f"*.{ext}" for ext in extensiones] + [f"*.{ext}?*" for ext in extensiones]
+    if 'tracker' in BLOQUEAR:
+        patrones += [f"*{dominio}*" for dominio in RASTREADORES]
+    return patrones
+
+
+def es_rastreador(url):
+    return any(dominio in url for dominio in RASTREADORES)
+
+
+def ruta_playwright(route):
+    """Manejador para context.route("**/*", ...): aborta los recursos de los tipos en BLOQUEAR."""
+    request = route.request
+    if request.resource_type in BLOQUEAR or ('tracker' in BLOQUEAR and es_rastreador(request.url)):
+        route.abort()
+    else:
+        route.continue_()
+
+
+class RegistroTrafico:
+    """Bytes transferidos y páginas cargadas, por tienda."""
+
+    def __init__(self):
+        self._bytes = {}
+        self._paginas = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, tienda, bytes_transferidos=0, paginas=0):
+        tienda = tienda or 'sin tienda'
+        with self._lock:
+            self._bytes[tienda] = self._bytes.get(tienda, 0) + bytes_transferidos
+            self._paginas[tienda] = self._paginas.get(tienda, 0) + paginas
+
+    def resumen(self):
+        """Retorna {tienda: {'paginas', 'bytes', 'kb_por_pagina'}}."""
+        with self._lock:
+            return {
+                tienda: {
+                    'paginas': self._paginas[tienda],
+                    'bytes': bytes_transferidos,
+                    'kb_por_pagina': round(bytes_transferidos / 1024 / max(self._paginas[tienda], 1), 1),
+                }
+                for tienda, bytes_transferidos in sorted(self._bytes.items())
+            }
+
+    def texto(self):
+        modo = 'liviano' if ACTIVO else 'completo'
+        return '\n'.join(
+            f"{tienda}: {datos['paginas']} páginas, {datos['bytes'] / 1024 / 1024:.1f} MB "
+            f"({datos['kb_por_pagina']} KB por página, modo {modo})"
+            for tienda, datos in self.resumen().items()
+        )
+
+
+trafico = RegistroTrafico()
@@ -0,0 +1,351 @@
+"""
+Pool de navegadores Chrome (Selenium) compartido por los scrapers.
+
+Abrir Chrome cuesta varios segundos y en corridas cortas domina el tiempo total. El pool mantiene
+hasta `tamano` navegadores abiertos y los reutiliza entre categorías y entre scrapers:
+
+- cada sesión recuerda en qué tiendas ya se preparó (página de inicio visitada y pop-ups de
+  cookies o de bienvenida cerrados), así que al reutilizarla en la misma tienda no se repite;
+- antes de entregar un navegador se verifica que siga respondiendo; si se cayó, se descarta
+  y se abre otro;
+- tras `max_paginas` páginas el navegador se recicla (se cierra y se abre uno nuevo), para acotar
+  la memoria que va acumulando Chrome.
+
+Uso:
+    pool = pool_compartido(headless=True)
+    with pool.sesion('alvi', url_inicio='https://www.alvi.cl') as sesion:
+        sesion.abrir(url)              # driver.get(url) y cuenta la página
+        sesion.driver.find_elements(...)
+
+Configuración por variables de entorno: NAVEGADORES_POOL (navegadores abiertos a la vez, 2),
+NAVEGADORES_MAX_PAGINAS (páginas antes de reciclar, 50) y NAVEGADORES_ESPERA_S (segundos máximos
+esperando un navegador libre, 300). El pool es de cada proceso.
+
+Los navegadores se abren en modo liviano (sin imágenes, fuentes, videos ni rastreadores; ver
+modo_liviano.py), y cada sesión suma a modo_liviano.trafico los bytes que transfiere por tienda.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import modo_liviano
+from modo_liviano import trafico
+
+try:
+    from webdriver_manager.chrome import ChromeDriverManager # Opcional: descarga ChromeDriver
+except ImportError:
+    ChromeDriverManager = None
+
+log = logging.getLogger('navegadores')
+
+TAMANO = int(os.environ.get('NAVEGADORES_POOL', '2'))
+MAX_PAGINAS = int(os.environ.get('NAVEGADORES_MAX_PAGINAS', '50'))
+ESPERA = float(os.environ.get('NAVEGADORES_ESPERA_S', '300'))
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Botones de pop-ups de cookies, bienvenida o ubicación (VTEX y genéricos)
+SELECTORES_POPUP = (
+    (By.CSS_SELECTOR, "button[aria-label*='Cerrar'], button[data-testid*='close-button'], "
+                      ".vtex-modal-layout-0-x-closeButton, button.close-button, div.close-button, a.close-button"),
+    (By.XPATH, "//button[contains(translate(text(), 'ACEPTAR', 'aceptar'), 'aceptar') "
+               "or contains(translate(text(), 'CERRAR', 'cerrar'), 'cerrar')]"),
+)
+
+_ruta_chromedriver = None # ChromeDriverManager().install() se resuelve una sola vez por proceso
+
+
+def crear_driver(headless=True):
+    """Abre un Chrome con las opciones comunes de los scrapers (sin marcas de automatización)."""
+    global _ruta_chromedriver
+    opciones = Options()
+    if headless:
+        opciones.add_argument("--headless=new")
+    opciones.add_argument("--no-sandbox")
+    opciones.add_argument("--disable-dev-shm-usage")
+    opciones.add_argument("--disable-gpu")
+    opciones.add_argument("--window-size=1920,1080")
+    opciones.add_argument("--disable-blink-features=AutomationControlled")
+    opciones.add_argument("--disable-extensions")
+    opciones.add_argument("--log-level=3")
+    opciones.add_argument(f"--user-agent={USER_AGENT}")
+    opciones.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    opciones.add_experimental_option('useAutomationExtension', False)
+    opciones.page_load_strategy = modo_liviano.ESTRATEGIA_CARGA # 'eager': driver.get vuelve con el DOM listo
+    if modo_liviano.ACTIVO and 'image' in modo_liviano.BLOQUEAR:
+        opciones.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    if modo_liviano.MEDIR_TRAFICO:
+        # Eventos de red de Chrome (Network.loadingFinished) para bytes_transferidos()
+        opciones.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    if ChromeDriverManager is not None:
+        if _ruta_chromedriver is None:
+            _ruta_chromedriver = ChromeDriverManager().install()
+        driver = webdriver.Chrome(service=Service(_ruta_chromedriver), options=opciones)
+    else:
+        driver = webdriver.Chrome(options=opciones)
+    # A diferencia de execute_script, se aplica a todas las páginas que abra el navegador reutilizado
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})",
+    })
+    if modo_liviano.ACTIVO:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': modo_liviano.patrones_bloqueados()})
+    driver.set_page_load_timeout(60)
+    return driver
+
+
+def bytes_transferidos(driver):
+    """
+    Bytes recibidos por la red (comprimidos, con encabezados) desde la lectura anterior, según los
+    eventos Network.loadingFinished del log de rendimiento. Retorna 0 si no se está midiendo.
+    """
+    if not modo_liviano.MEDIR_TRAFICO:
+        return 0
+    try:
+        entradas = driver.get_log('performance') # Leer el log lo vacía
+    except Exception as e: # Navegador caído o driver sin log de rendimiento
+        log.debug("No se pudo leer el log de rendimiento: %s", e)
+        return 0
+    total = 0
+    for entrada in entradas:
+        mensaje = entrada.get('message', '')
+        if '"Network.loadingFinished"' in mensaje: # Evita decodificar el resto de los eventos
+            total += json.loads(mensaje)['message']['params'].get('encodedDataLength', 0)
+    return int(total)
+
+
+def cerrar_popups(driver, espera=5):
+    """Cierra el primer pop-up de cookies o bienvenida que aparezca en `espera` segundos. Retorna True si cerró alguno."""
+    try:
+        boton = WebDriverWait(driver, espera).until(
+            EC.any_of(*(EC.element_to_be_clickable(selector) for selector in SELECTORES_POPUP))
+        )
+    except TimeoutException:
+        return False
+    driver.execute_script("arguments[0].click();", boton)
+    return True
+
+
+class SesionNavegador:
+    """
+    Un navegador del pool: el driver, las páginas que lleva, las tiendas en las que ya se preparó y
+    la tienda para la que se está usando (a la que se suma el tráfico).
+    """
+
+    def __init__(self, driver, pool=None):
+        self.driver = driver
+        self.pool = pool
+        self.paginas = 0
+        self.tiendas = set()
+        self.tienda = None
+
+    def medir_trafico(self, paginas=0):
+        """Suma a modo_liviano.trafico los bytes transferidos desde la medición anterior y `paginas` páginas."""
+        trafico.agregar(self.tienda, bytes_transferidos(self.driver), paginas)
+
+    def abrir(self, url):
+        """driver.get(url), contando la página para el reciclaje y el tráfico."""
+        self.medir_trafico(paginas=1)
+        self.driver.get(url)
+        self.paginas += 1
+
+    def contar_pagina(self):
+        """Cuenta una página cargada sin driver.get (por ejemplo, al hacer clic en la paginación)."""
+        self.medir_trafico(paginas=1)
+        self.paginas += 1
+
+    def sana(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def cerrar(self):
+        try:
+            self.driver.quit()
+        except Exception as e: # El proceso de Chrome pudo haber muerto ya
+            log.debug("Error al cerrar el navegador: %s", e)
+
+    def liberar(self):
+        """Devuelve el navegador al pool (o lo cierra si no viene de uno)."""
+        if self.pool is not None:
+            self.pool.liberar(self)
+        else:
+            self.medir_trafico()
+            self.cerrar()
+
+
+class PoolNavegadores:
+    """
+    Hasta `tamano` navegadores abiertos a la vez. adquirir() entrega uno libre (o abre uno nuevo)
+    y bloquea si están todos en uso; liberar() lo devuelve, o lo cierra si ya cargó `max_paginas`.
+    """
+
+    def __init__(self, tamano=TAMANO, max_paginas=MAX_PAGINAS, headless=True, crear=None):
+        self.tamano = tamano
+        self.max_paginas = max_paginas
+        self.headless = headless
+        self._crear = crear or (lambda: crear_driver(headless))
+        self._libres = [] # Se reutiliza primero el último devuelto (el más "caliente")
+        self._en_uso = 0 # Sesiones entregadas por adquirir() y todavía no liberadas
+        self._cupos = threading.BoundedSemaphore(tamano)
+        self._lock = threading.Lock()
+        self._cerrado = False
+        # Contadores para monitoreo
+        self.creados = 0
+        self.reutilizados = 0
+        self.reciclados = 0
+        self.caidos = 0
+
+    def _nueva(self):
+        sesion = SesionNavegador(self._crear(), self)
+        with self._lock:
+            self.creados += 1
+        log.info("Navegador abierto (%d en total).", self.creados)
+        return sesion
+
+    def _libre(self):
+        """Retorna una sesión libre que siga respondiendo, descartando las caídas, o None."""
+        while True:
+            with self._lock:
+                if not self._libres:
+                    return None
+                sesion = self._libres.pop()
+            if sesion.sana():
+                with self._lock:
+                    self.reutilizados += 1
+                return sesion
+            with self._lock:
+                self.caidos += 1
+            log.warning("Navegador del pool sin respuesta; se descarta.")
+            sesion.cerrar()
+
+    def adquirir(self, tienda=None, url_inicio=None, espera=ESPERA):
+        """
+        Entrega una SesionNavegador. Si se indica `tienda` y la sesión todavía no se preparó para
+        ella, abre `url_inicio` y cierra los pop-ups de cookies o bienvenida.
+        """
+        if not self._cupos.acquire(timeout=espera):
+            raise TimeoutError(f"No hubo un navegador libre en {espera:.0f} s.")
+        sesion = None
+        try:
+            sesion = self._libre() or self._nueva()
+            sesion.tienda = tienda
+            if tienda is not None and tienda not in sesion.tiendas:
+                if url_inicio:
+                    sesion.abrir(url_inicio)
+                    cerrar_popups(sesion.driver)
+                sesion.tiendas.add(tienda)
+            with self._lock:
+                self._en_uso += 1
+            return sesion
+        except BaseException:
+            if sesion is not None:
+                sesion.cerrar()
+            self._cupos.release()
+            raise
+
+    def liberar(self, sesion):
+        with self._lock:
+            self._en_uso -= 1
+        try:
+            sesion.medir_trafico() # Lo que quedó de la última página, antes de cerrar o guardar el navegador
+            if self._cerrado:
+                sesion.cerrar()
+            elif sesion.paginas >= self.max_paginas:
+                with self._lock:
+                    self.reciclados += 1
+                log.info("Navegador reciclado tras %d páginas.", sesion.paginas)
+                sesion.cerrar()
+            else:
+                with self._lock:
+                    self._libres.append(sesion)
+        finally:
+            self._cupos.release()
+
+    @contextmanager
+    def sesion(self, tienda=None, url_inicio=None):
+        sesion = self.adquirir(tienda, url_inicio)
+        try:
+            yield sesion
+        finally:
+            self.liberar(sesion)
+
+    def precalentar(self, cantidad=None):
+        """
+        Abre en paralelo los navegadores que falten para tener `cantidad` abiertos (por defecto, el tamaño
+        del pool), contando los libres y los que están en uso, antes de necesitarlos.
+        """
+        with self._lock:
+            faltan = max(min(cantidad or self.tamano, self.tamano) - len(self._libres) - self._en_uso, 0)
+
+        def abrir():
+            try:
+                sesion = self._nueva()
+            except Exception as e:
+                log.error("No se pudo abrir un navegador: %s", e)
+                return
+            with self._lock:
+                # Mientras se abría pudo crearse otro con adquirir(): nunca más de `tamano` abiertos
+                sobra = self._cerrado or len(self._libres) + self._en_uso >= self.tamano
+                if not sobra:
+                    self._libres.append(sesion)
+            if sobra:
+                sesion.cerrar()
+
+        hilos = [threading.Thread(target=abrir, name='pool-navegadores') for _ in range(faltan)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+    def cerrar(self):
+        """Cierra los navegadores libres; los que están en uso se cierran al liberarse."""
+        self._cerrado = True
+        with self._lock:
+            libres, self._libres = self._libres, []
+        for sesion in libres:
+            sesion.cerrar()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tamano': self.tamano,
+                'libres': len(self._libres),
+                'en_uso': self._en_uso,
+                'creados': self.creados,
+                'reutilizados': self.reutilizados,
+                'reciclados': self.reciclados,
+                'caidos': self.caidos,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_compartido(headless=True):
+    """Retorna el pool del proceso para el modo indicado (con o sin ventana), creándolo la primera vez."""
+    with _pools_lock:
+        if headless not in _pools:
+            _pools[headless] = PoolNavegadores(headless=headless)
+        return _pools[headless]
+
+
+@atexit.register
+def _cerrar_pools():
+    for pool in list(_pools.values()):
+        pool.cerrar()
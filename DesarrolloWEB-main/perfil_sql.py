@@ -0,0 +1,121 @@
+"""
+Perfilador de consultas SQL basado en los eventos del engine de SQLAlchemy.
+
+Por cada request registra las sentencias ejecutadas (duración y filas afectadas) y al terminar:
+- escribe en el log 'sql.lento' las sentencias que superan el umbral de lentitud;
+- avisa de posibles N+1: la misma sentencia ejecutada muchas veces en un mismo request;
+- opcionalmente agrega el encabezado Server-Timing (visible en las herramientas del navegador).
+
+Los parámetros de las sentencias nunca se escriben (pueden contener hashes de contraseñas).
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+log = logging.getLogger('sql')
+log_lento = logging.getLogger('sql.lento')
+
+MAX_SENTENCIA_LOG = 500 # Caracteres de la sentencia que se escriben en el log
+
+
+def _resumir(sentencia):
+    sentencia = ' '.join(sentencia.split())
+    return sentencia if len(sentencia) <= MAX_SENTENCIA_LOG else sentencia[:MAX_SENTENCIA_LOG] + '...'
+
+
+class PerfiladorSQL:
+    """
+    Se conecta a Flask con init_app(app) y a SQLAlchemy con instrumentar(engine o clase Engine).
+
+    - umbral_lento: segundos a partir de los cuales una sentencia se registra como lenta.
+    - umbral_repeticiones: ejecuciones de la misma sentencia en un request para avisar de un N+1.
+    - server_timing: si se agrega el encabezado Server-Timing a las respuestas.
+    """
+
+    def __init__(self, umbral_lento=0.2, umbral_repeticiones=10, server_timing=False, max_lentas=50):
+        self.umbral_lento = umbral_lento
+        self.umbral_repeticiones = umbral_repeticiones
+        self.server_timing = server_timing
+        self._lentas = deque(maxlen=max_lentas) # últimas sentencias lentas, para /api/sql/stats
+        self._lock = threading.Lock()
+        # Contadores para monitoreo
+        self.consultas = 0
+        self.lentas = 0
+        self.n_mas_uno = 0
+
+    def init_app(self, app):
+        app.after_request(self._despues_request)
+
+    def instrumentar(self, objetivo):
+        event.listen(objetivo, 'before_cursor_execute', self._antes)
+        event.listen(objetivo, 'after_cursor_execute', self._despues)
+        event.listen(objetivo, 'handle_error', self._error)
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_perfil_sql', []).append(time.perf_counter())
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        pila = conn.info.get('_perfil_sql')
+        if not pila:
+            return
+        duracion = time.perf_counter() - pila.pop()
+        filas = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+
+        with self._lock:
+            self.consultas += 1
+        if has_request_context():
+            g.setdefault('_perfil_sql', []).append((statement, duracion, filas))
+        if duracion >= self.umbral_lento:
+            self._registrar_lenta(statement, duracion, filas)
+
+    def _error(self, contexto):
+        pila = contexto.connection.info.get('_perfil_sql') if contexto.connection is not None else None
+        if pila:
+            pila.pop()
+
+    def _registrar_lenta(self, statement, duracion, filas):
+        ruta = request.path if has_request_context() else None
+        with self._lock:
+            self.lentas += 1
+            self._lentas.append({
+                'sentencia': _resumir(statement),
+                'ms': round(duracion * 1000, 2),
+                'filas': filas,
+                'ruta': ruta,
+                'ts': time.time(),
+            })
+        log_lento.warning("Consulta lenta (%.1f ms, filas: %s): %s", duracion * 1000, filas, _resumir(statement))
+
+    def _despues_request(self, response):
+        sentencias = g.pop('_perfil_sql', None)
+        if not sentencias:
+            return response
+        total = sum(duracion for _, duracion, _ in sentencias)
+
+        repetidas = [(sentencia, veces) for sentencia, veces in Counter(s for s, _, _ in sentencias).most_common()
+                     if veces >= self.umbral_repeticiones]
+        for sentencia, veces in repetidas:
+            with self._lock:
+                self.n_mas_uno += 1
+            log.warning("Posible N+1 en %s: sentencia ejecutada %d veces: %s", request.path, veces, _resumir(sentencia))
+
+        log.debug("%d consultas SQL en %.1f ms.", len(sentencias), total * 1000)
+        if self.server_timing:
+            response.headers.add('Server-Timing', f'db;dur={total * 1000:.2f};desc="{len(sentencias)} consultas"')
+        return response
+
+    def stats(self):
+        """Retorna los contadores del perfilador y las últimas sentencias lentas."""
+        with self._lock:
+            return {
+                'consultas': self.consultas,
+                'lentas': self.lentas,
+                'n_mas_uno': self.n_mas_uno,
+                'umbral_lento_ms': self.umbral_lento * 1000,
+                'umbral_repeticiones': self.umbral_repeticiones,
+                'ultimas_lentas': list(self._lentas),
+            }
@@ -0,0 +1,205 @@
+"""
+Perfilador bajo demanda para rutas de Flask y etapas de los scrapers.
+
+Dos modos:
+- 'cprofile': cProfile determinista; genera un archivo .pstats (ver con `python -m pstats` o snakeviz).
+- 'muestreo': un hilo toma la pila del hilo perfilado cada `intervalo` segundos y genera un archivo
+  .collapsed (formato de pilas colapsadas, para flamegraph.pl o speedscope). Mucho menos invasivo.
+
+Rutas: PerfiladorRutas(...).init_app(app) perfila los endpoints de PERFIL_RUTAS (con una tasa de
+muestreo de requests) o los requests que traen el encabezado `X-Perfil: <PERFIL_TOKEN>`.
+Scrapers: el decorador `etapa_perfilada('unimarc.scrape_ofertas')` perfila la función si la etapa
+está en la variable de entorno PERFIL_ETAPAS ('*' para todas).
+
+Desactivado no cuesta nada: sin rutas ni token no se registran hooks en Flask, y una etapa que no
+está en PERFIL_ETAPAS deja la función decorada sin envolver.
+"""
+import cProfile
+import functools
+import hmac
+import itertools
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, request
+
+log = logging.getLogger('perfilador')
+
+MODOS = ('cprofile', 'muestreo')
+EXTENSIONES = {'cprofile': '.pstats', 'muestreo': '.collapsed'}
+
+DIRECTORIO = os.environ.get('PERFIL_DIRECTORIO', 'perfiles')
+MODO = os.environ.get('PERFIL_MODO', 'cprofile')
+INTERVALO = float(os.environ.get('PERFIL_INTERVALO_MS', '5')) / 1000
+ETAPAS = frozenset(e.strip() for e in os.environ.get('PERFIL_ETAPAS', '').split(',') if e.strip())
+
+_secuencia = itertools.count(1) # Distingue archivos generados en el mismo segundo
+
+
+def _nombre_archivo(directorio, nombre, modo):
+    seguro = re.sub(r'[^A-Za-z0-9_.-]+', '_', nombre).strip('_') or 'perfil'
+    marca = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(directorio, f"{seguro}-{marca}-{os.getpid()}-{next(_secuencia)}{EXTENSIONES[modo]}")
+
+
+class MuestreadorPilas:
+    """Toma periódicamente la pila de un hilo y cuenta cuántas veces aparece cada una."""
+
+    def __init__(self, id_hilo, intervalo):
+        self.id_hilo = id_hilo
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self._fin = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name='perfilador-muestreo', daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._fin.set()
+        self._hilo.join()
+
+    def _muestrear(self):
+        while not self._fin.wait(self.intervalo):
+            frame = sys._current_frames().get(self.id_hilo)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                pila.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                frame = frame.f_back
+            if pila:
+                self.pilas[';'.join(reversed(pila))] += 1
+
+    def guardar(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            for pila, cantidad in self.pilas.most_common():
+                f.write(f"{pila} {cantidad}\n")
+
+
+class Perfil:
+    """Una ejecución del perfilador sobre el hilo actual; detener() guarda el archivo y retorna su ruta."""
+
+    def __init__(self, nombre, modo=None, directorio=None, intervalo=None):
+        self.nombre = nombre
+        self.modo = modo if modo in MODOS else MODO
+        self.directorio = directorio or DIRECTORIO
+        self.intervalo = intervalo or INTERVALO
+        self._perfil = None
+        self._inicio = None
+
+    def iniciar(self):
+        if self.modo == 'cprofile':
+            self._perfil = cProfile.Profile()
+            try:
+                self._perfil.enable()
+            except ValueError as e: # Otro perfilador ya está activo (Python 3.12+ admite uno solo)
+                log.warning("No se pudo iniciar cProfile para %s: %s", self.nombre, e)
+                self._perfil = None
+                return self
+        else:
+            self._perfil = MuestreadorPilas(threading.get_ident(), self.intervalo)
+            self._perfil.iniciar()
+        self._inicio = time.perf_counter()
+        return self
+
+    def detener(self):
+        if self._perfil is None:
+            return None
+        duracion = time.perf_counter() - self._inicio
+        if self.modo == 'cprofile':
+            self._perfil.disable()
+        else:
+            self._perfil.detener()
+
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = _nombre_archivo(self.directorio, self.nombre, self.modo)
+        if self.modo == 'cprofile':
+            self._perfil.dump_stats(ruta)
+        else:
+            self._perfil.guardar(ruta)
+        self._perfil = None
+        log.info("Perfil de %s (%.1f ms, %s) guardado en %s", self.nombre, duracion * 1000, self.modo, ruta)
+        return ruta
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+        return False
+
+
+def etapa_perfilada(nombre):
+    """
+    Decorador para etapas de los scrapers. Si `nombre` (o '*') está en PERFIL_ETAPAS, cada llamada
+    se perfila y genera su archivo; si no, retorna la función tal cual.
+    """
+    def decorador(funcion):
+        if nombre not in ETAPAS and '*' not in ETAPAS:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with Perfil(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+class PerfiladorRutas:
+    """
+    Perfila requests de Flask.
+
+    - rutas: endpoints a perfilar ('api_search', 'lider', ... o '*').
+    - tasa: fracción de los requests de esas rutas que se perfilan (0.01 = uno de cada cien).
+    - token: si se define, cualquier request con `X-Perfil: <token>` se perfila; el modo se puede
+      elegir con `X-Perfil-Modo: cprofile|muestreo`.
+    La respuesta perfilada lleva el encabezado X-Perfil-Archivo con el nombre del archivo generado.
+    """
+
+    def __init__(self, rutas=(), tasa=1.0, token=None, modo=None, directorio=None, intervalo=None):
+        self.rutas = frozenset(rutas)
+        self.tasa = tasa
+        self.token = token
+        self.modo = modo
+        self.directorio = directorio
+        self.intervalo = intervalo
+
+    def init_app(self, app):
+        if not self.rutas and not self.token:
+            return # Desactivado: ningún hook en el camino de los requests
+        app.before_request(self._antes_request)
+        app.after_request(self._despues_request)
+        app.teardown_request(self._teardown_request)
+
+    def _debe_perfilar(self):
+        if self.token and hmac.compare_digest(request.headers.get('X-Perfil', '').encode(), self.token.encode()):
+            return request.headers.get('X-Perfil-Modo') or self.modo
+        if (request.endpoint in self.rutas or '*' in self.rutas) and (self.tasa >= 1.0 or random.random() < self.tasa):
+            return self.modo
+        return False
+
+    def _antes_request(self):
+        modo = self._debe_perfilar()
+        if modo is not False:
+            g._perfil = Perfil(f"{request.endpoint or 'sin_ruta'}", modo, self.directorio, self.intervalo).iniciar()
+
+    def _despues_request(self, response):
+        perfil = g.pop('_perfil', None)
+        if perfil is not None:
+            ruta = perfil.detener()
+            if ruta is not None:
+                response.headers['X-Perfil-Archivo'] = os.path.basename(ruta)
+        return response
+
+    def _teardown_request(self, exc):
+        # Si el request terminó con una excepción no se llamó a after_request
+        perfil = g.pop('_perfil', None)
+        if perfil is not None:
+            perfil.detener()
@@ -0,0 +1,139 @@
+"""
+Paso de publicación de los catálogos de static/data/.
+
+Reescribe cada JSON minificado y genera a su lado las variantes precomprimidas
+`.json.gz` (y `.json.br` si está instalado el paquete `brotli`). La aplicación sirve
+la variante que acepte el navegador sin comprimir en cada request.
+
+Todos los archivos se escriben de forma atómica (escribir_atomico): la aplicación y los
+navegadores ven la versión anterior completa o la nueva completa, nunca un archivo a medio
+escribir. Los scrapers publican sus resultados con guardar_json_atomico.
+
+Uso:
+    python publicar.py [directorio]   (por defecto static/data/)
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+
+try:
+    import brotli # Opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Extensión de cada variante, en orden de preferencia al servir
+VARIANTES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def escribir_atomico(ruta, contenido):
+    """
+    Escribe `contenido` (bytes) en `ruta` sin que nadie pueda leer un archivo a medio escribir:
+    se escribe en un temporal del mismo directorio, se fuerza a disco (fsync) y se renombra sobre
+    el destino (os.replace es atómico en el mismo sistema de archivos, también en Windows).
+    """
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    fd, temporal = tempfile.mkstemp(prefix='.' + os.path.basename(ruta) + '.', suffix='.tmp', dir=directorio)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, 'O_DIRECTORY'): # Persiste también el renombrado (POSIX)
+        fd = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def guardar_json_atomico(ruta, datos, **opciones):
+    """Serializa `datos` como JSON (opciones de json.dumps, por defecto ensure_ascii=False) y lo escribe con escribir_atomico."""
+    opciones.setdefault('ensure_ascii', False)
+    escribir_atomico(ruta, json.dumps(datos, **opciones).encode('utf-8'))
+
+
+def _escribir_si_cambia(ruta, contenido):
+    """Escribe el archivo solo si su contenido cambió, para no alterar su mtime (y su ETag) sin motivo."""
+    try:
+        with open(ruta, 'rb') as f:
+            if f.read() == contenido:
+                return False
+    except FileNotFoundError:
+        pass
+    escribir_atomico(ruta, contenido)
+    return True
+
+
+def publicar_archivo(ruta):
+    """
+    Minifica un archivo JSON y genera sus variantes comprimidas.
+    Retorna un diccionario con el tamaño en bytes de cada versión.
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    minificado = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    _escribir_si_cambia(ruta, minificado)
+
+    tamanos = {'json': len(minificado)}
+    # Las variantes se reescriben siempre: deben quedar más recientes que el original para que se sirvan
+    comprimido = gzip.compress(minificado, compresslevel=9, mtime=0)
+    escribir_atomico(ruta + '.gz', comprimido)
+    tamanos['gzip'] = len(comprimido)
+
+    if brotli is not None:
+        comprimido = brotli.compress(minificado, quality=11)
+        escribir_atomico(ruta + '.br', comprimido)
+        tamanos['br'] = len(comprimido)
+    return tamanos
+
+
+def publicar_directorio(directorio):
+    """Publica todos los archivos .json del directorio. Retorna {nombre de archivo: tamaños}."""
+    resultados = {}
+    for nombre in sorted(os.listdir(directorio)):
+        if not nombre.endswith('.json'):
+            continue
+        try:
+            resultados[nombre] = publicar_archivo(os.path.join(directorio, nombre))
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] No se pudo publicar {nombre}: {e}")
+    return resultados
+
+
+def variante_comprimida(ruta, accept_encodings):
+    """
+    Elige la variante precomprimida de `ruta` que acepta el cliente.
+    Solo se usa una variante si es al menos tan reciente como el original (un scraper pudo
+    reescribir el JSON después de publicarlo). Retorna (codificación, ruta) o (None, ruta).
+    """
+    try:
+        mtime_original = os.stat(ruta).st_mtime_ns
+    except FileNotFoundError:
+        return None, ruta
+    for codificacion, extension in VARIANTES:
+        if not accept_encodings[codificacion]:
+            continue
+        try:
+            if os.stat(ruta + extension).st_mtime_ns >= mtime_original:
+                return codificacion, ruta + extension
+        except FileNotFoundError:
+            continue
+    return None, ruta
+
+
+if __name__ == "__main__":
+    directorio = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'data')
+    for nombre, tamanos in publicar_directorio(directorio).items():
+        detalle = ', '.join(f"{formato}: {tamano:,} bytes" for formato, tamano in tamanos.items())
+        print(f"[INFO] {nombre} publicado ({detalle})")
+    if brotli is None:
+        print("[INFO] Paquete 'brotli' no instalado: solo se generaron variantes .gz.")
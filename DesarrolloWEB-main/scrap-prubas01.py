@@ -1,11 +1,15 @@
 # Importa las librerías necesarias
 from playwright.sync_api import sync_playwright # Para la automatización del navegador
-import json # Para guardar los datos en formato JSON
 import re # Para expresiones regulares, útil para limpiar precios
 import time # Para añadir pausas explícitas
 import random # Para generar retrasos aleatorios y simular comportamiento humano
 import unicodedata # Para normalizar texto (quitar acentos)
 
+from perfilador import etapa_perfilada # Perfilado opcional con PERFIL_ETAPAS=lider.scrape
+from publicar import guardar_json_atomico # La app nunca ve el JSON a medio escribir
+import modo_liviano # Sin imágenes, fuentes, videos ni rastreadores, y bytes por página (NAVEGADOR_LIVIANO)
+
+@etapa_perfilada('lider.scrape')
 def scrape_lider_products(url, output_file="ofertas_lider.json"): # MODIFICADO: Nombre de archivo de salida
     """
     Realiza scraping de productos de una URL específica de Lider.cl
@@ -101,7 +105,20 @@ def scrape_lider_products(url, output_file="ofertas_lider.json"): # MODIFICADO:
             }
         )
         
+        # Modo liviano: abortar imágenes, fuentes, videos y rastreadores (solo se guarda la URL de la imagen)
+        if modo_liviano.ACTIVO:
+            context.route("**/*", modo_liviano.ruta_playwright)
+
         page = context.new_page()
+
+        # Bytes recibidos por la red (Network.loadingFinished de CDP), para reportar el tráfico por página
+        bytes_red = {'total': 0}
+        if modo_liviano.MEDIR_TRAFICO:
+            def sumar_bytes(evento):
+                bytes_red['total'] += evento.get('encodedDataLength', 0)
+            cdp = context.new_cdp_session(page)
+            cdp.send('Network.enable')
+            cdp.on('Network.loadingFinished', sumar_bytes)
         
         # Inyectar script para eliminar propiedades que indican automatización (ej. navigator.webdriver)
         page.add_init_script("""
@@ -291,8 +308,8 @@ def scrape_lider_products(url, output_file="ofertas_lider.json"): # MODIFICADO:
             for attempt in range(retries):
                 try:
                     print(f"🌐 Navegando a: {target_url} (Intento {attempt + 1})")
-                    # MODIFICACIÓN: Cambiar wait_until a "load" para asegurar la carga completa de recursos
-                    page.goto(target_url, wait_until="load", timeout=90000) 
+                    # "load" espera todos los recursos; en modo liviano basta con "domcontentloaded" (los productos se esperan abajo)
+                    page.goto(target_url, wait_until=modo_liviano.ESPERA_PLAYWRIGHT, timeout=90000) 
                     
                     time.sleep(random.uniform(2, 5)) # Pausa aleatoria
                     
@@ -602,10 +619,11 @@ def scrape_lider_products(url, output_file="ofertas_lider.json"): # MODIFICADO:
         print(f"\n🎉 Scraping completado!")
         print(f"📊 Total productos extraídos: {len(all_products_data)}")
         print(f"📄 Páginas procesadas: {page_number}")
+        modo_liviano.trafico.agregar('lider', int(bytes_red['total']), paginas=page_number)
+        print(f"📦 Tráfico:\n{modo_liviano.trafico.texto()}")
 
-        # Guardar datos
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products_data, f, ensure_ascii=False, indent=4)
+        # Guardar datos (de forma atómica: la app ve el archivo anterior o el nuevo completo)
+        guardar_json_atomico(output_file, all_products_data, indent=4)
         
         print(f"💾 Datos guardados en: {output_file}")
         
@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class HashSaturado(Exception):
+    """Se lanza cuando el pool de hashing está lleno y no hay cupo antes del tiempo de espera."""
+
+
+def normalizar_metodo(metodo):
+    """
+    Completa un método de hashing de werkzeug con sus parámetros por defecto, tal como
+    queda guardado en el hash ('scrypt' -> 'scrypt:32768:8:1', 'pbkdf2' -> 'pbkdf2:sha256:<iteraciones>').
+    """
+    nombre, *args = metodo.split(':')
+    if nombre == 'scrypt':
+        n, r, p = args if args else (2 ** 15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if nombre == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iteraciones = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iteraciones}"
+    raise ValueError(f"Método de hashing inválido: '{metodo}'.")
+
+
+class PoliticaHash:
+    """
+    Política de hashing de contraseñas: método y costo configurables, y un pool de hilos
+    opcional y acotado para no bloquear el hilo del request.
+
+    scrypt y pbkdf2 (hashlib) liberan el GIL mientras calculan, así que con el pool un grupo de
+    logins ocupa como máximo `workers` núcleos y el resto de las páginas se sigue atendiendo.
+    Si ya hay `workers + cola` hashes en curso, se espera hasta `timeout` segundos y luego se
+    lanza HashSaturado (la ruta responde 503 en vez de acumular trabajo).
+    """
+
+    def __init__(self, metodo='scrypt', workers=0, cola=16, timeout=2.0):
+        self.metodo = normalizar_metodo(metodo)
+        self.timeout = timeout
+        self._pool = None
+        self._cupos = None
+        if workers > 0:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hash')
+            self._cupos = threading.BoundedSemaphore(workers + cola)
+
+    def _ejecutar(self, funcion, *args):
+        if self._pool is None:
+            return funcion(*args)
+        if not self._cupos.acquire(timeout=self.timeout):
+            raise HashSaturado()
+        try:
+            return self._pool.submit(funcion, *args).result()
+        finally:
+            self._cupos.release()
+
+    def generar(self, password):
+        """Retorna el hash de la contraseña con el método de la política."""
+        return self._ejecutar(generate_password_hash, password, self.metodo)
+
+    def verificar(self, hash_guardado, password):
+        """Verifica la contraseña contra el hash guardado (con el método que tenga ese hash)."""
+        return self._ejecutar(check_password_hash, hash_guardado, password)
+
+    def necesita_rehash(self, hash_guardado):
+        """Indica si el hash guardado usa un método o costo distinto al de la política actual."""
+        return hash_guardado.split('$', 1)[0] != self.metodo
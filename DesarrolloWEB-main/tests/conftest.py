@@ -0,0 +1,14 @@
+import os
+import sys
+
+# Los módulos de la aplicación están en la raíz del proyecto (no es un paquete)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py lee su configuración al importarse: base en memoria, sin precarga ni vigilante de catálogos
+# y sin escribir caché de plantillas, para que las pruebas no dependan de static/data/ ni lo modifiquen
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('CATALOGO_PRECARGA', 'off')
+os.environ.setdefault('CATALOGO_VIGILANCIA_S', '0')
+os.environ.setdefault('JINJA_BYTECODE_CACHE', '0')
+os.environ.setdefault('PLANTILLAS_PRECOMPILAR', '0')
+os.environ.setdefault('LOG_NIVEL', 'WARNING')
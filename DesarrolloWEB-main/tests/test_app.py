@@ -0,0 +1,177 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import app as modulo_app
+from cache_render import CacheRender
+from catalogo import CatalogoCache
+from tiendas import TIENDAS
+
+LIDER = TIENDAS['lider'].archivo
+PRODUCTOS_LIDER = [
+    {'nombre': 'Leche Entera', 'marca': 'Colun', 'precio_actual': 990, 'precio_anterior': 1290},
+    {'nombre': 'Arroz', 'marca': 'Tucapel', 'precio_actual': 5000},
+    {'nombre': 'Café', 'marca': 'Nescafé', 'precio_actual': 7990},
+]
+
+
+def escribir(ruta, contenido, mtime_ns):
+    datos = contenido if isinstance(contenido, bytes) else json.dumps(contenido).encode('utf-8')
+    with open(ruta, 'wb') as f:
+        f.write(datos)
+    os.utime(ruta, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def datos(tmp_path, monkeypatch):
+    """Directorio de catálogos temporal en lugar de static/data/."""
+    monkeypatch.setattr(modulo_app, 'catalogo', CatalogoCache(str(tmp_path)))
+    escribir(tmp_path / LIDER, PRODUCTOS_LIDER, 1_700_000_000_000_000_000)
+    return tmp_path
+
+
+@pytest.fixture
+def cliente():
+    return modulo_app.app.test_client()
+
+
+def test_api_productos_responde_304_si_el_catalogo_no_cambio(datos, cliente):
+    response = cliente.get('/api/productos/lider?page_size=2')
+    assert response.status_code == 200
+    assert [p['nombre'] for p in response.get_json()['productos']] == ['Leche Entera', 'Arroz']
+    etag = response.headers['ETag']
+    assert response.headers['Last-Modified'] == 'Tue, 14 Nov 2023 22:13:20 GMT'
+
+    revalidada = cliente.get('/api/productos/lider?page_size=2', headers={'If-None-Match': etag})
+    assert revalidada.status_code == 304
+    assert revalidada.data == b''
+    assert revalidada.headers['ETag'] == etag
+
+
+def test_api_productos_etag_depende_de_la_consulta(datos, cliente):
+    etag = cliente.get('/api/productos/lider?page_size=2').headers['ETag']
+    otra_pagina = cliente.get('/api/productos/lider?page_size=2&page=2', headers={'If-None-Match': etag})
+    assert otra_pagina.status_code == 200
+    assert otra_pagina.headers['ETag'] != etag
+
+
+def test_api_productos_etag_cambia_con_una_version_nueva(datos, cliente):
+    etag = cliente.get('/api/productos/lider').headers['ETag']
+    escribir(datos / LIDER, PRODUCTOS_LIDER[:1], 1_700_000_100_000_000_000)
+
+    response = cliente.get('/api/productos/lider', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['total'] == 1
+    assert response.headers['ETag'] != etag
+
+
+def test_api_productos_errores(datos, cliente):
+    assert cliente.get('/api/productos/no-existe').status_code == 404
+    response = cliente.get('/api/productos/lider?orden=azar')
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers
+
+
+def test_api_search_y_suggest_responden_304(datos, cliente):
+    for url in ('/api/search?q=leche', '/api/suggest?q=le'):
+        response = cliente.get(url)
+        assert response.status_code == 200
+        assert cliente.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_static_data_responde_304(datos, cliente):
+    response = cliente.get(f'/static/data/{LIDER}')
+    assert response.status_code == 200
+    assert json.loads(response.data) == PRODUCTOS_LIDER
+    assert response.cache_control.max_age == modulo_app.app.config['CATALOGO_MAX_AGE']
+
+    revalidada = cliente.get(f'/static/data/{LIDER}', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidada.status_code == 304
+    por_fecha = cliente.get(f'/static/data/{LIDER}', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert por_fecha.status_code == 304
+
+
+def test_static_data_inexistente_o_fuera_del_directorio(datos, cliente):
+    assert cliente.get('/static/data/no_existe.json').status_code == 404
+    assert cliente.get('/static/data/../app.py').status_code == 404
+
+
+def test_static_data_sirve_la_variante_gzip(datos, cliente):
+    original = json.dumps(PRODUCTOS_LIDER).encode('utf-8')
+    escribir(datos / f'{LIDER}.gz', gzip.compress(original), 1_700_000_000_000_000_000)
+
+    response = cliente.get(f'/static/data/{LIDER}', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.content_encoding == 'gzip'
+    assert response.mimetype == 'application/json'
+    assert gzip.decompress(response.data) == original
+    assert 'Accept-Encoding' in response.vary
+
+    sin_gzip = cliente.get(f'/static/data/{LIDER}')
+    assert sin_gzip.content_encoding is None
+    assert sin_gzip.data == original
+    # Cada codificación tiene su propio ETag
+    assert sin_gzip.headers['ETag'] != response.headers['ETag']
+
+
+def test_static_data_no_sirve_una_variante_desactualizada(datos, cliente):
+    escribir(datos / f'{LIDER}.gz', gzip.compress(b'[]'), 1_600_000_000_000_000_000)
+
+    response = cliente.get(f'/static/data/{LIDER}', headers={'Accept-Encoding': 'gzip'})
+    assert response.content_encoding is None
+    assert json.loads(response.data) == PRODUCTOS_LIDER
+
+
+@pytest.fixture
+def paginas(monkeypatch):
+    """Caché de páginas vacía y un render que muestra los productos recibidos."""
+    monkeypatch.setattr(modulo_app, 'cache_render', CacheRender())
+    monkeypatch.setattr(
+        modulo_app, 'render_template',
+        lambda plantilla, username, productos=(), **contexto: f"{plantilla} {[p['nombre'] for p in productos]}"
+    )
+
+
+def test_pagina_de_tienda_se_cachea_hasta_que_cambia_el_catalogo(datos, paginas, cliente):
+    assert cliente.get('/lider').text == "lider.html ['Leche Entera', 'Arroz', 'Café']"
+    assert cliente.get('/lider').text == "lider.html ['Leche Entera', 'Arroz', 'Café']"
+    assert modulo_app.cache_render.hits == 1
+
+    escribir(datos / LIDER, PRODUCTOS_LIDER[:1], 1_700_000_100_000_000_000)
+    assert cliente.get('/lider').text == "lider.html ['Leche Entera']"
+
+
+def test_render_con_una_version_anterior_no_queda_bajo_la_clave_de_la_nueva(datos, paginas, cliente):
+    anterior = modulo_app.catalogo.instantanea(LIDER)
+    escribir(datos / LIDER, PRODUCTOS_LIDER[:1], 1_700_000_100_000_000_000)
+    modulo_app.catalogo.revisar()
+
+    # Un request que tomó los productos antes de publicarse la versión nueva termina de renderizar después
+    with modulo_app.app.test_request_context('/lider'):
+        modulo_app.renderizar_pagina('lider.html', [anterior], productos=anterior.productos)
+
+    assert cliente.get('/lider').text == "lider.html ['Leche Entera']"
+
+
+def test_api_productos_envia_las_marcas_solo_si_se_piden(datos, cliente):
+    assert 'marcas' not in cliente.get('/api/productos/lider?page=2').get_json()
+    marcas = cliente.get('/api/productos/lider?marcas=1').get_json()['marcas']
+    assert [marca['valor'] for marca in marcas] == ['colun', 'nescafe', 'tucapel']
+
+
+def test_api_productos_rango_de_precio_abierto_incluye_el_limite(datos, cliente):
+    productos = cliente.get('/api/productos/lider?precio=5000%2B').get_json()['productos']
+    assert [p['nombre'] for p in productos] == ['Arroz', 'Café']
+
+
+@pytest.mark.parametrize('ruta', ['/api/sql/stats', '/api/render/stats', '/api/catalogo/stats', '/api/login/limites'])
+def test_rutas_de_monitoreo_exigen_el_token(datos, cliente, monkeypatch, ruta):
+    monkeypatch.setitem(modulo_app.app.config, 'MONITOREO_TOKEN', None)
+    assert cliente.get(ruta, headers={'X-Monitoreo': ''}).status_code == 404
+
+    monkeypatch.setitem(modulo_app.app.config, 'MONITOREO_TOKEN', 'secreto')
+    assert cliente.get(ruta).status_code == 404
+    assert cliente.get(ruta, headers={'X-Monitoreo': 'contraseña'}).status_code == 404
+    assert cliente.get(ruta, headers={'X-Monitoreo': 'secreto'}).status_code == 200
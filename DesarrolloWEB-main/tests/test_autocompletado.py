@@ -0,0 +1,63 @@
+import autocompletado
+from autocompletado import IndiceSugerencias, normalizar_frase
+
+CATALOGOS = [
+    [
+        {'nombre': 'Leche Entera', 'marca': 'Colun', 'descuento': 10},
+        {'nombre': 'Leche Entera', 'marca': 'Colun', 'descuento': 25},
+        {'nombre': 'Lentejas', 'marca': 'N/A'},
+    ],
+    [
+        {'nombre': 'Leche Entera', 'marca': 'Soprole'},
+        {'nombre': 'Queso Gauda', 'marca': 'Colun'},
+        'no es un producto',
+    ],
+]
+
+
+def textos(sugerencias):
+    return [(s['texto'], s['tipo']) for s in sugerencias]
+
+
+def test_normalizar_frase():
+    assert normalizar_frase('  Café   de Grano ') == 'cafe de grano'
+
+
+def test_frase_repetida_suma_popularidad_y_guarda_el_mayor_descuento():
+    primera = IndiceSugerencias(CATALOGOS).sugerir('lec')[0]
+    assert primera == {'texto': 'Leche Entera', 'tipo': 'producto', 'popularidad': 3, 'descuento': 25}
+
+
+def test_ordena_por_popularidad():
+    assert textos(IndiceSugerencias(CATALOGOS).sugerir('le')) == [('Leche Entera', 'producto'), ('Lentejas', 'producto')]
+
+
+def test_encuentra_por_el_inicio_de_cualquier_palabra_y_sin_acentos():
+    assert textos(IndiceSugerencias(CATALOGOS).sugerir('ENT')) == [('Leche Entera', 'producto')]
+    assert textos(IndiceSugerencias([[{'nombre': 'Café'}]]).sugerir('cafe')) == [('Café', 'producto')]
+
+
+def test_incluye_marcas_y_descarta_n_a():
+    indice = IndiceSugerencias(CATALOGOS)
+    assert textos(indice.sugerir('col')) == [('Colun', 'marca')]
+    assert indice.sugerir('n a') == []
+
+
+def test_limite_y_consulta_vacia():
+    indice = IndiceSugerencias(CATALOGOS, limite=10)
+    assert len(indice.sugerir('l', limite=1)) == 1
+    assert indice.sugerir('') == []
+    assert indice.sugerir('zzz') == []
+
+
+def test_prefijos_precalculados_dan_lo_mismo_que_recorrer_el_rango(monkeypatch):
+    monkeypatch.setattr(autocompletado, 'UMBRAL_PRECALCULO', 2)
+    catalogo = [{'nombre': f'Leche {i}', 'marca': 'Colun', 'descuento': i} for i in range(20)]
+    catalogo += [{'nombre': 'Leche 7', 'marca': 'Colun'}] # Más popular
+
+    indice = IndiceSugerencias([catalogo], limite=5)
+    assert 'le' in indice.precalculados
+    esperado = indice.sugerir('le')
+    indice.precalculados.clear()
+    assert indice.sugerir('le') == esperado
+    assert esperado[0]['texto'] == 'Leche 7'
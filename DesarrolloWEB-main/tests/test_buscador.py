@@ -0,0 +1,65 @@
+from buscador import IndiceTienda, buscar, tokenizar
+
+LIDER = [
+    {'nombre': 'Leche Entera', 'marca': 'Colun', 'descripcion': 'Leche de vaca 1 L', 'precio_actual': 990},
+    {'nombre': 'Pan Molde', 'marca': 'Ideal', 'descripcion': 'Pan blanco'},
+]
+JUMBO = [
+    {'nombre': 'Leche Descremada', 'marca': 'Soprole', 'precio_oferta': '$1.090'},
+    {'nombre': 'Café de Grano', 'marca': 'Nescafé', 'descripcion': 'Con aroma a leche'},
+    {'nombre': '', 'marca': ''}, # Sin texto: no se indexa
+]
+
+
+def indices():
+    return [('lider', IndiceTienda(LIDER, tienda='Lider')), ('jumbo', IndiceTienda(JUMBO, tienda='Jumbo'))]
+
+
+def nombres(resultados):
+    return [item.producto['nombre'] for _, _, item in resultados]
+
+
+def test_tokenizar_sin_acentos_ni_mayusculas():
+    assert tokenizar('Café de GRANO, 250g') == ['cafe', 'de', 'grano', '250g']
+    assert tokenizar(None) == []
+
+
+def test_productos_sin_texto_no_se_indexan():
+    assert len(IndiceTienda(JUMBO).productos) == 2
+
+
+def test_coincidencia_en_el_nombre_pesa_mas_que_en_la_descripcion():
+    resultados = nombres(buscar(indices(), 'leche', k=10))
+    assert resultados.index('Café de Grano') == len(resultados) - 1
+    assert set(resultados[:2]) == {'Leche Entera', 'Leche Descremada'}
+
+
+def test_el_nombre_de_la_tienda_prioriza_sus_productos():
+    puntaje, tienda, item = buscar(indices(), 'leche lider', k=1)[0]
+    assert (tienda, item.producto['nombre']) == ('lider', 'Leche Entera')
+
+
+def test_ultimo_termino_se_completa_por_prefijo():
+    assert nombres(buscar(indices(), 'lec desc', k=1)) == ['Leche Descremada']
+    assert nombres(buscar(indices(), 'nesc', k=5)) == ['Café de Grano']
+
+
+def test_sin_acentos_en_la_consulta():
+    assert nombres(buscar(indices(), 'cafe', k=5)) == ['Café de Grano']
+
+
+def test_k_limita_los_resultados_y_vienen_ordenados():
+    resultados = buscar(indices(), 'leche', k=2)
+    assert len(resultados) == 2
+    assert resultados[0][0] >= resultados[1][0]
+
+
+def test_consultas_vacias_o_sin_indices():
+    assert buscar(indices(), '   ') == []
+    assert buscar([], 'leche') == []
+    assert buscar([('lider', IndiceTienda([]))], 'leche') == []
+
+
+def test_resultados_traen_el_producto_indexado():
+    _, _, item = buscar(indices(), 'descremada', k=1)[0]
+    assert item.precio == 1090
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from flask import Flask, jsonify
+
+from cache_http import etag_catalogo, respuesta_condicional, ultima_modificacion
+
+app = Flask(__name__)
+
+FIRMAS = [(1_700_000_000_500_000_000, 120), None]
+
+
+def test_etag_cambia_con_la_version_y_con_los_parametros():
+    etag = etag_catalogo(FIRMAS, '/api/productos/lider', b'page=1')
+    assert etag == etag_catalogo(FIRMAS, '/api/productos/lider', b'page=1')
+    assert etag != etag_catalogo([(1_700_000_001_000_000_000, 120), None], '/api/productos/lider', b'page=1')
+    assert etag != etag_catalogo(FIRMAS, '/api/productos/lider', b'page=2')
+
+
+def test_ultima_modificacion_en_segundos():
+    assert ultima_modificacion(FIRMAS) == datetime.fromtimestamp(1_700_000_000, tz=timezone.utc)
+    assert ultima_modificacion([None]) is None
+
+
+def construir_contando(llamadas):
+    def construir():
+        llamadas.append(1)
+        return jsonify({'ok': True}), 200
+    return construir
+
+
+def test_primera_respuesta_lleva_los_encabezados_de_cache():
+    llamadas = []
+    with app.test_request_context('/'):
+        response = respuesta_condicional(FIRMAS, construir_contando(llamadas), 60, 'x')
+    assert response.status_code == 200
+    assert response.get_etag() == (etag_catalogo(FIRMAS, 'x'), False)
+    assert response.last_modified == ultima_modificacion(FIRMAS)
+    assert response.cache_control.max_age == 60
+    assert response.cache_control.must_revalidate
+    assert llamadas == [1]
+
+
+def test_if_none_match_vigente_responde_304_sin_construir():
+    llamadas = []
+    etag = etag_catalogo(FIRMAS, 'x')
+    with app.test_request_context('/', headers={'If-None-Match': f'"{etag}"'}):
+        response = respuesta_condicional(FIRMAS, construir_contando(llamadas), 60, 'x')
+    assert response.status_code == 304
+    assert llamadas == []
+
+
+def test_if_none_match_tiene_prioridad_sobre_if_modified_since():
+    llamadas = []
+    headers = {'If-None-Match': '"otro"', 'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'}
+    with app.test_request_context('/', headers=headers):
+        response = respuesta_condicional(FIRMAS, construir_contando(llamadas), 60, 'x')
+    assert response.status_code == 200
+    assert llamadas == [1]
+
+
+def test_if_modified_since():
+    with app.test_request_context('/', headers={'If-Modified-Since': 'Tue, 14 Nov 2023 22:13:20 GMT'}):
+        assert respuesta_condicional(FIRMAS, construir_contando([]), 60, 'x').status_code == 304
+    with app.test_request_context('/', headers={'If-Modified-Since': 'Tue, 14 Nov 2023 22:13:19 GMT'}):
+        assert respuesta_condicional(FIRMAS, construir_contando([]), 60, 'x').status_code == 200
+
+
+def test_errores_no_se_cachean():
+    with app.test_request_context('/'):
+        response = respuesta_condicional(FIRMAS, lambda: (jsonify({'ok': False}), 400), 60, 'x')
+    assert response.status_code == 400
+    assert response.get_etag() == (None, None)
@@ -0,0 +1,42 @@
+from cache_negativa import CacheNegativa
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_recuerda_las_ausencias_hasta_que_vencen():
+    reloj = Reloj()
+    cache = CacheNegativa(ttl=30, reloj=reloj)
+    assert not cache.contiene('usuario:ana')
+
+    cache.agregar('usuario:ana')
+    reloj.ahora = 29.9
+    assert cache.contiene('usuario:ana')
+    reloj.ahora = 30.0
+    assert not cache.contiene('usuario:ana')
+    assert cache.stats()['claves'] == 0 # La entrada vencida se elimina al consultarla
+
+
+def test_descartar_al_registrar():
+    cache = CacheNegativa(reloj=Reloj())
+    cache.agregar('email:ana@example.com')
+    cache.descartar('email:ana@example.com')
+    cache.descartar('email:otro@example.com') # No falla si no estaba
+    assert not cache.contiene('email:ana@example.com')
+
+
+def test_lru_acotada():
+    cache = CacheNegativa(max_claves=2, reloj=Reloj())
+    cache.agregar('a')
+    cache.agregar('b')
+    assert cache.contiene('a') # 'a' pasa a ser la más reciente
+    cache.agregar('c') # se descarta 'b'
+
+    assert cache.contiene('a') and cache.contiene('c')
+    assert not cache.contiene('b')
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'claves': 2, 'max_claves': 2}
@@ -0,0 +1,30 @@
+from cache_render import MARCA_USUARIO, CacheRender
+
+
+def test_renderiza_una_vez_y_sustituye_el_usuario_escapado():
+    cache = CacheRender()
+    renders = []
+
+    def renderizar():
+        renders.append(1)
+        return f'<span>Hola {MARCA_USUARIO}</span>'
+
+    assert cache.obtener('home', renderizar, 'ana') == '<span>Hola ana</span>'
+    assert cache.obtener('home', renderizar, '<b>eva</b>') == '<span>Hola &lt;b&gt;eva&lt;/b&gt;</span>'
+    assert len(renders) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_acotada_por_bytes_y_por_paginas():
+    cache = CacheRender(max_bytes=10, max_entradas=2)
+    cache.obtener('a', lambda: 'aaaa', '')
+    cache.obtener('b', lambda: 'bbbb', '')
+    cache.obtener('a', lambda: 'xxxx', '') # 'a' pasa a ser la más reciente
+    cache.obtener('c', lambda: 'cccc', '') # se descarta 'b'
+
+    assert cache.obtener('a', lambda: 'xxxx', '') == 'aaaa'
+    assert cache.obtener('b', lambda: 'nueva', '') == 'nueva'
+    assert cache.stats()['bytes'] <= 10
+
+    cache.obtener('grande', lambda: 'g' * 11, '') # Más grande que el límite: no se guarda
+    assert cache.obtener('grande', lambda: 'otra', '') == 'otra'
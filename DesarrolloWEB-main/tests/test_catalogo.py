@@ -0,0 +1,123 @@
+import json
+import os
+
+from catalogo import CatalogoCache
+
+
+def escribir(ruta, productos, mtime_ns=None):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(productos, f)
+    if mtime_ns is not None: # Fuerza una versión distinta aunque el tamaño coincida
+        os.utime(ruta, ns=(mtime_ns, mtime_ns))
+
+
+def test_parsea_una_sola_vez_mientras_no_cambia(tmp_path):
+    escribir(tmp_path / 'a.json', [{'nombre': 'Leche'}])
+    catalogo = CatalogoCache(str(tmp_path))
+
+    assert catalogo.get('a.json') == [{'nombre': 'Leche'}]
+    assert catalogo.get('a.json') is catalogo.get('a.json')
+    assert catalogo.misses == 1
+    assert catalogo.recargas == 0
+
+
+def test_recarga_cuando_cambia_el_archivo(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir(ruta, [{'nombre': 'Leche'}], mtime_ns=1_000_000_000)
+    catalogo = CatalogoCache(str(tmp_path))
+    anterior = catalogo.instantanea('a.json')
+
+    escribir(ruta, [{'nombre': 'Pan'}], mtime_ns=2_000_000_000)
+
+    nueva = catalogo.instantanea('a.json')
+    assert nueva.productos == [{'nombre': 'Pan'}]
+    assert nueva.version > anterior.version
+    assert anterior.productos == [{'nombre': 'Leche'}] # La versión publicada no se modifica
+    assert catalogo.recargas == 1
+
+
+def test_archivo_inexistente(tmp_path):
+    catalogo = CatalogoCache(str(tmp_path))
+
+    assert catalogo.get('no_existe.json') == []
+    assert catalogo.firma('no_existe.json') is None
+    assert catalogo.instantanea('no_existe.json') is None
+
+
+def test_json_ilegible_conserva_la_version_anterior(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir(ruta, [{'nombre': 'Leche'}], mtime_ns=1_000_000_000)
+    catalogo = CatalogoCache(str(tmp_path))
+    catalogo.get('a.json')
+
+    ruta.write_text('[{"nombre": ', encoding='utf-8')
+
+    assert catalogo.get('a.json') == [{'nombre': 'Leche'}]
+    assert catalogo.errores == 1
+
+
+def test_derivado_se_construye_una_vez_por_version(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir(ruta, [{'nombre': 'Leche'}], mtime_ns=1_000_000_000)
+    catalogo = CatalogoCache(str(tmp_path))
+    construidos = []
+
+    def contar(productos):
+        construidos.append(productos)
+        return len(productos)
+
+    assert catalogo.get_derivado('a.json', 'cantidad', contar) == 1
+    assert catalogo.get_derivado('a.json', 'cantidad', contar) == 1
+    assert len(construidos) == 1
+
+    # La versión nueva se publica con el derivado ya reconstruido
+    escribir(ruta, [{'nombre': 'Leche'}, {'nombre': 'Pan'}], mtime_ns=2_000_000_000)
+    assert catalogo.revisar() == ['a.json']
+    assert len(construidos) == 2
+    assert catalogo.get_derivado('a.json', 'cantidad', contar) == 2
+    assert len(construidos) == 2
+
+
+def test_derivado_combinado_se_reconstruye_si_cambia_cualquier_archivo(tmp_path):
+    escribir(tmp_path / 'a.json', [{'nombre': 'Leche'}], mtime_ns=1_000_000_000)
+    escribir(tmp_path / 'b.json', [{'nombre': 'Pan'}], mtime_ns=1_000_000_000)
+    catalogo = CatalogoCache(str(tmp_path))
+
+    def contar(catalogos):
+        return sum(len(productos) for productos in catalogos)
+
+    assert catalogo.get_derivado_combinado(['a.json', 'b.json'], 'total', contar) == 2
+    escribir(tmp_path / 'b.json', [{'nombre': 'Pan'}, {'nombre': 'Arroz'}], mtime_ns=2_000_000_000)
+    assert catalogo.get_derivado_combinado(['a.json', 'b.json'], 'total', contar) == 3
+
+
+def test_con_vigilancia_las_lecturas_no_consultan_el_disco(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir(ruta, [{'nombre': 'Leche'}], mtime_ns=1_000_000_000)
+    catalogo = CatalogoCache(str(tmp_path))
+    catalogo.get('a.json')
+    catalogo.iniciar_vigilancia(intervalo=3600)
+    try:
+        escribir(ruta, [{'nombre': 'Pan'}], mtime_ns=2_000_000_000)
+        # Hasta que el vigilante revise, se sigue viendo la versión publicada completa
+        assert catalogo.get('a.json') == [{'nombre': 'Leche'}]
+        catalogo.revisar()
+        assert catalogo.get('a.json') == [{'nombre': 'Pan'}]
+    finally:
+        catalogo.detener_vigilancia()
+
+
+def test_instantanea_trae_productos_y_firma_de_la_misma_version(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir(ruta, [{'nombre': 'Leche'}], mtime_ns=1_000_000_000)
+    firma_anterior = (1_000_000_000, ruta.stat().st_size)
+    catalogo = CatalogoCache(str(tmp_path))
+    anterior = catalogo.instantanea('a.json')
+
+    escribir(ruta, [{'nombre': 'Pan'}, {'nombre': 'Arroz'}], mtime_ns=2_000_000_000)
+    catalogo.revisar()
+
+    # Quien tomó la instantánea antes de publicar la nueva sigue viendo una versión coherente
+    assert (anterior.productos, anterior.firma) == ([{'nombre': 'Leche'}], firma_anterior)
+    nueva = catalogo.instantanea('a.json')
+    assert (nueva.productos, nueva.firma) == ([{'nombre': 'Pan'}, {'nombre': 'Arroz'}], catalogo.firma('a.json'))
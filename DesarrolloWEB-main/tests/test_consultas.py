@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from consultas import CatalogoIndexado, _rango_precio, indexar_producto, lineas_ndjson, paginar, parse_precio
+
+PRODUCTOS = [
+    {'nombre': 'Leche Entera', 'marca': 'Colun', 'categoria': 'Lácteos', 'precio_oferta': '$990', 'precio_original': '$1.290'},
+    {'nombre': 'Arroz', 'marca': 'Tucapel', 'categoria': 'Abarrotes', 'precio_oferta': 5000, 'precio_original': 5000},
+    {'nombre': 'Café', 'marca': 'Nescafé', 'categoria': 'Abarrotes', 'precio_actual': 7990, 'precio_anterior': 9990},
+    {'nombre': 'Yogur', 'marca': 'Colun', 'categoria': 'Lácteos', 'precio_oferta': 4999, 'descuento': 40},
+]
+
+
+@pytest.mark.parametrize('valor, esperado', [
+    ('$1.990', 1990), (1990, 1990), (1990.9, 1990), ('N/A', 0), (None, 0), (True, 0),
+])
+def test_parse_precio(valor, esperado):
+    assert parse_precio(valor) == esperado
+
+
+@pytest.mark.parametrize('precio, esperado', [
+    ('0-1000', (0, 1000)),
+    ('5000+', (5000, None)),
+    ('all', (None, None)),
+    ('', (None, None)),
+    (None, (None, None)),
+    ('barato', (None, None)),
+])
+def test_rango_precio(precio, esperado):
+    assert _rango_precio(precio) == esperado
+
+
+def test_indexar_producto_usa_los_campos_de_lider_y_calcula_el_descuento():
+    item = indexar_producto(PRODUCTOS[2])
+    assert (item.precio, item.precio_original, item.descuento) == (7990, 9990, 20)
+    assert item.categoria == 'abarrotes'
+    assert item.marca == 'nescafe'
+
+
+def test_indexar_producto_usa_el_menor_precio_por_cantidad():
+    item = indexar_producto({'nombre': 'Aceite', 'precio_oferta': 3000,
+                             'precios_por_cantidad': [{'precio_unitario': '$2.500'}, {'precio_unitario': '$2.800'}]})
+    assert item.precio == 2500
+
+
+def nombres(items):
+    return [item.producto['nombre'] for item in items]
+
+
+def test_rango_abierto_incluye_el_limite_inferior():
+    assert nombres(CatalogoIndexado(PRODUCTOS).consultar(precio='5000+')) == ['Arroz', 'Café']
+
+
+def test_rango_cerrado_incluye_ambos_limites():
+    assert nombres(CatalogoIndexado(PRODUCTOS).consultar(precio='990-4999')) == ['Leche Entera', 'Yogur']
+
+
+def test_filtros_por_categoria_marca_y_descuento():
+    catalogo = CatalogoIndexado(PRODUCTOS)
+    assert nombres(catalogo.consultar(categoria='lacteos')) == ['Leche Entera', 'Yogur']
+    assert nombres(catalogo.consultar(marca='Colun', descuento='30')) == ['Yogur']
+    assert nombres(catalogo.consultar(categoria='all', marca='todas')) == nombres(catalogo.items)
+
+
+def test_ordenes():
+    catalogo = CatalogoIndexado(PRODUCTOS)
+    assert nombres(catalogo.consultar(orden='menor-precio')) == ['Leche Entera', 'Yogur', 'Arroz', 'Café']
+    assert nombres(catalogo.consultar(orden='mayor-descuento'))[0] == 'Yogur'
+    assert nombres(catalogo.consultar(orden='nombre-az')) == ['Arroz', 'Café', 'Leche Entera', 'Yogur']
+
+
+def test_iterar_entrega_lo_mismo_que_consultar():
+    catalogo = CatalogoIndexado(PRODUCTOS)
+    assert list(catalogo.iterar(marca='colun', orden='menor-precio')) == catalogo.consultar(marca='colun', orden='menor-precio')
+
+
+def test_marcas_sin_repetir_y_ordenadas():
+    assert CatalogoIndexado(PRODUCTOS).marcas == [
+        {'valor': 'colun', 'nombre': 'Colun'},
+        {'valor': 'nescafe', 'nombre': 'Nescafé'},
+        {'valor': 'tucapel', 'nombre': 'Tucapel'},
+    ]
+
+
+@pytest.mark.parametrize('page, esperado', [(1, [0, 1, 2]), (3, [6]), (4, [])])
+def test_paginar(page, esperado):
+    pagina, total_pages = paginar(list(range(7)), page, 3)
+    assert pagina == esperado
+    assert total_pages == 3
+
+
+def test_paginar_lista_vacia_tiene_una_pagina():
+    assert paginar([], 1, 8) == ([], 1)
+
+
+def test_lineas_ndjson_por_lotes_y_con_campos():
+    items = CatalogoIndexado(PRODUCTOS).items
+    lotes = list(lineas_ndjson(items, campos=['nombre', 'marca'], tamano_lote=3))
+    assert len(lotes) == 2
+    lineas = b''.join(lotes).decode('utf-8').splitlines()
+    assert [json.loads(linea) for linea in lineas][2] == {'nombre': 'Café', 'marca': 'Nescafé'}
@@ -0,0 +1,54 @@
+import pytest
+
+from limitador import LimitadorTokenBucket
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_permite_hasta_la_capacidad_y_sugiere_la_espera():
+    reloj = Reloj()
+    limitador = LimitadorTokenBucket(capacidad=3, tasa=0.5, reloj=reloj)
+
+    assert [limitador.permitir('1.2.3.4')[0] for _ in range(3)] == [True, True, True]
+    permitido, espera = limitador.permitir('1.2.3.4')
+    assert not permitido
+    assert espera == pytest.approx(2.0)
+
+
+def test_los_tokens_se_recargan_con_el_tiempo_sin_superar_la_capacidad():
+    reloj = Reloj()
+    limitador = LimitadorTokenBucket(capacidad=2, tasa=1, reloj=reloj)
+    limitador.permitir('a')
+    limitador.permitir('a')
+
+    reloj.ahora = 1.0
+    assert limitador.permitir('a') == (True, 0)
+    assert not limitador.permitir('a')[0]
+
+    reloj.ahora = 100.0
+    assert [limitador.permitir('a')[0] for _ in range(3)] == [True, True, False]
+
+
+def test_cada_clave_tiene_su_bucket():
+    limitador = LimitadorTokenBucket(capacidad=1, tasa=0, reloj=Reloj())
+    assert limitador.permitir('a')[0]
+    assert limitador.permitir('b')[0]
+    assert limitador.permitir('a') == (False, 60)
+
+
+def test_lru_acotada_descarta_la_clave_usada_hace_mas_tiempo():
+    limitador = LimitadorTokenBucket(capacidad=1, tasa=0, max_claves=2, reloj=Reloj())
+    limitador.permitir('a')
+    limitador.permitir('b')
+    limitador.permitir('a') # 'a' pasa a ser la más reciente
+    limitador.permitir('c') # se descarta 'b'
+
+    assert limitador.stats() == {'permitidos': 3, 'rechazados': 1, 'desalojos': 1, 'claves': 2, 'max_claves': 2}
+    assert limitador.permitir('b')[0] # Vuelve con el bucket lleno
+    assert not limitador.permitir('c')[0]
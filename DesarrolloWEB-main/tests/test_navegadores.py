@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+pytest.importorskip('selenium') # navegadores.py importa selenium al cargarse; no se abre ningún Chrome
+
+from navegadores import PoolNavegadores # noqa: E402
+
+
+class Driver:
+    """Driver mínimo: responde a la verificación de salud y registra si se cerró."""
+
+    def __init__(self):
+        self.cerrado = False
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def get_log(self, tipo):
+        return []
+
+    def quit(self):
+        self.cerrado = True
+
+
+def test_reutiliza_la_sesion_liberada():
+    pool = PoolNavegadores(tamano=2, crear=Driver)
+    sesion = pool.adquirir()
+    pool.liberar(sesion)
+
+    assert pool.adquirir() is sesion
+    assert (pool.creados, pool.reutilizados) == (1, 1)
+
+
+def test_recicla_tras_max_paginas():
+    pool = PoolNavegadores(tamano=1, max_paginas=2, crear=Driver)
+    sesion = pool.adquirir()
+    sesion.contar_pagina()
+    sesion.contar_pagina()
+    pool.liberar(sesion)
+
+    assert sesion.driver.cerrado
+    assert pool.adquirir() is not sesion
+    assert pool.reciclados == 1
+
+
+def test_adquirir_espera_un_cupo():
+    pool = PoolNavegadores(tamano=1, crear=Driver)
+    pool.adquirir()
+    with pytest.raises(TimeoutError):
+        pool.adquirir(espera=0.05)
+
+
+def test_precalentar_cuenta_las_sesiones_en_uso():
+    pool = PoolNavegadores(tamano=3, crear=Driver)
+    en_uso = [pool.adquirir(), pool.adquirir()]
+
+    pool.precalentar()
+    assert pool.stats()['libres'] == 1
+    assert pool.creados == 3
+
+    for sesion in en_uso:
+        pool.liberar(sesion)
+    pool.precalentar()
+    assert pool.creados == 3 # Ya hay tamano navegadores abiertos
+    assert pool.stats()['en_uso'] == 0
+
+
+def test_precalentar_no_supera_el_tamano_si_se_adquiere_mientras_abre():
+    abriendo = threading.Event()
+    continuar = threading.Event()
+
+    def crear_lento():
+        if threading.current_thread().name == 'pool-navegadores':
+            abriendo.set()
+            continuar.wait(5)
+        return Driver()
+
+    pool = PoolNavegadores(tamano=1, crear=crear_lento)
+    hilo = threading.Thread(target=pool.precalentar)
+    hilo.start()
+    abriendo.wait(5)
+    sesion = pool.adquirir() # Ocupa el único cupo mientras el precalentamiento abre su navegador
+    continuar.set()
+    hilo.join()
+
+    assert pool.stats()['libres'] == 0
+    pool.liberar(sesion)
+    assert pool.stats()['libres'] == 1
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+from flask import Flask
+
+from perfilador import PerfiladorRutas
+
+
+@pytest.fixture
+def cliente(tmp_path):
+    app = Flask(__name__)
+
+    @app.route('/hola')
+    def hola():
+        return 'hola'
+
+    PerfiladorRutas(token='secreto', modo='cprofile', directorio=str(tmp_path)).init_app(app)
+    return app.test_client()
+
+
+def test_perfila_con_el_token(cliente, tmp_path):
+    response = cliente.get('/hola', headers={'X-Perfil': 'secreto'})
+    assert response.status_code == 200
+    assert response.headers['X-Perfil-Archivo'] in os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize('headers', [{}, {'X-Perfil': 'otro'}, {'X-Perfil': 'contraseña'}])
+def test_sin_el_token_no_perfila(cliente, tmp_path, headers):
+    response = cliente.get('/hola', headers=headers)
+    assert response.status_code == 200 # Un token con caracteres no ASCII no debe terminar en 500
+    assert 'X-Perfil-Archivo' not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_sin_rutas_ni_token_no_registra_hooks():
+    app = Flask(__name__)
+    PerfiladorRutas().init_app(app)
+    assert not app.before_request_funcs and not app.after_request_funcs
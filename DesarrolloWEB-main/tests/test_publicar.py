@@ -0,0 +1,105 @@
+import gzip
+import json
+import os
+
+import pytest
+from werkzeug.datastructures import Accept
+
+import publicar
+from publicar import publicar_archivo, publicar_directorio, variante_comprimida
+
+PRODUCTOS = [{'nombre': 'Café', 'precio_oferta': '$1.990'}] * 50
+
+
+def escribir_json(ruta, datos):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+
+def test_publicar_archivo_minifica_y_genera_gzip(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir_json(ruta, PRODUCTOS)
+
+    tamanos = publicar_archivo(str(ruta))
+
+    minificado = ruta.read_bytes()
+    assert b'\n' not in minificado and 'Café'.encode('utf-8') in minificado
+    assert json.loads(minificado) == PRODUCTOS
+    assert gzip.decompress((tmp_path / 'a.json.gz').read_bytes()) == minificado
+    assert tamanos['json'] == len(minificado)
+    assert tamanos['gzip'] < tamanos['json']
+    assert ('br' in tamanos) == (publicar.brotli is not None)
+
+
+def test_publicar_de_nuevo_no_cambia_el_mtime_del_original(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir_json(ruta, PRODUCTOS)
+    publicar_archivo(str(ruta))
+    os.utime(ruta, ns=(1_000_000_000, 1_000_000_000))
+
+    publicar_archivo(str(ruta))
+
+    assert ruta.stat().st_mtime_ns == 1_000_000_000
+    # La variante se reescribe igual, para quedar más reciente que el original
+    assert (tmp_path / 'a.json.gz').stat().st_mtime_ns > 1_000_000_000
+
+
+def test_publicar_directorio_omite_los_json_invalidos(tmp_path, capsys):
+    escribir_json(tmp_path / 'a.json', PRODUCTOS)
+    (tmp_path / 'roto.json').write_text('[', encoding='utf-8')
+    (tmp_path / 'notas.txt').write_text('x', encoding='utf-8')
+
+    assert list(publicar_directorio(str(tmp_path))) == ['a.json']
+    assert 'roto.json' in capsys.readouterr().out
+
+
+def test_variante_comprimida_segun_accept_encoding(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir_json(ruta, PRODUCTOS)
+    publicar_archivo(str(ruta))
+
+    assert variante_comprimida(str(ruta), Accept([('gzip', 1)])) == ('gzip', str(ruta) + '.gz')
+    assert variante_comprimida(str(ruta), Accept([('identity', 1)])) == (None, str(ruta))
+    assert variante_comprimida(str(tmp_path / 'otro.json'), Accept([('gzip', 1)])) == (None, str(tmp_path / 'otro.json'))
+
+
+def test_variante_mas_antigua_que_el_original_no_se_usa(tmp_path):
+    ruta = tmp_path / 'a.json'
+    escribir_json(ruta, PRODUCTOS)
+    publicar_archivo(str(ruta))
+    # Un scraper reescribió el JSON después de publicarlo
+    os.utime(str(ruta) + '.gz', ns=(1_000_000_000, 1_000_000_000))
+
+    assert variante_comprimida(str(ruta), Accept([('gzip', 1)])) == (None, str(ruta))
+
+
+def test_escribir_atomico_reemplaza_sin_dejar_temporales(tmp_path):
+    ruta = tmp_path / 'a.json'
+    ruta.write_bytes(b'anterior')
+
+    publicar.escribir_atomico(str(ruta), b'nuevo')
+
+    assert ruta.read_bytes() == b'nuevo'
+    assert os.listdir(tmp_path) == ['a.json']
+
+
+def test_escribir_atomico_conserva_el_original_si_falla(tmp_path, monkeypatch):
+    ruta = tmp_path / 'a.json'
+    ruta.write_bytes(b'anterior')
+
+    def falla(origen, destino):
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(publicar.os, 'replace', falla)
+    with pytest.raises(OSError):
+        publicar.escribir_atomico(str(ruta), b'nuevo')
+
+    assert ruta.read_bytes() == b'anterior'
+    assert os.listdir(tmp_path) == ['a.json']
+
+
+def test_guardar_json_atomico_conserva_los_acentos(tmp_path):
+    ruta = tmp_path / 'a.json'
+    publicar.guardar_json_atomico(str(ruta), [{'nombre': 'Café'}], indent=2)
+    assert 'Café' in ruta.read_text(encoding='utf-8')
+    assert json.loads(ruta.read_text(encoding='utf-8')) == [{'nombre': 'Café'}]
@@ -0,0 +1,24 @@
+from collections import namedtuple
+
+# Registro de supermercados: cada tienda define su ruta (slug), nombre visible,
+# archivo de productos en static/data/ y plantilla HTML.
+Tienda = namedtuple('Tienda', ['slug', 'nombre', 'archivo', 'plantilla'])
+
+TIENDAS = {
+    tienda.slug: tienda
+    for tienda in (
+        Tienda('lider', 'Lider', 'ofertas_lider.json', 'lider.html'),
+        Tienda('jumbo', 'Jumbo', 'productos_jumbo.json', 'jumbo.html'),
+        Tienda('santaisabel', 'Santa Isabel', 'productos_santa_isabel_selenium.json', 'santaisabel.html'),
+        Tienda('unimarc', 'Unimarc', 'productos_unimarc.json', 'unimarc.html'),
+        Tienda('tottus', 'Tottus', 'productos_tottus.json', 'tottus.html'),
+        Tienda('mayorista10', 'Mayorista 10', 'productos_mayorista10.json', 'mayorista10.html'),
+        Tienda('alvi', 'Alvi', 'productos_alvi.json', 'alvi.html'),
+        Tienda('oxxo', 'Oxxo', 'productos_oxxo.json', 'oxxo.html'),
+    )
+}
+
+
+def archivos_tiendas():
+    """Retorna la lista de archivos de productos de todas las tiendas, en el orden del registro."""
+    return [tienda.archivo for tienda in TIENDAS.values()]